@@ -4,12 +4,19 @@ Library yang lebih reliable dan mudah digunakan dibanding edge_tts
 Dengan dukungan manipulasi pitch menggunakan pydub
 """
 from gtts import gTTS
+import io
 import os
 
+from cache import make_key, open_cache
+import formats
+import gtts_parallel
+import metrics
+
 # Cek apakah pydub tersedia untuk manipulasi pitch
 try:
     from pydub import AudioSegment
     from pydub.effects import speedup, normalize
+    import audio_codec
     PYDUB_AVAILABLE = True
 except ImportError:
     PYDUB_AVAILABLE = False
@@ -18,6 +25,13 @@ except ImportError:
     print("   Untuk pitch control penuh, install juga: pip install simpleaudio atau ffmpeg")
     print()
 
+# Cek apakah numpy tersedia untuk rantai efek di memori (lihat dsp.py)
+try:
+    import dsp
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 # ============================================
 # KONFIGURASI PARAMETER SUARA
 # ============================================
@@ -33,7 +47,21 @@ PITCH_SHIFT = -7      # Perubahan pitch dalam semitones: -12 sampai +12
 
 TEXT = "Halo, ini adalah tes suara setelah perbaikan kode."
 OUTPUT_FILE = "output_edge.mp3"  # Nama file output
-TEMP_FILE = "temp_audio.mp3"     # File temporary untuk processing
+OUTPUT_FORMAT = "mp3" # Format output (lihat formats.py): "mp3", "kiosk", "opus", "wav", "pcm16", ...
+
+# CACHE (lihat cache.py)
+USE_CACHE = True      # True = pakai ulang audio yang sudah pernah dibuat dengan parameter sama
+
+# TRIM SENYAP (membutuhkan numpy, lihat dsp.trim)
+TRIM_SILENCE = True          # True = potong senyap di awal/akhir klip saat klip dibuat
+SILENCE_THRESHOLD_DB = -50.0 # Level di bawah ini dianggap senyap (dBFS)
+SILENCE_PAD_MS = 30          # Senyap yang disisakan di awal/akhir (ms)
+
+# UNDUH PARALEL (lihat gtts_parallel.py)
+PARALLEL_FETCH = True # True = segmen teks panjang diunduh bersamaan lewat koneksi keep-alive
+
+# ROUTING main() (lihat backends/hedged_backend.py)
+ROUTING = os.getenv("VOICE_ROUTING", "gtts")   # "gtts" = langsung ke Google TTS, "hedged" = gTTS + backend cadangan
 
 # ============================================
 # CATATAN PARAMETER:
@@ -56,8 +84,56 @@ TEMP_FILE = "temp_audio.mp3"     # File temporary untuk processing
 #   +1 sampai +12 = Lebih tinggi (suara wanita)
 #   Contoh: -5 (pria), 0 (normal), +5 (wanita)
 #   Catatan: Perubahan ekstrem bisa membuat suara tidak natural
+#   Dengan numpy durasi tetap (phase vocoder, dsp.PITCH_MODE / env VOICE_PITCH_MODE);
+#   tanpa numpy pitch dan durasi ikut berubah (trik frame rate pydub)
+#
+# - USE_CACHE: Audio disimpan di folder cache dengan kunci hash dari
+#   (engine, teks, LANG, TLD, SLOW, PITCH_SHIFT). Teks dan parameter yang sama
+#   langsung diambil dari cache tanpa request ke Google TTS
+#
+# - TRIM_SILENCE: audio gTTS diawali beberapa ratus ms senyap yang diputar kiosk
+#   sebelum nama terdengar. Dipotong sekali saat klip dibuat (masuk cache),
+#   offset potongannya disimpan di metadata cache (trim_start_ms, trim_end_ms)
+#
+# - PARALLEL_FETCH: gTTS memecah teks > ~100 karakter menjadi beberapa segmen.
+#   True = semua segmen diunduh bersamaan (dengan retry) lalu disambung berurutan,
+#   False = diunduh satu per satu seperti gTTS biasa
+#
+# - OUTPUT_FORMAT: Preset atau spec formats.py (membutuhkan pydub selain "mp3")
+#   "mp3" = MP3 asli dari Google TTS, tanpa decode/encode ulang jika PITCH_SHIFT = 0
+#   "kiosk" = Ogg/Opus 16 kHz mono 24 kbps, untuk pengumuman pendek di kiosk
+#   "wav" / "pcm16" = tanpa encoder (paling cepat, ukuran paling besar)
+#   Ekstensi OUTPUT_FILE disesuaikan otomatis dengan format
+#
+# - ROUTING: "hedged" = audio diambil lewat backends.get_backend("hedged"): jika gTTS
+#   belum selesai dalam VOICE_HEDGE_BUDGET_MS atau gagal, backend cadangan
+#   (VOICE_HEDGE_FALLBACKS, default pyttsx3) ikut dipakai. Hanya hasil gTTS yang masuk
+#   cache; audio cadangan tidak di-pitch shift (suaranya sudah berbeda), hanya trim + format
 # ============================================
 
+def pitch_segment(audio, semitones):
+    """
+    Mengubah pitch AudioSegment di memori (tanpa baca/tulis file)
+    semitones: -12 sampai +12 (negatif = lebih rendah, positif = lebih tinggi)
+    """
+    if NUMPY_AVAILABLE:
+        return dsp.pitch_segment(audio, semitones)
+    
+    # Fallback tanpa numpy: ubah pitch dengan mengubah frame rate
+    # Formula: new_sample_rate = old_sample_rate * (2 ** (semitones / 12))
+    new_sample_rate = int(audio.frame_rate * (2 ** (semitones / 12.0)))
+    
+    with metrics.stage("pitch", backend="pydub"):
+        # Apply pitch change
+        audio_shifted = audio._spawn(audio.raw_data, overrides={"frame_rate": new_sample_rate})
+        
+        # Set frame rate kembali ke original untuk menjaga durasi
+        audio_shifted = audio_shifted.set_frame_rate(audio.frame_rate)
+    
+    # Normalize audio
+    with metrics.stage("normalize", backend="pydub"):
+        return normalize(audio_shifted)
+
 def change_pitch(audio_file, semitones):
     """
     Mengubah pitch audio menggunakan pydub
@@ -67,29 +143,178 @@ def change_pitch(audio_file, semitones):
         return False
     
     try:
-        # Load audio
-        audio = AudioSegment.from_mp3(audio_file)
-        
-        # Ubah pitch dengan mengubah frame rate
-        # Formula: new_sample_rate = old_sample_rate * (2 ** (semitones / 12))
-        new_sample_rate = int(audio.frame_rate * (2 ** (semitones / 12.0)))
-        
-        # Apply pitch change
-        audio_shifted = audio._spawn(audio.raw_data, overrides={"frame_rate": new_sample_rate})
+        if NUMPY_AVAILABLE:
+            # Decode sekali, proses di memori, encode sekali
+            return dsp.change_pitch(audio_file, semitones)
         
-        # Set frame rate kembali ke original untuk menjaga durasi
-        audio_shifted = audio_shifted.set_frame_rate(audio.frame_rate)
+        # Load audio (di dalam proses jika PyAV terinstall, lihat audio_codec.py)
+        audio = audio_codec.decode_segment(audio_file, format="mp3")
         
-        # Normalize audio
-        audio_shifted = normalize(audio_shifted)
+        audio_shifted = pitch_segment(audio, semitones)
         
         # Save
-        audio_shifted.export(audio_file, format="mp3")
+        save_audio(audio_codec.encode_segment(audio_shifted, "mp3"), audio_file)
         return True
     except Exception as e:
         print(f"  ⚠️  Error saat mengubah pitch: {e}")
         return False
 
+def resolve_format(spec=None):
+    """OutputFormat yang dipakai (None = OUTPUT_FORMAT); tanpa pydub selalu MP3 asli"""
+    if not PYDUB_AVAILABLE:
+        return formats.parse_format("mp3")
+    return formats.parse_format(OUTPUT_FORMAT if spec is None else spec)
+
+def trims_silence():
+    """True jika trim senyap aktif dan bisa dijalankan (pydub + numpy)"""
+    return TRIM_SILENCE and PYDUB_AVAILABLE and NUMPY_AVAILABLE
+
+def pitch_chain(pitch_shift):
+    """Langkah pitch untuk kunci cache: mode vocoder ikut dicatat karena hasilnya berbeda dari resample"""
+    mode = dsp.PITCH_MODE if NUMPY_AVAILABLE else "resample"
+    chain = [("pitch", pitch_shift)]
+    if mode != "resample":
+        chain.append(("pitch_mode", mode))
+    return chain
+
+def cache_key_for(text, lang=None, tld=None, slow=None, pitch_shift=None, output_format=None):
+    """Kunci cache untuk teks (parameter None = pakai KONFIGURASI di atas)"""
+    lang = LANG if lang is None else lang
+    tld = TLD if tld is None else tld
+    slow = SLOW if slow is None else slow
+    pitch_shift = PITCH_SHIFT if pitch_shift is None else pitch_shift
+    fmt = resolve_format(output_format)
+    chain = []
+    if trims_silence():
+        chain.append(("trim", SILENCE_THRESHOLD_DB, SILENCE_PAD_MS))
+    if PYDUB_AVAILABLE and pitch_shift != 0:
+        chain += pitch_chain(pitch_shift) + [("normalize",)]
+    if not fmt.is_default_mp3():
+        chain.append(("format", fmt.spec()))
+    return make_key("gtts", text, {"lang": lang, "tld": tld, "slow": slow}, chain)
+
+def fetch_tts(text, lang=None, tld=None, slow=None):
+    """
+    Unduh audio MP3 dari Google TTS langsung ke memori (tanpa file)
+    Return: memoryview dari buffer MP3
+    """
+    lang = LANG if lang is None else lang
+    tld = TLD if tld is None else tld
+    slow = SLOW if slow is None else slow
+    with metrics.stage("fetch", backend="gtts") as stage:
+        if PARALLEL_FETCH:
+            data = gtts_parallel.fetch_tts(text, lang=lang, tld=tld, slow=slow)
+            stage.bytes = len(data)
+            return memoryview(data)
+        
+        buf = io.BytesIO()
+        gTTS(
+            text=text,
+            lang=lang,
+            tld=tld,
+            slow=slow,
+        ).write_to_fp(buf)
+        if buf.tell() == 0:
+            raise Exception("Audio dari Google TTS kosong")
+        stage.bytes = buf.tell()
+        return buf.getbuffer()
+
+def postprocess_clip(data, pitch_shift=None, output_format=None):
+    """
+    Post-processing audio MP3 di memori (trim senyap + pitch shift + normalize + encode ke format output)
+    Return: (memoryview audio hasil proses atau data asli jika tidak ada proses,
+             metadata klip untuk cache atau None)
+    """
+    pitch_shift = PITCH_SHIFT if pitch_shift is None else pitch_shift
+    fmt = resolve_format(output_format)
+    trimming = trims_silence()
+    if not PYDUB_AVAILABLE or (pitch_shift == 0 and fmt.is_default_mp3() and not trimming):
+        return data, None
+    
+    if NUMPY_AVAILABLE:
+        samples, rate = dsp.decode(data)
+        trim_info = {}
+        if trimming:
+            with metrics.stage("trim", backend="dsp"):
+                frames = samples.shape[0]
+                samples, start, end = dsp.trim(samples, rate, SILENCE_THRESHOLD_DB, SILENCE_PAD_MS)
+            trim_info = dsp.trim_info(start, end, frames, rate)
+        if pitch_shift != 0:
+            samples = dsp.process(samples, rate, semitones=pitch_shift)
+        meta = dsp.analyze(samples, rate, SILENCE_THRESHOLD_DB)
+        meta.update(trim_info)
+        return memoryview(formats.encode(samples, rate, fmt)), meta
+    
+    with metrics.stage("decode", backend="pydub"):
+        audio = audio_codec.decode_segment(data, format="mp3")
+    if pitch_shift != 0:
+        audio = pitch_segment(audio, pitch_shift)
+    return memoryview(formats.encode_segment(audio, fmt)), None
+
+def postprocess(data, pitch_shift=None, output_format=None):
+    """postprocess_clip() tanpa metadata, return: memoryview audio"""
+    return postprocess_clip(data, pitch_shift, output_format)[0]
+
+def synthesize_clip(text, lang=None, tld=None, slow=None, pitch_shift=None, output_format=None):
+    """
+    Sintesis teks sepenuhnya di memori: gTTS -> BytesIO -> post-processing -> format output
+    Return: (memoryview, metadata klip atau None)
+    """
+    return postprocess_clip(fetch_tts(text, lang, tld, slow), pitch_shift, output_format)
+
+def synthesize(text, lang=None, tld=None, slow=None, pitch_shift=None, output_format=None):
+    """
+    Sintesis teks sepenuhnya di memori (lihat synthesize_clip)
+    Return: memoryview (tulis ke file hanya jika memang dibutuhkan, lihat save_audio)
+    """
+    return synthesize_clip(text, lang, tld, slow, pitch_shift, output_format)[0]
+
+def get_audio(text, cache=None, lang=None, tld=None, slow=None, pitch_shift=None, output_format=None):
+    """
+    Ambil audio dari cache, atau sintesis lalu simpan ke cache
+    Return: (data, from_cache)
+    """
+    key = None
+    if cache is not None:
+        key = cache_key_for(text, lang, tld, slow, pitch_shift, output_format)
+        cached = cache.get(key)
+        if cached is not None:
+            return memoryview(cached), True
+    
+    with metrics.inflight("synthesis"):
+        data, meta = synthesize_clip(text, lang, tld, slow, pitch_shift, output_format)
+    if cache is not None:
+        cache.put(key, data, meta=meta)
+    return data, False
+
+def get_audio_hedged(text, cache=None):
+    """
+    get_audio() lewat backend hedged (ROUTING = "hedged")
+    Return: (data, from_cache, nama backend sumber audio)
+    """
+    import backends
+    
+    key = None
+    if cache is not None:
+        key = cache_key_for(text)
+        cached = cache.get(key)
+        if cached is not None:
+            return memoryview(cached), True, "gtts"
+    
+    with metrics.inflight("synthesis"):
+        data, source = backends.get_backend("hedged").synthesize_with_source(text)
+    if source != "gtts":
+        # Cadangan: audio sudah MP3 (diubah oleh backend hedged), tinggal trim + format output
+        return postprocess(data, pitch_shift=0), False, source
+    if cache is not None:
+        cache.put(key, data)
+    return memoryview(data), False, source
+
+def save_audio(data, path):
+    """Tulis audio ke file (satu kali tulis)"""
+    with open(path, "wb") as f:
+        f.write(data)
+
 def main():
     print("=" * 50)
     print("TEXT-TO-SPEECH dengan gTTS (Google TTS)")
@@ -106,69 +331,55 @@ def main():
         print(f"Pitch shift: {pitch_desc}")
     else:
         print(f"Pitch shift: Tidak tersedia (pydub tidak terinstall)")
+    fmt = resolve_format()
+    output_file = OUTPUT_FILE
+    if not fmt.is_default_mp3():
+        output_file = os.path.splitext(output_file)[0] + "." + fmt.extension
+        print(f"Format output: {fmt.spec()}")
+    hedged = ROUTING == "hedged"
+    if hedged:
+        print("Routing: hedged (gTTS + backend cadangan)")
     print(f"Teks: {TEXT}")
     print()
     
+    cache = open_cache() if USE_CACHE else None
+    if cache is not None:
+        metrics.register_cache(cache)
+    
     try:
-        print("Sedang mengunduh audio dari Google TTS...")
+        if cache is None or cache_key_for(TEXT) not in cache:
+            print("Sedang mengunduh audio dari Google TTS...")
+            if PYDUB_AVAILABLE and PITCH_SHIFT != 0:
+                print(f"Pitch shift akan diaplikasikan: {PITCH_SHIFT} semitones...")
         
-        # Buat objek gTTS dengan parameter yang bisa disesuaikan
-        tts = gTTS(
-            text=TEXT,
-            lang=LANG,
-            tld=TLD,
-            slow=SLOW
-        )
-        
-        # Simpan ke file temporary dulu jika perlu pitch adjustment
-        output_path = TEMP_FILE if (PYDUB_AVAILABLE and PITCH_SHIFT != 0) else OUTPUT_FILE
-        tts.save(output_path)
-        
-        # Verifikasi file
-        if not os.path.exists(output_path):
-            raise Exception("File tidak dibuat")
-        
-        file_size = os.path.getsize(output_path)
-        if file_size == 0:
-            raise Exception("File dibuat tapi kosong")
-        
-        # Apply pitch shift jika diperlukan
-        if PYDUB_AVAILABLE and PITCH_SHIFT != 0:
-            print(f"Mengaplikasikan pitch shift: {PITCH_SHIFT} semitones...")
-            if change_pitch(output_path, PITCH_SHIFT):
-                # Copy ke output file final
-                if output_path != OUTPUT_FILE:
-                    import shutil
-                    shutil.copy(output_path, OUTPUT_FILE)
-                    os.remove(output_path)  # Hapus temp file
-                print("✓ Pitch berhasil diubah")
-            else:
-                print("⚠️  Pitch shift gagal, menggunakan audio original")
-                if output_path != OUTPUT_FILE:
-                    import shutil
-                    shutil.copy(output_path, OUTPUT_FILE)
-                    os.remove(output_path)
+        # Sintesis + post-processing di memori, tulis ke file hanya sekali
+        source = "gtts"
+        if hedged:
+            data, from_cache, source = get_audio_hedged(TEXT, cache=cache)
+        else:
+            data, from_cache = get_audio(TEXT, cache=cache)
+        if len(data) == 0:
+            raise Exception("Audio kosong")
+        save_audio(data, output_file)
         
-        # Verifikasi file final
-        if os.path.exists(OUTPUT_FILE):
-            file_size = os.path.getsize(OUTPUT_FILE)
-            if file_size > 0:
-                print(f"✓ Berhasil! File tersimpan di: {OUTPUT_FILE}")
-                print(f"  Ukuran file: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
-                print()
-                print("File siap digunakan!")
-                print()
-                print("💡 TIP: Untuk mengubah parameter suara, edit bagian KONFIGURASI di atas")
-                if not PYDUB_AVAILABLE and PITCH_SHIFT != 0:
-                    print()
-                    print("⚠️  Install pydub untuk pitch control:")
-                    print("   pip install pydub")
-                    print("   Untuk Windows, install juga ffmpeg atau simpleaudio")
-                return True
-            else:
-                raise Exception("File final kosong")
+        file_size = len(data)
+        if from_cache:
+            print(f"✓ Diambil dari cache! File tersimpan di: {output_file}")
         else:
-            raise Exception("File final tidak dibuat")
+            print(f"✓ Berhasil! File tersimpan di: {output_file}")
+        print(f"  Ukuran file: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
+        if source != "gtts":
+            print(f"  ⚠️  gTTS terlambat/gagal, audio dari backend cadangan: {source}")
+        print()
+        print("File siap digunakan!")
+        print()
+        print("💡 TIP: Untuk mengubah parameter suara, edit bagian KONFIGURASI di atas")
+        if not PYDUB_AVAILABLE and PITCH_SHIFT != 0:
+            print()
+            print("⚠️  Install pydub untuk pitch control:")
+            print("   pip install pydub")
+            print("   Untuk Windows, install juga ffmpeg atau simpleaudio")
+        return True
             
     except Exception as e:
         print(f"✗ ERROR: {e}")
@@ -179,7 +390,11 @@ def main():
         print("2. Pastikan gTTS terinstall: pip install gtts")
         print("3. Cek parameter LANG, TLD, dan SLOW di konfigurasi")
         print("4. Coba jalankan lagi")
+        if not hedged:
+            print("5. Set VOICE_ROUTING=hedged agar backend cadangan (pyttsx3) dipakai saat gTTS gagal")
         return False
+    finally:
+        metrics.write_if_configured()
 
 if __name__ == "__main__":
     success = main()
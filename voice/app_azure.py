@@ -4,7 +4,8 @@ Kualitas sangat bagus dengan kontrol pitch, rate, volume native
 Membutuhkan Azure account dan API key (ada free tier)
 """
 import os
-import azure.cognitiveservices.speech as speechsdk
+
+from backends import get_backend   # SDK Azure di-import saat backend dipakai
 
 # ============================================
 # KONFIGURASI
@@ -64,48 +65,18 @@ def main():
     try:
         print("Sedang membuat audio...")
         
-        # Setup Azure Speech
-        speech_config = speechsdk.SpeechConfig(
-            subscription=AZURE_SPEECH_KEY,
-            region=AZURE_SPEECH_REGION
-        )
-        speech_config.speech_synthesis_voice_name = VOICE_NAME
-        
-        # SSML untuk kontrol penuh
-        ssml = f"""<speak version='1.0' xml:lang='id-ID'>
-            <voice xml:lang='id-ID' name='{VOICE_NAME}'>
-                <prosody rate='{RATE}' pitch='{PITCH}' volume='{VOLUME}'>
-                    {TEXT}
-                </prosody>
-            </voice>
-        </speak>"""
+        backend = get_backend("azure", key=AZURE_SPEECH_KEY, region=AZURE_SPEECH_REGION)
+        data = backend.synthesize(TEXT, voice=VOICE_NAME, rate=RATE, pitch=PITCH, volume=VOLUME)
         
-        # Create synthesizer
-        audio_config = speechsdk.audio.AudioOutputConfig(filename=OUTPUT_FILE)
-        synthesizer = speechsdk.SpeechSynthesizer(
-            speech_config=speech_config,
-            audio_config=audio_config
-        )
+        with open(OUTPUT_FILE, "wb") as f:
+            f.write(data)
         
-        # Synthesize
-        result = synthesizer.speak_ssml_async(ssml).get()
-        
-        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-            if os.path.exists(OUTPUT_FILE):
-                file_size = os.path.getsize(OUTPUT_FILE)
-                if file_size > 0:
-                    print(f"✓ Berhasil! File tersimpan di: {OUTPUT_FILE}")
-                    print(f"  Ukuran file: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
-                    print()
-                    print("💡 Azure TTS memiliki kontrol pitch, rate, dan volume native!")
-                    return True
-                else:
-                    raise Exception("File kosong")
-            else:
-                raise Exception("File tidak dibuat")
-        else:
-            cancellation_details = speechsdk.CancellationDetails(result)
-            raise Exception(f"Synthesis failed: {cancellation_details.reason}")
+        file_size = len(data)
+        print(f"✓ Berhasil! File tersimpan di: {OUTPUT_FILE}")
+        print(f"  Ukuran file: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
+        print()
+        print("💡 Azure TTS memiliki kontrol pitch, rate, dan volume native!")
+        return True
             
     except ImportError:
         print("✗ ERROR: Library azure-cognitiveservices-speech tidak terinstall!")
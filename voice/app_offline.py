@@ -2,8 +2,7 @@
 Text-to-Speech menggunakan pyttsx3 (Offline TTS)
 Tidak memerlukan koneksi internet, menggunakan suara sistem lokal
 """
-import pyttsx3
-import os
+from backends import get_backend   # pyttsx3 di-import saat backend dipakai
 
 # Konfigurasi
 TEXT = "Halo, ini adalah tes suara setelah perbaikan kode."
@@ -19,50 +18,41 @@ def main():
     try:
         print("Menginisialisasi engine TTS...")
         
-        # Inisialisasi engine
-        engine = pyttsx3.init()
+        backend = get_backend("pyttsx3")
+        from backends.pyttsx3_backend import find_voice
         
         # Cek suara yang tersedia
-        voices = engine.getProperty('voices')
+        voices = backend.list_voices()
         print(f"Suara yang tersedia: {len(voices)}")
         
         # Cari suara Indonesia jika ada
-        indonesian_voice = None
-        for voice in voices:
-            if 'indonesia' in voice.name.lower() or 'id' in voice.id.lower():
-                indonesian_voice = voice
-                print(f"  ✓ Ditemukan suara Indonesia: {voice.name}")
-                break
-        
+        indonesian_voice = find_voice(voices, "indonesia")
         if indonesian_voice:
-            engine.setProperty('voice', indonesian_voice.id)
+            print(f"  ✓ Ditemukan suara Indonesia: {indonesian_voice.name}")
         else:
             print("  ⚠ Suara Indonesia tidak ditemukan, menggunakan default")
         
-        # Set properties
-        engine.setProperty('rate', 150)  # Kecepatan bicara (words per minute)
-        engine.setProperty('volume', 1.0)  # Volume (0.0 to 1.0)
-        
         print()
         print("Sedang membuat file audio...")
         
-        # Simpan ke file
-        engine.save_to_file(TEXT, OUTPUT_FILE)
-        engine.runAndWait()
+        # Rate 150 words per minute, volume maksimal
+        data = backend.synthesize(
+            TEXT,
+            rate=150,
+            volume=1.0,
+            voice_id=indonesian_voice.id if indonesian_voice else None,
+            prefer_voice="",
+        )
         
-        # Verifikasi file
-        if os.path.exists(OUTPUT_FILE):
-            file_size = os.path.getsize(OUTPUT_FILE)
-            if file_size > 0:
-                print(f"✓ Berhasil! File tersimpan di: {OUTPUT_FILE}")
-                print(f"  Ukuran file: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
-                print()
-                print("File siap digunakan!")
-                return True
-            else:
-                raise Exception("File dibuat tapi kosong")
-        else:
-            raise Exception("File tidak dibuat")
+        with open(OUTPUT_FILE, "wb") as f:
+            f.write(data)
+        
+        file_size = len(data)
+        print(f"✓ Berhasil! File tersimpan di: {OUTPUT_FILE}")
+        print(f"  Ukuran file: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
+        print()
+        print("File siap digunakan!")
+        return True
             
     except Exception as e:
         print(f"✗ ERROR: {e}")
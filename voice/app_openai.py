@@ -4,7 +4,8 @@ Kualitas sangat bagus dengan kontrol pitch, speed, dan voice native
 Membutuhkan API key OpenAI (berbayar tapi murah)
 """
 import os
-from openai import OpenAI
+
+from backends import get_backend   # SDK openai di-import saat backend dipakai
 
 # ============================================
 # KONFIGURASI
@@ -62,33 +63,19 @@ def main():
     try:
         print("Sedang membuat audio...")
         
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        # Generate speech
-        response = client.audio.speech.create(
-            model="tts-1",  # atau "tts-1-hd" untuk kualitas lebih tinggi
-            voice=VOICE,
-            input=TEXT,
-            speed=SPEED,
-        )
+        backend = get_backend("openai", api_key=OPENAI_API_KEY)
+        data = backend.synthesize(TEXT, voice=VOICE, speed=SPEED)
         
-        # Save to file
-        response.stream_to_file(OUTPUT_FILE)
+        with open(OUTPUT_FILE, "wb") as f:
+            f.write(data)
         
-        # Verifikasi
-        if os.path.exists(OUTPUT_FILE):
-            file_size = os.path.getsize(OUTPUT_FILE)
-            if file_size > 0:
-                print(f"✓ Berhasil! File tersimpan di: {OUTPUT_FILE}")
-                print(f"  Ukuran file: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
-                print()
-                print("💡 Catatan: OpenAI TTS tidak mendukung pitch langsung,")
-                print("   tapi memiliki 6 voice berbeda yang bisa dipilih.")
-                return True
-            else:
-                raise Exception("File kosong")
-        else:
-            raise Exception("File tidak dibuat")
+        file_size = len(data)
+        print(f"✓ Berhasil! File tersimpan di: {OUTPUT_FILE}")
+        print(f"  Ukuran file: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
+        print()
+        print("💡 Catatan: OpenAI TTS tidak mendukung pitch langsung,")
+        print("   tapi memiliki 6 voice berbeda yang bisa dipilih.")
+        return True
             
     except ImportError:
         print("✗ ERROR: Library openai tidak terinstall!")
@@ -1,11 +1,27 @@
 """
 Contoh berbagai pitch dengan gTTS + pydub
 Menunjukkan bagaimana pitch mempengaruhi suara
+Dengan numpy: audio base di-decode sekali ke shared memory, lalu semua variasi
+di-render paralel di process pool (lihat render_variants)
 """
 from gtts import gTTS
 from pydub import AudioSegment
 from pydub.effects import normalize
+import audio_codec
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import io
+import json
 import os
+import time
+
+# Rantai efek di memori dengan numpy (lihat dsp.py), fallback ke pydub
+try:
+    import numpy as np
+    import dsp
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 TEXT = "Halo, ini adalah tes suara dengan berbagai pitch."
 
@@ -18,22 +34,133 @@ PITCH_EXAMPLES = [
     {"name": "Sedikit Tinggi", "semitones": +3, "output": "output_pitch_slightly_high.mp3"},
     {"name": "Tinggi (Wanita)", "semitones": +5, "output": "output_pitch_high.mp3"},
     {"name": "Sangat Tinggi (Wanita)", "semitones": +8, "output": "output_pitch_very_high.mp3"},
+    {"name": "Ramah (Cepat)", "semitones": +2, "speed": 1.1, "output": "output_pitch_friendly.mp3"},
+    {"name": "Tenang (Lambat)", "semitones": -2, "speed": 0.9, "output": "output_pitch_calm.mp3"},
 ]
 
+MANIFEST_FILE = "output_pitch_manifest.json"   # Daftar variasi + waktu render per variasi
+WORKERS = os.cpu_count() or 1                  # Jumlah proses render paralel
+
 def change_pitch(audio_file, semitones):
     """Mengubah pitch audio"""
     try:
-        audio = AudioSegment.from_mp3(audio_file)
+        if NUMPY_AVAILABLE:
+            return dsp.change_pitch(audio_file, semitones)
+        audio = audio_codec.decode_segment(audio_file, format="mp3")
         new_sample_rate = int(audio.frame_rate * (2 ** (semitones / 12.0)))
         audio_shifted = audio._spawn(audio.raw_data, overrides={"frame_rate": new_sample_rate})
         audio_shifted = audio_shifted.set_frame_rate(audio.frame_rate)
         audio_shifted = normalize(audio_shifted)
-        audio_shifted.export(audio_file, format="mp3")
+        with open(audio_file, "wb") as f:
+            f.write(audio_codec.encode_segment(audio_shifted, "mp3"))
         return True
     except Exception as e:
         print(f"    ✗ Error: {e}")
         return False
 
+# ============================================
+# RENDER PARALEL (numpy + shared memory)
+# ============================================
+_shared = {}
+
+def _attach_base(shm_name, shape, rate):
+    """Initializer worker: pasang buffer PCM base dari shared memory (tanpa copy)"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _shared["shm"] = shm
+    _shared["samples"] = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+    _shared["rate"] = rate
+
+def _render_variant(example):
+    """Render satu variasi dari buffer base bersama, return info + timing"""
+    samples, rate = _shared["samples"], _shared["rate"]
+    start = time.perf_counter()
+    processed = dsp.process(samples, rate, semitones=example["semitones"], speed=example.get("speed", 1.0))
+    process_done = time.perf_counter()
+    data = dsp.encode(processed, rate)
+    encode_done = time.perf_counter()
+    with open(example["output"], "wb") as f:
+        f.write(data)
+    return {
+        "name": example["name"],
+        "semitones": example["semitones"],
+        "speed": example.get("speed", 1.0),
+        "output": example["output"],
+        "bytes": len(data),
+        "duration_sec": processed.shape[0] / rate,
+        "process_ms": (process_done - start) * 1000,
+        "encode_ms": (encode_done - process_done) * 1000,
+        "total_ms": (time.perf_counter() - start) * 1000,
+        "pid": os.getpid(),
+    }
+
+def render_variants(base_mp3, examples, workers=None):
+    """
+    Decode base sekali, bagikan buffer PCM lewat shared memory,
+    lalu render semua variasi paralel di process pool
+    Return: manifest (dict)
+    """
+    workers = workers or WORKERS
+    wall_start = time.perf_counter()
+    samples, rate = dsp.decode(base_mp3)
+    decode_ms = (time.perf_counter() - wall_start) * 1000
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, samples.nbytes))
+    try:
+        shared = np.ndarray(samples.shape, dtype=np.float32, buffer=shm.buf)
+        shared[:] = samples
+        del shared
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_base,
+                                 initargs=(shm.name, samples.shape, rate)) as executor:
+            variants = list(executor.map(_render_variant, examples))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return {
+        "text": TEXT,
+        "sample_rate": rate,
+        "base_duration_sec": samples.shape[0] / rate,
+        "decode_ms": decode_ms,
+        "workers": workers,
+        "wall_ms": (time.perf_counter() - wall_start) * 1000,
+        "variants": variants,
+    }
+
+def main_parallel():
+    print("=" * 60)
+    print("CONTOH BERBAGAI PITCH (render paralel, decode sekali)")
+    print("=" * 60)
+    print(f"Teks: {TEXT}")
+    print()
+
+    print("1. Membuat audio base dari gTTS (di memori)...")
+    try:
+        buf = io.BytesIO()
+        gTTS(text=TEXT, lang="id", tld="co.id", slow=False).write_to_fp(buf)
+        print(f"   ✓ Audio base dibuat ({buf.tell():,} bytes)")
+    except Exception as e:
+        print(f"   ✗ Error membuat audio base: {e}")
+        return
+
+    print()
+    print(f"2. Render {len(PITCH_EXAMPLES)} variasi dengan {WORKERS} proses...")
+    print()
+    manifest = render_variants(buf.getbuffer(), PITCH_EXAMPLES)
+    for i, variant in enumerate(manifest["variants"], 1):
+        print(f"{i}. {variant['name']} ({variant['semitones']:+d} semitones, {variant['speed']:.2f}x)")
+        print(f"   ✓ {variant['output']} ({variant['bytes']:,} bytes) - "
+              f"proses {variant['process_ms']:.1f} ms, encode {variant['encode_ms']:.1f} ms")
+
+    with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    print()
+    print("=" * 60)
+    print(f"Decode base: {manifest['decode_ms']:.1f} ms, total: {manifest['wall_ms']:.1f} ms")
+    print(f"Manifest tersimpan di: {MANIFEST_FILE}")
+    print("=" * 60)
+
 def main():
     print("=" * 60)
     print("CONTOH BERBAGAI PITCH DENGAN gTTS + pydub")
@@ -115,7 +242,10 @@ if __name__ == "__main__":
         print("  Atau: pip install simpleaudio")
         exit(1)
     
-    main()
+    if NUMPY_AVAILABLE:
+        main_parallel()
+    else:
+        main()
 
 
 
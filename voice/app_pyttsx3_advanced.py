@@ -3,8 +3,7 @@ Text-to-Speech menggunakan pyttsx3 (Offline)
 Dengan kontrol rate, volume, dan voice selection
 Tidak memerlukan internet, menggunakan suara sistem
 """
-import pyttsx3
-import os
+from backends import get_backend   # pyttsx3 di-import saat backend dipakai
 
 # ============================================
 # KONFIGURASI
@@ -35,53 +34,43 @@ def main():
     
     try:
         print("Menginisialisasi engine TTS...")
-        engine = pyttsx3.init()
+        backend = get_backend("pyttsx3")
         
         # List semua suara yang tersedia
-        voices = engine.getProperty('voices')
+        voices = backend.list_voices()
         print(f"\nSuara yang tersedia: {len(voices)}")
         for i, voice in enumerate(voices):
             marker = " ← Dipilih" if (VOICE_INDEX is not None and i == VOICE_INDEX) else ""
             print(f"  {i}. {voice.name} ({voice.id}){marker}")
         
         # Set voice
+        voice_id = None
         if VOICE_INDEX is not None and 0 <= VOICE_INDEX < len(voices):
-            engine.setProperty('voice', voices[VOICE_INDEX].id)
+            voice_id = voices[VOICE_INDEX].id
             print(f"\n✓ Menggunakan suara: {voices[VOICE_INDEX].name}")
         else:
-            current_voice = engine.getProperty('voice')
-            print(f"\n✓ Menggunakan suara default: {current_voice}")
+            print("\n✓ Menggunakan suara default")
         
-        # Set rate
-        engine.setProperty('rate', RATE)
         print(f"✓ Rate: {RATE} WPM")
-        
-        # Set volume
-        engine.setProperty('volume', VOLUME)
         print(f"✓ Volume: {VOLUME * 100:.0f}%")
         
         print()
         print("Sedang membuat file audio...")
         
-        # Save to file
-        engine.save_to_file(TEXT, OUTPUT_FILE)
-        engine.runAndWait()
+        # prefer_voice="" = suara default sistem jika VOICE_INDEX tidak dipilih
+        data = backend.synthesize(TEXT, rate=RATE, volume=VOLUME, voice_id=voice_id, prefer_voice="")
         
-        # Verifikasi
-        if os.path.exists(OUTPUT_FILE):
-            file_size = os.path.getsize(OUTPUT_FILE)
-            if file_size > 0:
-                print(f"✓ Berhasil! File tersimpan di: {OUTPUT_FILE}")
-                print(f"  Ukuran file: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
-                print()
-                print("💡 Catatan: pyttsx3 tidak memiliki kontrol pitch langsung,")
-                print("   tapi Anda bisa memilih suara pria/wanita yang berbeda.")
-                print("   Untuk pitch control, gunakan Azure TTS atau OpenAI TTS.")
-                return True
-            else:
-                raise Exception("File kosong")
-        else:
-            raise Exception("File tidak dibuat")
+        with open(OUTPUT_FILE, "wb") as f:
+            f.write(data)
+        
+        file_size = len(data)
+        print(f"✓ Berhasil! File tersimpan di: {OUTPUT_FILE}")
+        print(f"  Ukuran file: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
+        print()
+        print("💡 Catatan: pyttsx3 tidak memiliki kontrol pitch langsung,")
+        print("   tapi Anda bisa memilih suara pria/wanita yang berbeda.")
+        print("   Untuk pitch control, gunakan Azure TTS atau OpenAI TTS.")
+        return True
             
     except ImportError:
         print("✗ ERROR: pyttsx3 tidak terinstall!")
@@ -0,0 +1,345 @@
+"""
+Decode/encode audio di dalam proses dengan PyAV (libav), tanpa spawn ffmpeg
+API mengikuti pydub: decode_segment() ~ AudioSegment.from_file(),
+encode_segment() ~ AudioSegment.export(), hasilnya tetap AudioSegment/bytes
+Jika PyAV tidak terinstall (atau VOICE_CODEC=pydub), otomatis kembali ke pydub
+
+Penggunaan:
+  import audio_codec
+  audio = audio_codec.decode_segment(mp3_bytes, format="mp3")
+  data = audio_codec.encode_segment(audio, format="ogg", codec="libopus", bitrate="24k")
+  rate, channels, blocks = audio_codec.decode_blocks("siaran.mp3")   # per blok, memori tetap
+  python audio_codec.py output_id_normal.mp3 --threads 4   # bandingkan PyAV vs pydub
+"""
+import argparse
+import functools
+import io
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pydub import AudioSegment
+
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
+# ============================================
+# KONFIGURASI CODEC
+# ============================================
+ENGINE = os.getenv("VOICE_CODEC", "av")   # "av" = PyAV jika terinstall, "pydub" = selalu spawn ffmpeg
+# Encoder yang lewat ffmpeg CLI walau PyAV tersedia (dipisah koma, mis. "libmp3lame"; kosong = semua di dalam proses)
+PYDUB_ENCODERS = tuple(filter(None, os.getenv("VOICE_CODEC_PYDUB_ENCODERS", "").split(",")))
+BLOCK_FRAMES = 8192   # Ukuran blok decode_blocks() (frame)
+
+# ============================================
+# CATATAN:
+# ============================================
+# - pydub menjalankan satu proses ffmpeg (+ ffprobe) untuk setiap from_file() dan
+#   export(); change_pitch = minimal dua spawn per klip. Di VPS kecil fork/exec ini
+#   bagian besar latency per klip dan makin terasa saat banyak request bersamaan
+# - PyAV memakai library libav yang sama dengan ffmpeg, tetapi di dalam proses:
+#   tanpa spawn, tanpa file sementara, dan GIL dilepas selama decode/encode
+# - Audio di antara decode dan encode selalu PCM 16-bit interleaved (AudioSegment biasa)
+# - Kombinasi format/codec di luar ENCODERS (mis. ogg + vorbis) tetap lewat pydub
+# - PYDUB_ENCODERS: default semua encode di dalam proses (server tidak butuh binary ffmpeg).
+#   libmp3lame bawaan wheel PyAV bisa lebih lambat (~70 ms vs ~50 ms untuk klip 4 detik)
+#   daripada ffmpeg CLI static; jika di mesin target begitu, set
+#   VOICE_CODEC_PYDUB_ENCODERS=libmp3lame. Tanpa binary ffmpeg di PATH tetap lewat PyAV.
+#   Cek di mesin target dengan: python audio_codec.py
+# - decode_blocks() / BlockEncoder: decode/encode bertahap untuk audio panjang (lihat
+#   dsp_blocks.py), memori tetap berapapun durasinya. Selalu lewat PyAV (juga MP3) karena
+#   ffmpeg CLI lewat pydub butuh seluruh audio di memori; tanpa PyAV kembali ke pydub utuh
+# - Install: pip install av
+# ============================================
+
+# (format container, codec pydub) -> encoder libav
+ENCODERS = {
+    ("mp3", None): "libmp3lame",
+    ("mp3", "libmp3lame"): "libmp3lame",
+    ("ogg", "libopus"): "libopus",
+    ("opus", None): "libopus",
+    ("opus", "libopus"): "libopus",
+    ("wav", None): "pcm_s16le",
+    ("wav", "pcm_s16le"): "pcm_s16le",
+}
+DEMUXERS = ("mp3", "ogg", "opus", "wav")
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+LAYOUTS = {1: "mono", 2: "stereo"}
+
+
+def engine():
+    """Engine yang aktif: "av" atau "pydub" """
+    return "av" if AV_AVAILABLE and ENGINE != "pydub" else "pydub"
+
+
+@functools.lru_cache(maxsize=4)
+def _has_binary(converter):
+    return bool(shutil.which(converter) or os.path.isfile(converter))
+
+
+def encode_engine(encoder):
+    """Engine untuk encoder libav ini: PYDUB_ENCODERS lewat ffmpeg CLI hanya jika binary-nya ada"""
+    if engine() != "av" or not encoder:
+        return "pydub"
+    if encoder in PYDUB_ENCODERS and _has_binary(AudioSegment.converter):
+        return "pydub"
+    return "av"
+
+
+def parse_bitrate(bitrate):
+    """"24k" / "1M" / 24000 -> bit per detik (int)"""
+    if isinstance(bitrate, int):
+        return bitrate
+    text = str(bitrate).strip().lower()
+    scale = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    if scale != 1:
+        text = text[:-1]
+    try:
+        return int(float(text) * scale)
+    except ValueError:
+        raise ValueError(f"Bitrate tidak valid: {bitrate}")
+
+
+def _frame_bytes(frame, channels):
+    # Buffer plane bisa lebih panjang dari data (alignment), potong sesuai jumlah sample
+    return memoryview(frame.planes[0])[:frame.samples * channels * 2]
+
+
+def _av_decode(source, format):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    with av.open(source, format=format if format in DEMUXERS else None) as container:
+        stream = container.streams.audio[0]
+        channels = stream.channels
+        rate = stream.rate
+        resampler = av.AudioResampler(format="s16", layout=stream.layout.name, rate=rate)
+        pieces = []
+        for frame in container.decode(stream):
+            for out in resampler.resample(frame):
+                pieces.append(_frame_bytes(out, channels))
+        for out in resampler.resample(None):
+            pieces.append(_frame_bytes(out, channels))
+    return AudioSegment(data=b"".join(pieces), sample_width=2, frame_rate=rate, channels=channels)
+
+
+def _add_stream(container, encoder, rate, layout, bitrate, level):
+    stream_rate = rate
+    if encoder == "libopus" and rate not in OPUS_RATES:
+        stream_rate = 48000   # Sama seperti ffmpeg CLI: resample otomatis saat encode
+    stream = container.add_stream(encoder, rate=stream_rate, layout=layout)
+    if bitrate:
+        stream.bit_rate = parse_bitrate(bitrate)
+    if level is not None:
+        stream.codec_context.options = {"compression_level": str(level)}
+    return stream
+
+
+def _encode_pcm(container, stream, pcm, rate, layout, channels):
+    samples = len(pcm) // (2 * channels)
+    if samples:
+        frame = av.AudioFrame(format="s16", layout=layout, samples=samples)
+        frame.planes[0].update(pcm)
+        frame.sample_rate = rate
+        for packet in stream.encode(frame):
+            container.mux(packet)
+
+
+def _av_encode(audio, format, encoder, bitrate, level):
+    if audio.sample_width != 2:
+        audio = audio.set_sample_width(2)
+    layout = LAYOUTS[audio.channels]
+    buf = io.BytesIO()
+    with av.open(buf, "w", format="ogg" if format == "opus" else format) as container:
+        stream = _add_stream(container, encoder, audio.frame_rate, layout, bitrate, level)
+        _encode_pcm(container, stream, audio.raw_data, audio.frame_rate, layout, audio.channels)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buf.getvalue()
+
+
+def decode_segment(source, format="mp3", via=None):
+    """
+    Decode audio ke AudioSegment 16-bit (pengganti AudioSegment.from_file)
+    source: path file, bytes, memoryview, atau file-like object
+    via: "av" / "pydub" (None = engine())
+    """
+    if (via or engine()) == "av" and AV_AVAILABLE:
+        return _av_decode(source, format)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    return AudioSegment.from_file(source, format=format)
+
+
+def encode_segment(audio, format="mp3", codec=None, bitrate=None, level=None, via=None):
+    """
+    Encode AudioSegment ke bytes (pengganti AudioSegment.export)
+    level: -compression_level encoder (opsional)
+    via: "av" / "pydub" (None = encode_engine(), lihat PYDUB_ENCODERS)
+    """
+    encoder = ENCODERS.get((format, codec))
+    via = via or encode_engine(encoder)
+    if via == "av" and AV_AVAILABLE and encoder and audio.channels in LAYOUTS:
+        return _av_encode(audio, format, encoder, bitrate, level)
+    buf = io.BytesIO()
+    parameters = ["-compression_level", str(level)] if level is not None else None
+    audio.export(buf, format=format, codec=codec, bitrate=bitrate, parameters=parameters)
+    return buf.getvalue()
+
+
+def _av_blocks(container, stream, block_bytes):
+    channels = stream.channels
+    resampler = av.AudioResampler(format="s16", layout=stream.layout.name, rate=stream.rate)
+    pending = bytearray()
+    try:
+        for frame in container.decode(stream):
+            for out in resampler.resample(frame):
+                pending += _frame_bytes(out, channels)
+            while len(pending) >= block_bytes:
+                yield bytes(pending[:block_bytes])
+                del pending[:block_bytes]
+        for out in resampler.resample(None):
+            pending += _frame_bytes(out, channels)
+        for start in range(0, len(pending), block_bytes):
+            yield bytes(pending[start:start + block_bytes])
+    finally:
+        container.close()
+
+
+def decode_blocks(source, format="mp3", block_frames=BLOCK_FRAMES):
+    """
+    Decode bertahap: return (sample rate, channels, iterator bytes PCM 16-bit interleaved)
+    Setiap blok berisi block_frames frame (blok terakhir bisa lebih pendek)
+    Dengan PyAV memori tidak tergantung panjang audio; tanpa PyAV decode utuh lalu dipotong
+    """
+    if AV_AVAILABLE and ENGINE != "pydub":
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        container = av.open(source, format=format if format in DEMUXERS else None)
+        stream = container.streams.audio[0]
+        return stream.rate, stream.channels, _av_blocks(container, stream, block_frames * 2 * stream.channels)
+    audio = decode_segment(source, format)
+    if audio.sample_width != 2:
+        audio = audio.set_sample_width(2)
+    block_bytes = block_frames * 2 * audio.channels
+    data = audio.raw_data
+    return audio.frame_rate, audio.channels, (data[i:i + block_bytes] for i in range(0, len(data), block_bytes))
+
+
+class BlockEncoder:
+    """
+    Encode bertahap ke path / file-like: write() per blok PCM 16-bit interleaved, close() untuk flush
+    Dengan PyAV setiap blok langsung di-encode dan ditulis; tanpa PyAV blok dikumpulkan
+    lalu di-export sekali lewat pydub saat close()
+    """
+
+    def __init__(self, dest, rate, channels, format="mp3", codec=None, bitrate=None, level=None):
+        self.dest = dest
+        self.rate = rate
+        self.channels = channels
+        self.format = format
+        self.codec = codec
+        self.bitrate = bitrate
+        self.level = level
+        encoder = ENCODERS.get((format, codec))
+        self._av = AV_AVAILABLE and ENGINE != "pydub" and encoder is not None and channels in LAYOUTS
+        if self._av:
+            self._layout = LAYOUTS[channels]
+            self._container = av.open(dest, "w", format="ogg" if format == "opus" else format)
+            self._stream = _add_stream(self._container, encoder, rate, self._layout, bitrate, level)
+        else:
+            self._pieces = []
+
+    def write(self, pcm):
+        if self._av:
+            _encode_pcm(self._container, self._stream, pcm, self.rate, self._layout, self.channels)
+        else:
+            self._pieces.append(bytes(pcm))
+
+    def close(self):
+        if self._av:
+            for packet in self._stream.encode(None):
+                self._container.mux(packet)
+            self._container.close()
+            return
+        audio = AudioSegment(data=b"".join(self._pieces), sample_width=2, frame_rate=self.rate, channels=self.channels)
+        data = encode_segment(audio, self.format, self.codec, self.bitrate, self.level)
+        if isinstance(self.dest, (str, os.PathLike)):
+            with open(self.dest, "wb") as f:
+                f.write(data)
+        else:
+            self.dest.write(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _timed_ms(fn, runs):
+    fn()   # Pemanasan
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def compare_engines(data, runs=10, threads=4):
+    """
+    Ukur decode MP3 dan encode MP3/Opus/WAV dengan pydub vs PyAV
+    Return: {operasi: {"pydub": ms, "av": ms, "pydub_threads": ms, "av_threads": ms}}
+    """
+    audio = decode_segment(data, "mp3")
+    operations = {
+        "decode mp3": lambda via: decode_segment(data, "mp3", via=via),
+        "encode mp3": lambda via: encode_segment(audio, "mp3", via=via),
+        "encode opus": lambda via: encode_segment(audio, "ogg", "libopus", "24k", 3, via=via),
+        "encode wav": lambda via: encode_segment(audio, "wav", via=via),
+    }
+    results = {}
+    for name, operation in operations.items():
+        results[name] = {}
+        for via in ("pydub", "av"):
+            fn = functools.partial(operation, via)
+            results[name][via] = _timed_ms(fn, runs)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                list(executor.map(lambda _: fn(), range(runs * threads)))
+            results[name][via + "_threads"] = (time.perf_counter() - start) * 1000 / (runs * threads)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan decode/encode PyAV (di dalam proses) vs pydub (spawn ffmpeg)")
+    parser.add_argument("input", nargs="?", default="output_id_normal.mp3", help="File MP3 input")
+    parser.add_argument("--runs", type=int, default=10, help="Jumlah pengulangan per operasi")
+    parser.add_argument("--threads", type=int, default=4, help="Jumlah thread untuk uji bersamaan")
+    args = parser.parse_args()
+
+    if not AV_AVAILABLE:
+        print("✗ ERROR: PyAV tidak terinstall (pip install av)")
+        return False
+    with open(args.input, "rb") as f:
+        data = f.read()
+
+    print("=" * 70)
+    print("DECODE / ENCODE: pydub (spawn ffmpeg) vs PyAV (di dalam proses)")
+    print("=" * 70)
+    print(f"Input: {args.input} ({len(data):,} bytes), {args.runs}x per operasi, {args.threads} thread")
+    print()
+    print(f"{'Operasi':14s} {'pydub':>10s} {'PyAV':>10s} {'pydub x' + str(args.threads):>12s} {'PyAV x' + str(args.threads):>12s}")
+    for name, r in compare_engines(data, args.runs, args.threads).items():
+        print(f"{name:14s} {r['pydub']:7.1f} ms {r['av']:7.1f} ms {r['pydub_threads']:9.1f} ms {r['av_threads']:9.1f} ms")
+    print()
+    print(f"💡 Encoder lewat ffmpeg CLI (VOICE_CODEC_PYDUB_ENCODERS): {', '.join(PYDUB_ENCODERS) or '-'}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
@@ -0,0 +1,122 @@
+"""
+Registry backend TTS dengan import SDK secara lazy
+Modul backend (dan SDK-nya: gtts, azure, openai, pyttsx3, edge-tts) baru
+di-import saat backend tersebut pertama kali dipakai, sehingga start-up
+proses tetap cepat
+
+Penggunaan:
+  from backends import get_backend
+  data = get_backend("gtts").synthesize("Halo")   # bytes audio
+"""
+import importlib
+import threading
+import time
+
+import metrics
+
+# Nama backend -> "modul:Class" (modul di-import saat pertama kali dipakai)
+_REGISTRY = {
+    "gtts": "backends.gtts_backend:GTTSBackend",
+    "azure": "backends.azure_backend:AzureBackend",
+    "openai": "backends.openai_backend:OpenAIBackend",
+    "pyttsx3": "backends.pyttsx3_backend:Pyttsx3Backend",
+    "edge": "backends.edge_backend:EdgeBackend",
+    "hedged": "backends.hedged_backend:HedgedBackend",
+    "stub": "backends.stub_backend:StubBackend",
+}
+
+_instances = {}
+_load_times = {}
+_lock = threading.RLock()
+
+
+class BackendError(Exception):
+    """Sintesis gagal di backend (SDK error, output kosong, dll.)"""
+
+
+class Backend:
+    """Interface dasar semua backend TTS"""
+
+    name = ""
+    extension = "mp3"   # Format audio yang dikembalikan synthesize()
+
+    def synthesize(self, text, **params):
+        """Sintesis teks, return bytes audio (format sesuai self.extension)"""
+        raise NotImplementedError
+
+    def close(self):
+        """Lepaskan resource (koneksi, engine, thread)"""
+
+    @staticmethod
+    def check_output(data):
+        """Verifikasi hasil sintesis tidak kosong"""
+        if not data:
+            raise BackendError("Audio kosong")
+        return data
+
+
+def measured_stream(name, chunks):
+    """Bungkus iterator chunk audio: catat first_byte dan synthesize (durasi + bytes)"""
+    if not metrics.ENABLED:
+        yield from chunks
+        return
+    with metrics.stage("synthesize", backend=name) as stage:
+        start = time.perf_counter()
+        size = 0
+        for chunk in chunks:
+            if not size:
+                metrics.STAGE_SECONDS.observe(time.perf_counter() - start, backend=name, stage="first_byte")
+            size += len(chunk)
+            yield chunk
+        stage.bytes = size
+
+
+def register(name, target):
+    """Daftarkan backend: target berupa "modul:Class" atau class Backend"""
+    with _lock:
+        _REGISTRY[name] = target
+        _instances.pop(name, None)
+
+
+def available():
+    """Nama semua backend terdaftar (tanpa meng-import SDK apa pun)"""
+    return sorted(_REGISTRY)
+
+
+def _load(target):
+    if not isinstance(target, str):
+        return target
+    module_name, _, class_name = target.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def get_backend(name, **config):
+    """
+    Ambil instance backend (dibuat sekali lalu dipakai ulang)
+    config: dipakai saat instance pertama kali dibuat
+    Raise KeyError jika backend tidak dikenal, ImportError jika SDK tidak terinstall
+    """
+    with _lock:
+        backend = _instances.get(name)
+        if backend is not None:
+            return backend
+        if name not in _REGISTRY:
+            raise KeyError(f"Backend tidak dikenal: {name} (tersedia: {', '.join(available())})")
+
+        start = time.perf_counter()
+        backend = _load(_REGISTRY[name])(**config)
+        _load_times[name] = time.perf_counter() - start
+        _instances[name] = backend
+        return backend
+
+
+def load_time(name):
+    """Waktu import + inisialisasi backend (detik), None jika belum dipakai"""
+    return _load_times.get(name)
+
+
+def close_all():
+    with _lock:
+        for backend in _instances.values():
+            backend.close()
+        _instances.clear()
@@ -0,0 +1,137 @@
+"""
+Backend Azure Cognitive Services TTS
+Membutuhkan AZURE_SPEECH_KEY dan AZURE_SPEECH_REGION (atau AZURE_SPEECH_HOST untuk
+endpoint lokal, mis. Speech container di ws://localhost:5000)
+
+Synthesizer disimpan di pool dan koneksinya dibuka lebih dulu (pre-connect),
+audio di-stream ke memori lewat AudioDataStream (tanpa file)
+"""
+import os
+import queue
+import threading
+from xml.sax.saxutils import escape, quoteattr
+
+import azure.cognitiveservices.speech as speechsdk
+
+from backends import Backend, BackendError, measured_stream
+
+AZURE_SPEECH_KEY = os.getenv("AZURE_SPEECH_KEY", "")
+AZURE_SPEECH_REGION = os.getenv("AZURE_SPEECH_REGION", "southeastasia")
+AZURE_SPEECH_HOST = os.getenv("AZURE_SPEECH_HOST", "")   # Kosong = endpoint Azure sesuai region
+
+VOICE_NAME = "id-ID-ArdiNeural"
+RATE = "+0%"
+PITCH = "+0Hz"
+VOLUME = "+0%"
+
+POOL_SIZE = int(os.getenv("AZURE_POOL_SIZE", "2"))   # Jumlah synthesizer hangat = batas sintesis bersamaan
+ACQUIRE_TIMEOUT = 30        # Batas waktu menunggu synthesizer bebas (detik)
+CHUNK_SIZE = 4096           # Ukuran chunk saat membaca AudioDataStream (bytes)
+OUTPUT_FORMAT = "Riff24Khz16BitMonoPcm"   # Nama anggota speechsdk.SpeechSynthesisOutputFormat
+
+
+def build_ssml(text, voice=VOICE_NAME, rate=RATE, pitch=PITCH, volume=VOLUME):
+    """SSML dengan teks dan atribut di-escape (aman untuk nama berisi &, <, ', dll.)"""
+    return (
+        "<speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' xml:lang='id-ID'>"
+        f"<voice name={quoteattr(voice)}>"
+        f"<prosody rate={quoteattr(rate)} pitch={quoteattr(pitch)} volume={quoteattr(volume)}>"
+        f"{escape(text)}"
+        "</prosody></voice></speak>"
+    )
+
+
+class SynthesizerPool:
+    """Pool synthesizer Azure dengan koneksi yang sudah dibuka"""
+
+    def __init__(self, speech_config, size=POOL_SIZE):
+        self.speech_config = speech_config
+        self.size = size
+        self._idle = queue.Queue()
+        self._connections = []
+        self._lock = threading.Lock()
+        for _ in range(size):
+            self._idle.put(self._create())
+
+    def _create(self):
+        # audio_config=None: audio tidak diputar/ditulis ke file, hanya tersedia di memori
+        synthesizer = speechsdk.SpeechSynthesizer(speech_config=self.speech_config, audio_config=None)
+        connection = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+        connection.open(True)   # Pre-connect: handshake dilakukan sekarang, bukan saat request pertama
+        with self._lock:
+            self._connections.append(connection)
+        return synthesizer
+
+    def acquire(self, timeout=ACQUIRE_TIMEOUT):
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise BackendError(f"Tidak ada synthesizer Azure yang bebas dalam {timeout} detik")
+
+    def release(self, synthesizer):
+        self._idle.put(synthesizer)
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+
+
+class AzureBackend(Backend):
+    name = "azure"
+    extension = "wav"
+
+    def __init__(self, key=None, region=None, host=None, pool_size=POOL_SIZE, output_format=OUTPUT_FORMAT):
+        self.key = key or AZURE_SPEECH_KEY
+        self.region = region or AZURE_SPEECH_REGION
+        self.host = host if host is not None else AZURE_SPEECH_HOST
+        if not self.key and not self.host:
+            raise BackendError("AZURE_SPEECH_KEY tidak ditemukan")
+
+        if self.host:
+            speech_config = speechsdk.SpeechConfig(host=self.host, subscription=self.key or None)
+        else:
+            speech_config = speechsdk.SpeechConfig(subscription=self.key, region=self.region)
+        speech_config.set_speech_synthesis_output_format(getattr(speechsdk.SpeechSynthesisOutputFormat, output_format))
+        if "Mp3" in output_format:
+            self.extension = "mp3"
+        self.pool = SynthesizerPool(speech_config, pool_size)
+
+    def stream(self, text, voice=VOICE_NAME, rate=RATE, pitch=PITCH, volume=VOLUME, chunk_size=CHUNK_SIZE):
+        """
+        Sintesis dan yield chunk audio segera setelah tersedia
+        Synthesizer dikembalikan ke pool setelah stream selesai dibaca (atau ditutup)
+        """
+        return measured_stream(self.name, self._chunks(text, voice, rate, pitch, volume, chunk_size))
+
+    def _chunks(self, text, voice, rate, pitch, volume, chunk_size):
+        synthesizer = self.pool.acquire()
+        try:
+            result = synthesizer.start_speaking_ssml_async(build_ssml(text, voice, rate, pitch, volume)).get()
+            if result.reason == speechsdk.ResultReason.Canceled:
+                details = speechsdk.CancellationDetails(result)
+                raise BackendError(f"Synthesis failed: {details.reason} {details.error_details or ''}".strip())
+
+            audio_stream = speechsdk.AudioDataStream(result)
+            buf = bytes(chunk_size)
+            while True:
+                filled = audio_stream.read_data(buf)
+                if filled == 0:
+                    break
+                yield buf[:filled]
+
+            if audio_stream.status == speechsdk.StreamStatus.Canceled:
+                details = audio_stream.cancellation_details
+                raise BackendError(f"Synthesis failed: {details.reason} {details.error_details or ''}".strip())
+        finally:
+            self.pool.release(synthesizer)
+
+    def synthesize(self, text, voice=VOICE_NAME, rate=RATE, pitch=PITCH, volume=VOLUME):
+        return self.check_output(b"".join(self.stream(text, voice, rate, pitch, volume)))
+
+    def close(self):
+        self.pool.close()
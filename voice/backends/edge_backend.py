@@ -0,0 +1,156 @@
+"""
+Backend edge-tts (Microsoft Edge online TTS)
+Memakai API async library edge-tts di dalam proses: satu event loop permanen
+di thread sendiri untuk semua request (tanpa start interpreter per klip),
+sintesis bersamaan dibatasi semaphore, audio dikembalikan sebagai bytes
+Tanpa library edge_tts (hanya CLI), kembali ke subprocess edge-tts
+
+edge-tts membuka satu websocket per sintesis (belum ada API untuk memakai ulang
+sesi); yang tetap hangat antar klip: event loop, modul + SSL context edge-tts
+"""
+import asyncio
+import concurrent.futures
+import os
+import subprocess
+import tempfile
+import threading
+
+import metrics
+from backends import Backend, BackendError, measured_stream
+
+try:
+    import aiohttp
+    import edge_tts
+    import edge_tts.communicate
+    EDGE_TTS_AVAILABLE = True
+except ImportError:
+    EDGE_TTS_AVAILABLE = False
+
+VOICE = "id-ID-GadisNeural"
+RATE = "+0%"
+PITCH = "+0Hz"
+VOLUME = "+0%"
+EDGE_WSS_URL = os.getenv("EDGE_WSS_URL", "")   # Kosong = layanan Microsoft (mis. mock_edge.py untuk uji lokal)
+MAX_CONCURRENCY = int(os.getenv("EDGE_MAX_CONCURRENCY", "4"))   # Maksimal websocket bersamaan
+TIMEOUT = 30         # Timeout per sintesis (detik)
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def shared_loop():
+    """Event loop permanen (thread daemon) untuk semua sintesis edge-tts di proses ini"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="edge-tts", daemon=True).start()
+        return _loop
+
+
+class EdgeBackend(Backend):
+    name = "edge"
+    extension = "mp3"
+
+    def __init__(self, wss_url=None, max_concurrency=MAX_CONCURRENCY, use_cli=False):
+        self.use_cli = use_cli or not EDGE_TTS_AVAILABLE
+        wss_url = wss_url if wss_url is not None else EDGE_WSS_URL
+        if wss_url and not self.use_cli:
+            # edge-tts membangun URL websocket dari konstanta modul ini
+            edge_tts.communicate.WSS_URL = wss_url
+        self.max_concurrency = max_concurrency
+        self._limit = None
+
+    async def _stream_async(self, text, voice, rate, pitch, volume):
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.max_concurrency)   # Dibuat di shared_loop()
+        async with self._limit:
+            communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch, volume=volume)
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    yield chunk["data"]
+
+    async def synthesize_async(self, text, voice=VOICE, rate=RATE, pitch=PITCH, volume=VOLUME):
+        """Sintesis di event loop pemanggil (harus shared_loop()), return bytes MP3"""
+        try:
+            chunks = [chunk async for chunk in self._stream_async(text, voice, rate, pitch, volume)]
+        except (edge_tts.exceptions.EdgeTTSException, aiohttp.ClientError) as e:
+            raise BackendError(f"edge-tts gagal: {e}")
+        return self.check_output(b"".join(chunks))
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, shared_loop())
+
+    def _run(self, coro, timeout=TIMEOUT):
+        """Jalankan coro di shared_loop() dan tunggu hasilnya; saat timeout coro ikut dibatalkan"""
+        future = self._submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()   # Tanpa ini sintesis tetap berjalan (dan memegang semaphore) di background
+            raise BackendError(f"edge-tts timeout setelah {timeout} detik")
+
+    def stream(self, text, voice=VOICE, rate=RATE, pitch=PITCH, volume=VOLUME):
+        """Yield chunk audio begitu diterima dari websocket"""
+        if self.use_cli:
+            return iter([self.synthesize(text, voice, rate, pitch, volume)])
+        return measured_stream(self.name, self._chunks(text, voice, rate, pitch, volume))
+
+    def _chunks(self, text, voice, rate, pitch, volume):
+        agen = self._stream_async(text, voice, rate, pitch, volume)
+        received = False
+        try:
+            while True:
+                try:
+                    chunk = self._run(agen.__anext__())
+                except StopAsyncIteration:
+                    break
+                received = True
+                yield chunk
+        finally:
+            try:
+                self._run(agen.aclose())
+            except RuntimeError:
+                pass   # Generator masih dibatalkan setelah timeout; ditutup saat pembatalan selesai
+        if not received:
+            raise BackendError("Audio kosong")
+
+    def synthesize(self, text, voice=VOICE, rate=RATE, pitch=PITCH, volume=VOLUME):
+        with metrics.stage("synthesize", backend=self.name) as stage:
+            if self.use_cli:
+                data = self._run_cli(text, voice, rate, pitch, volume)
+            else:
+                data = self._run(self.synthesize_async(text, voice, rate, pitch, volume))
+            stage.bytes = len(data)
+            return data
+
+    def synthesize_many(self, texts, **params):
+        """
+        Sintesis banyak teks bersamaan di event loop yang sama (dibatasi max_concurrency)
+        Return list bytes sesuai urutan texts
+        """
+        texts = list(texts)
+        if self.use_cli:
+            return [self.synthesize(text, **params) for text in texts]
+
+        async def run_all():
+            return await asyncio.gather(*(self.synthesize_async(text, **params) for text in texts))
+        return self._run(run_all(), TIMEOUT * max(1, len(texts)))
+
+    def _run_cli(self, text, voice, rate=RATE, pitch=PITCH, volume=VOLUME):
+        fd, path = tempfile.mkstemp(suffix=f".{self.extension}")
+        os.close(fd)
+        try:
+            # Argumen dikirim sebagai list (tanpa shell), aman untuk teks berisi tanda kutip;
+            # --rate=-10% ditulis dengan "=" agar nilai negatif tidak dibaca sebagai opsi
+            result = subprocess.run(
+                ["edge-tts", "--text", text, "--voice", voice, f"--rate={rate}", f"--pitch={pitch}",
+                 f"--volume={volume}", "--write-media", path],
+                capture_output=True,
+            )
+            if result.returncode != 0:
+                raise BackendError(result.stderr.decode(errors="replace").strip() or "edge-tts gagal")
+            with open(path, "rb") as f:
+                return self.check_output(f.read())
+        finally:
+            os.remove(path)
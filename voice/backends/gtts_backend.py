@@ -0,0 +1,18 @@
+"""
+Backend gTTS (Google Text-to-Speech) + pitch shift dari app.py
+"""
+import app
+import metrics
+from backends import Backend
+
+
+class GTTSBackend(Backend):
+    name = "gtts"
+    extension = "mp3"
+
+    def synthesize(self, text, lang=None, tld=None, slow=None, pitch_shift=None):
+        """Parameter None = pakai KONFIGURASI di app.py"""
+        with metrics.stage("synthesize", backend=self.name) as stage:
+            data = self.check_output(bytes(app.synthesize(text, lang, tld, slow, pitch_shift)))
+            stage.bytes = len(data)
+            return data
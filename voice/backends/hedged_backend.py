@@ -0,0 +1,185 @@
+"""
+Backend hedged: kirim request ke backend utama (gTTS), jika belum selesai
+dalam batas waktu (latency budget) kirim request yang sama ke backend cadangan,
+lalu pakai hasil yang paling dulu selesai
+Setiap backend punya circuit breaker agar backend yang sedang gagal tidak dikirimi traffic
+"""
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import metrics
+from backends import Backend, BackendError, get_backend
+
+# ============================================
+# KONFIGURASI
+# ============================================
+PRIMARY = os.getenv("VOICE_HEDGE_PRIMARY", "gtts")
+FALLBACKS = tuple(filter(None, os.getenv("VOICE_HEDGE_FALLBACKS", "pyttsx3").split(",")))
+BUDGET = float(os.getenv("VOICE_HEDGE_BUDGET_MS", "800")) / 1000   # Latency budget per backend (detik)
+FAILURE_THRESHOLD = 3     # Gagal berturut-turut sebelum circuit dibuka
+RESET_TIMEOUT = 30.0      # Detik sebelum circuit dicoba lagi (half-open)
+
+# ============================================
+# CATATAN:
+# ============================================
+# - closed    : backend normal, traffic dikirim
+# - open      : backend gagal FAILURE_THRESHOLD kali berturut-turut, traffic dihentikan
+# - half_open : setelah RESET_TIMEOUT, satu request percobaan diizinkan;
+#               berhasil -> closed, gagal -> open lagi
+# - Parameter per backend dikirim sebagai dict dengan nama backend:
+#   synthesize("Halo", gtts={"pitch_shift": 0}, pyttsx3={"rate": 160})
+# - Izin circuit breaker diminta saat backend benar-benar akan dikirimi request, agar
+#   slot percobaan half-open tidak terpakai oleh cadangan yang akhirnya tidak dijalankan
+# - Output cadangan dengan format lain (mis. WAV pyttsx3) diubah ke format backend utama
+#   (self.extension) sebelum dikembalikan, sehingga file/cache selalu satu format
+# ============================================
+
+HEDGES = metrics.counter("voice_hedges_total", "Request yang dikirim ke backend cadangan karena budget habis")
+
+
+class CircuitBreaker:
+    """Circuit breaker per backend (closed / open / half_open)"""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True jika request boleh dikirim ke backend ini"""
+        with self._lock:
+            if self.state == "open" and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = self.clock()
+                self._trial = False
+
+
+class HedgedBackend(Backend):
+    name = "hedged"
+
+    def __init__(self, primary=PRIMARY, fallbacks=FALLBACKS, budget=BUDGET,
+                 failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        """primary/fallbacks: nama backend di registry atau instance Backend"""
+        self.backends = [self._resolve(b) for b in (primary, *fallbacks)]
+        self.budget = budget
+        self.breakers = {b.name: CircuitBreaker(failure_threshold, reset_timeout) for b in self.backends}
+        self.wins = {b.name: 0 for b in self.backends}
+        self.hedges = 0
+        self.extension = self.backends[0].extension
+        self.executor = ThreadPoolExecutor(max_workers=4 * len(self.backends), thread_name_prefix="hedge")
+
+    @staticmethod
+    def _resolve(backend):
+        return get_backend(backend) if isinstance(backend, str) else backend
+
+    def _launch(self, backend, text, params):
+        breaker = self.breakers[backend.name]
+
+        def record(future):
+            # Hasil backend yang kalah balapan tetap dicatat di circuit breaker
+            if future.exception() is None:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+
+        future = self.executor.submit(self._synthesize, backend, text, params.get(backend.name, {}))
+        future.add_done_callback(record)
+        return future
+
+    def _synthesize(self, backend, text, params):
+        """Sintesis di thread pool, output diubah ke format backend utama jika berbeda"""
+        data = backend.synthesize(text, **params)
+        if backend.extension == self.extension:
+            return data
+        try:
+            import audio_codec
+        except ImportError:
+            raise BackendError(f"{backend.name}: butuh pydub untuk mengubah {backend.extension} ke {self.extension}")
+        with metrics.stage("transcode", backend=backend.name) as stage:
+            audio = audio_codec.decode_segment(data, format=backend.extension)
+            data = audio_codec.encode_segment(audio, format=self.extension)
+            stage.bytes = len(data)
+        return self.check_output(data)
+
+    def synthesize_with_source(self, text, **params):
+        """Return (bytes audio, nama backend yang menang)"""
+        running = {}
+        errors = []
+        next_index = 0
+
+        def launch_next():
+            """Kirim ke backend berikutnya yang diizinkan circuit breaker, return False jika tidak ada"""
+            nonlocal next_index
+            while next_index < len(self.backends):
+                backend = self.backends[next_index]
+                next_index += 1
+                if self.breakers[backend.name].allow():
+                    running[self._launch(backend, text, params)] = backend
+                    return True
+            return False
+
+        if not launch_next():
+            raise BackendError("Semua backend sedang tidak tersedia (circuit open)")
+        while running:
+            # Tunggu sampai ada yang selesai, atau budget habis lalu kirim ke cadangan
+            timeout = self.budget if next_index < len(self.backends) else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if launch_next():
+                    self.hedges += 1
+                    HEDGES.inc()
+                continue
+
+            for future in done:
+                backend = running.pop(future)
+                try:
+                    data = future.result()
+                except Exception as e:
+                    errors.append(f"{backend.name}: {e}")
+                    # Backend gagal: langsung coba cadangan berikutnya tanpa menunggu budget
+                    launch_next()
+                    continue
+                self.wins[backend.name] += 1
+                return data, backend.name
+
+        raise BackendError("Semua backend gagal: " + "; ".join(errors))
+
+    def synthesize(self, text, **params):
+        with metrics.stage("synthesize", backend=self.name):
+            return self.synthesize_with_source(text, **params)[0]
+
+    def stats(self):
+        return {
+            "wins": dict(self.wins),
+            "hedges": self.hedges,
+            "circuits": {name: breaker.state for name, breaker in self.breakers.items()},
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,85 @@
+"""
+Backend OpenAI TTS
+Membutuhkan OPENAI_API_KEY (OPENAI_BASE_URL untuk server lain, mis. mock lokal)
+
+Satu client OpenAI (dan connection pool HTTP-nya) dipakai bersama oleh semua
+request; audio bisa diterima per chunk lewat stream()
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+from backends import Backend, BackendError, measured_stream
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")   # Kosong = API OpenAI
+
+MODEL = "tts-1"      # atau "tts-1-hd" untuk kualitas lebih tinggi
+VOICE = "alloy"
+SPEED = 1.0
+MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "4"))   # Maksimal request bersamaan (rate limit)
+MAX_RETRIES = 3      # Retry SDK (dengan backoff) untuk 429 / 5xx / koneksi putus
+TIMEOUT = 30         # Timeout per request (detik)
+CHUNK_SIZE = 4096    # Ukuran chunk stream (bytes)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def shared_client(api_key, base_url=None):
+    """Client OpenAI bersama per (api_key, base_url), dibuat saat pertama dipakai"""
+    key = (api_key, base_url or None)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(api_key=api_key, base_url=base_url or None,
+                            max_retries=MAX_RETRIES, timeout=TIMEOUT)
+            _clients[key] = client
+        return client
+
+
+class OpenAIBackend(Backend):
+    name = "openai"
+    extension = "mp3"
+
+    def __init__(self, api_key=None, base_url=None, max_concurrency=MAX_CONCURRENCY):
+        self.api_key = api_key or OPENAI_API_KEY
+        if not self.api_key:
+            raise BackendError("OPENAI_API_KEY tidak ditemukan")
+        self.client = shared_client(self.api_key, base_url if base_url is not None else OPENAI_BASE_URL)
+        self.max_concurrency = max_concurrency
+        # Dipakai semua pemanggil backend ini, bukan hanya satu batch
+        self._limit = threading.BoundedSemaphore(max_concurrency)
+
+    def stream(self, text, voice=VOICE, speed=SPEED, model=MODEL, chunk_size=CHUNK_SIZE):
+        """Yield chunk audio begitu diterima dari server"""
+        return measured_stream(self.name, self._chunks(text, voice, speed, model, chunk_size))
+
+    def _chunks(self, text, voice, speed, model, chunk_size):
+        with self._limit:
+            with self.client.audio.speech.with_streaming_response.create(
+                    model=model, voice=voice, input=text, speed=speed, response_format=self.extension) as response:
+                received = False
+                for chunk in response.iter_bytes(chunk_size):
+                    if chunk:
+                        received = True
+                        yield chunk
+        if not received:
+            raise BackendError("Audio kosong")
+
+    def synthesize(self, text, voice=VOICE, speed=SPEED, model=MODEL):
+        return self.check_output(b"".join(self.stream(text, voice=voice, speed=speed, model=model)))
+
+    def synthesize_many(self, texts, **params):
+        """
+        Sintesis banyak teks bersamaan (dibatasi max_concurrency)
+        Return list bytes sesuai urutan texts
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        workers = min(self.max_concurrency, len(texts))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="openai-tts") as executor:
+            return list(executor.map(lambda text: self.synthesize(text, **params), texts))
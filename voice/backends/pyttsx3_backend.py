@@ -0,0 +1,235 @@
+"""
+Backend pyttsx3 (offline, memakai suara sistem)
+Engine pyttsx3 dijalankan sekali di thread khusus (OfflineWorker); job sintesis
+masuk lewat queue dan beberapa save_to_file dikumpulkan dalam satu runAndWait()
+"""
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, TimeoutError
+
+import metrics
+from backends import Backend, BackendError
+
+try:
+    import pyttsx3
+    PYTTSX3_AVAILABLE = True
+except ImportError:
+    PYTTSX3_AVAILABLE = False
+
+RATE = 150           # Kecepatan bicara (words per minute)
+VOLUME = 1.0         # Volume: 0.0 sampai 1.0
+PREFER_VOICE = "indonesia"   # Cari suara yang namanya mengandung kata ini (None = default)
+MAX_BATCH = 16       # Maksimal job per siklus runAndWait()
+TIMEOUT = 60         # Batas waktu tunggu satu job (detik)
+
+
+def find_voice(voices, prefer=PREFER_VOICE):
+    """Cari suara sesuai preferensi (nama mengandung prefer, atau id mengandung 'id')"""
+    if not prefer:
+        return None
+    for voice in voices:
+        if prefer in voice.name.lower() or 'id' in voice.id.lower():
+            return voice
+    return None
+
+
+class OfflineWorker:
+    """
+    Engine pyttsx3 yang hidup terus di satu thread
+    - pyttsx3.init() dan daftar suara hanya dilakukan sekali
+    - Job diambil dari queue; semua job yang sedang menunggu (maks MAX_BATCH)
+      di-render dalam satu siklus runAndWait()
+    - Setiap pemanggil menerima Future berisi bytes WAV; Future yang dibatalkan
+      sebelum batch-nya dimulai tidak di-render
+    engine_factory: pembuat engine (default pyttsx3.init), mis. engine palsu untuk pengujian
+    """
+
+    def __init__(self, rate=RATE, volume=VOLUME, prefer_voice=PREFER_VOICE, max_batch=MAX_BATCH,
+                 engine_factory=None):
+        if engine_factory is None:
+            if not PYTTSX3_AVAILABLE:
+                raise ImportError("pyttsx3 tidak terinstall (pip install pyttsx3)")
+            engine_factory = pyttsx3.init
+        self.engine_factory = engine_factory
+        self.rate = rate
+        self.volume = volume
+        self.prefer_voice = prefer_voice
+        self.max_batch = max_batch
+        self.voices = []
+        self.default_voice = None
+        self.batches = 0
+        self._voice_cache = {}
+        self._queue = queue.Queue()
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="pyttsx3-worker", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def resolve_voice(self, prefer):
+        """Id suara untuk preferensi (hasil pencarian di-cache)"""
+        if prefer not in self._voice_cache:
+            voice = find_voice(self.voices, prefer)
+            self._voice_cache[prefer] = voice.id if voice else None
+        return self._voice_cache[prefer]
+
+    def submit(self, text, rate=None, volume=None, voice_id=None, prefer_voice=None):
+        """
+        Antrekan job sintesis, return Future berisi bytes WAV
+        prefer_voice: None = pakai preferensi worker, "" = suara default sistem
+        """
+        if not self._thread.is_alive():
+            raise BackendError("Worker pyttsx3 sudah berhenti")
+        if voice_id is None:
+            voice_id = self.resolve_voice(prefer_voice if prefer_voice is not None else self.prefer_voice)
+        if voice_id is None:
+            voice_id = self.default_voice
+        future = Future()
+        settings = {
+            "rate": self.rate if rate is None else rate,
+            "volume": self.volume if volume is None else volume,
+            "voice": voice_id,
+        }
+        self._queue.put((text, settings, future))
+        return future
+
+    def close(self, timeout=5):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            if os.name == "nt":
+                # SAPI5 butuh COM di-inisialisasi di thread yang memakai engine
+                import comtypes
+                comtypes.CoInitialize()
+            engine = self.engine_factory()
+            self.voices = engine.getProperty('voices')
+            self.default_voice = engine.getProperty('voice')
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        current = {}
+        workdir = tempfile.mkdtemp(prefix="pyttsx3-")
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    break
+
+                # Kumpulkan job lain yang sudah menunggu menjadi satu batch
+                batch = [job]
+                stop = False
+                while len(batch) < self.max_batch:
+                    try:
+                        job = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stop = True
+                        break
+                    batch.append(job)
+
+                self._render(engine, batch, current, workdir)
+                if stop:
+                    break
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+            # Job yang tersisa di queue dibatalkan
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                # Future yang sudah dibatalkan pemanggil tidak boleh di-set lagi (InvalidStateError)
+                if job is not None and not job[2].done():
+                    job[2].set_exception(BackendError("Worker pyttsx3 dihentikan"))
+
+    def _render(self, engine, batch, current, workdir):
+        paths = []
+        for i, (text, settings, future) in enumerate(batch):
+            if not future.set_running_or_notify_cancel():
+                paths.append(None)
+                continue
+            # setProperty ikut diantrekan di engine, jadi berlaku per job sesuai urutan
+            for name, value in settings.items():
+                if value is not None and current.get(name) != value:
+                    engine.setProperty(name, value)
+                    current[name] = value
+            path = os.path.join(workdir, f"job-{self.batches}-{i}.wav")
+            engine.save_to_file(text, path)
+            paths.append(path)
+
+        try:
+            engine.runAndWait()
+            error = None
+        except Exception as e:
+            error = e
+        self.batches += 1
+
+        for (_, _, future), path in zip(batch, paths):
+            if path is None:
+                continue
+            try:
+                if error is not None:
+                    raise error
+                with open(path, "rb") as f:
+                    data = f.read()
+                if not data:
+                    raise BackendError("Audio kosong")
+                future.set_result(data)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+class Pyttsx3Backend(Backend):
+    name = "pyttsx3"
+    extension = "wav"
+
+    def __init__(self, rate=RATE, volume=VOLUME, prefer_voice=PREFER_VOICE, max_batch=MAX_BATCH,
+                 engine_factory=None):
+        self.worker = OfflineWorker(rate=rate, volume=volume, prefer_voice=prefer_voice, max_batch=max_batch,
+                                    engine_factory=engine_factory)
+
+    def list_voices(self):
+        return self.worker.voices
+
+    def submit(self, text, **params):
+        """Antrekan sintesis tanpa menunggu, return Future"""
+        return self.worker.submit(text, **params)
+
+    def synthesize(self, text, rate=None, volume=None, voice_id=None, prefer_voice=None):
+        with metrics.stage("synthesize", backend=self.name) as stage:
+            future = self.worker.submit(text, rate=rate, volume=volume, voice_id=voice_id, prefer_voice=prefer_voice)
+            data = self.check_output(self._wait([future])[0])
+            stage.bytes = len(data)
+            return data
+
+    def synthesize_many(self, texts, **params):
+        """Antrekan banyak teks sekaligus agar di-render dalam sedikit siklus runAndWait()"""
+        futures = [self.worker.submit(text, **params) for text in texts]
+        return self._wait(futures)
+
+    @staticmethod
+    def _wait(futures):
+        """Hasil semua future; saat timeout job yang belum dimulai dibatalkan agar tidak di-render sia-sia"""
+        try:
+            return [future.result(timeout=TIMEOUT) for future in futures]
+        except TimeoutError:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def close(self):
+        self.worker.close()
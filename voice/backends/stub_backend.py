@@ -0,0 +1,56 @@
+"""
+Backend stub lokal untuk pengujian: memutar ulang audio rekaman
+dengan delay dan error yang bisa diatur (tanpa internet / SDK)
+"""
+import os
+import random
+import threading
+import time
+
+import metrics
+from backends import Backend, BackendError
+
+# Audio rekaman yang diputar ulang (file contoh di folder voice/)
+REPLAY_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output_id_normal.mp3")
+
+
+class StubBackend(Backend):
+    name = "stub"
+    extension = "mp3"
+
+    def __init__(self, name="stub", delay=0.0, jitter=0.0, error_rate=0.0, fail_next=0, audio=None, seed=None):
+        """
+        delay: waktu sintesis (detik), jitter: tambahan acak 0..jitter detik
+        error_rate: peluang gagal (0.0 - 1.0), fail_next: N panggilan berikutnya pasti gagal
+        audio: bytes yang dikembalikan (default: isi REPLAY_FILE)
+        """
+        self.name = name
+        self.delay = delay
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fail_next = fail_next
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        if audio is None:
+            with open(REPLAY_FILE, "rb") as f:
+                audio = f.read()
+        self.audio = audio
+
+    def synthesize(self, text, **params):
+        with metrics.stage("synthesize", backend=self.name) as stage:
+            data = self._replay()
+            stage.bytes = len(data)
+            return data
+
+    def _replay(self):
+        with self._lock:
+            self.calls += 1
+            fail = self.fail_next > 0 or self._random.random() < self.error_rate
+            if self.fail_next > 0:
+                self.fail_next -= 1
+            delay = self.delay + self._random.random() * self.jitter
+        time.sleep(delay)
+        if fail:
+            raise BackendError(f"{self.name}: error buatan (stub)")
+        return self.check_output(self.audio)
@@ -0,0 +1,108 @@
+"""
+Benchmark: time to first byte (TTFB) Azure TTS
+Membandingkan jalur lama (SpeechConfig + synthesizer + koneksi baru per request)
+dengan pool synthesizer yang sudah pre-connect + streaming AudioDataStream
+
+Untuk pengujian lokal arahkan ke Speech container (stand-in endpoint), mis.:
+  docker run --rm -p 5000:5000 mcr.microsoft.com/azure-cognitive-services/speechservices/neural-text-to-speech ...
+  set AZURE_SPEECH_HOST=ws://localhost:5000
+
+Penggunaan:
+  python bench_azure.py
+  python bench_azure.py --requests 40 --concurrency 4
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backends.azure_backend import AZURE_SPEECH_HOST, AZURE_SPEECH_KEY, AZURE_SPEECH_REGION, AzureBackend
+
+TEXT = "Selamat siang, Budi Santoso. Selamat makan."
+REQUESTS = 20
+CONCURRENCY = 2
+
+
+def timed_stream(backend, text):
+    """Return (ttfb_ms, total_ms, bytes) untuk satu sintesis streaming"""
+    start = time.perf_counter()
+    ttfb = None
+    size = 0
+    for chunk in backend.stream(text):
+        if ttfb is None:
+            ttfb = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    return ttfb * 1000, total * 1000, size
+
+
+def cold_request(config, text):
+    """Jalur lama: config, synthesizer, dan koneksi baru untuk setiap request"""
+    start = time.perf_counter()
+    backend = AzureBackend(pool_size=1, **config)
+    try:
+        ttfb, total, size = timed_stream(backend, text)
+    finally:
+        backend.close()
+    # Waktu setup (config + handshake) ikut dihitung karena dibayar di setiap request
+    setup = (time.perf_counter() - start) * 1000 - total
+    return ttfb + setup, total + setup, size
+
+
+def run(label, fn, requests, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: fn(), range(requests)))
+    wall = time.perf_counter() - start
+
+    ttfbs = sorted(r[0] for r in results)
+    totals = sorted(r[1] for r in results)
+    p95 = ttfbs[min(len(ttfbs) - 1, int(len(ttfbs) * 0.95))]
+    print(f"{label}")
+    print(f"  TTFB   median {statistics.median(ttfbs):7.1f} ms | p95 {p95:7.1f} ms")
+    print(f"  Total  median {statistics.median(totals):7.1f} ms | {requests / wall:.1f} request/detik")
+    return statistics.median(ttfbs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TTFB Azure TTS: per-request vs pool")
+    parser.add_argument("--requests", type=int, default=REQUESTS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--text", default=TEXT)
+    args = parser.parse_args()
+
+    if not AZURE_SPEECH_KEY and not AZURE_SPEECH_HOST:
+        print("✗ ERROR: set AZURE_SPEECH_KEY (Azure) atau AZURE_SPEECH_HOST (endpoint lokal)")
+        return False
+
+    config = {"key": AZURE_SPEECH_KEY, "region": AZURE_SPEECH_REGION, "host": AZURE_SPEECH_HOST}
+    print("=" * 60)
+    print("BENCHMARK TTFB: Azure per-request vs pool pre-connect")
+    print("=" * 60)
+    print(f"Endpoint: {AZURE_SPEECH_HOST or AZURE_SPEECH_REGION}")
+    print(f"Request: {args.requests}, concurrency: {args.concurrency}")
+    print()
+
+    cold = run("Per-request (koneksi baru)", lambda: cold_request(config, args.text),
+               args.requests, args.concurrency)
+
+    start = time.perf_counter()
+    backend = AzureBackend(pool_size=args.concurrency, **config)
+    print(f"\nPool {args.concurrency} synthesizer siap dalam {(time.perf_counter() - start) * 1000:.0f} ms")
+    try:
+        pooled = run("Pool pre-connect + streaming", lambda: timed_stream(backend, args.text),
+                     args.requests, args.concurrency)
+    finally:
+        backend.close()
+
+    print()
+    print(f"Handshake: {args.requests} (per-request) vs {args.concurrency} (pool)")
+    if pooled > 0:
+        print(f"TTFB median {cold / pooled:.1f}x lebih cepat dengan pool")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
@@ -0,0 +1,421 @@
+"""
+Benchmark semua backend TTS terhadap mock server lokal (tanpa internet)
+Mengukur cold start, time to first byte (TTFB), total sintesis, throughput,
+biaya post-processing (decode, pitch, normalize, export MP3) dan peak memory,
+lalu menulis hasil JSON yang bisa dibandingkan antar commit
+
+Penggunaan:
+  python bench_backends.py -o bench_before.json
+  python bench_backends.py --backends gtts,openai --runs 50 --latency-ms 120 -o bench_after.json
+  python bench_backends.py --compare bench_before.json bench_after.json
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import backends
+from mock_edge import MockEdgeServer
+from mock_gtts import MockGTTSServer
+from mock_openai import MockSpeechServer
+
+# ============================================
+# KONFIGURASI BENCHMARK
+# ============================================
+REPLAY_FILE = "output_id_normal.mp3"   # Audio rekaman yang diputar ulang mock server
+TEXT = "Selamat siang, Budi Santoso. Lembur Anda sudah tercatat, selamat makan."
+RUNS = 30              # Jumlah sintesis per backend
+COLD_RUNS = 3          # Jumlah proses baru untuk mengukur cold start
+LATENCY_MS = 80        # Latency mock server (ms)
+JITTER_MS = 20         # Tambahan latency acak 0..JITTER_MS (ms)
+CONCURRENCY = 4        # Request bersamaan saat mengukur throughput
+PITCH_SHIFT = -7       # Semitones untuk benchmark post-processing
+THRESHOLD = 0.15       # --compare: naik > 15% dianggap regresi
+MIN_DELTA_MS = 2.0     # --compare: abaikan selisih kecil (noise) di bawah ini
+
+BACKENDS = ("stub", "gtts", "openai", "azure", "pyttsx3", "edge")
+
+# ============================================
+# CATATAN:
+# ============================================
+# - gtts dan openai memakai mock_gtts.py / mock_openai.py yang memutar ulang REPLAY_FILE
+# - azure hanya dijalankan jika AZURE_SPEECH_HOST (Speech container lokal) di-set
+# - pyttsx3 memakai engine suara sistem (memang lokal), dilewati jika tidak terinstall
+# - edge memakai mock_edge.py (websocket lokal), dilewati jika edge-tts tidak terinstall
+# - TTFB hanya berbeda dari total untuk backend yang punya stream()
+# - Peak memory diukur dengan tracemalloc (alokasi Python saja) di putaran terpisah
+# - Cold start = proses Python baru: import + inisialisasi backend + sintesis pertama
+# ============================================
+
+# Dijalankan di proses baru untuk cold start
+COLD_CODE = """
+import json, sys, time
+start = time.perf_counter()
+from backends import get_backend
+backend = get_backend(sys.argv[1], **json.loads(sys.argv[2]))
+ready = time.perf_counter()
+backend.synthesize(sys.argv[3], **json.loads(sys.argv[4]))
+done = time.perf_counter()
+backend.close()
+print(json.dumps({"init_ms": (ready - start) * 1000, "first_ms": (done - start) * 1000}))
+"""
+
+
+def percentiles(values):
+    """p50/p95/p99 (nearest-rank) + mean, dalam satuan yang sama dengan input"""
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def rank(p):
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    return {
+        "p50": round(rank(50), 3), "p95": round(rank(95), 3), "p99": round(rank(99), 3),
+        "mean": round(statistics.fmean(ordered), 3), "n": len(ordered),
+    }
+
+
+def timed_ms(fn, runs):
+    fn()   # warm-up
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def module_available(name):
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+
+def setup_scenarios(names, latency, jitter):
+    """
+    Siapkan mock server dan konfigurasi backend
+    Return: (list skenario, list server yang harus dihentikan)
+    Skenario: dict name, backend, config, params, env, atau skip (alasan)
+    """
+    scenarios = []
+    servers = []
+    for name in names:
+        scenario = {"name": name, "backend": name, "config": {}, "params": {}, "env": {}}
+        if name == "stub":
+            scenario["config"] = {"delay": latency, "jitter": jitter}
+        elif name == "gtts":
+            server = MockGTTSServer(port=0, delay=latency, jitter=jitter).start()
+            servers.append(server)
+            # pitch_shift=0: hanya jaringan + parsing; post-processing diukur terpisah
+            scenario["params"] = {"pitch_shift": 0}
+            scenario["env"] = {"GTTS_BASE_URL": server.base_url}
+        elif name == "openai":
+            server = MockSpeechServer(port=0, first_byte_delay=latency, chunk_delay=jitter / 10).start()
+            servers.append(server)
+            scenario["config"] = {"api_key": "mock", "base_url": server.base_url}
+        elif name == "azure":
+            if not os.getenv("AZURE_SPEECH_HOST"):
+                scenario["skip"] = "AZURE_SPEECH_HOST (Speech container lokal) tidak di-set"
+            elif not module_available("azure.cognitiveservices.speech"):
+                scenario["skip"] = "azure-cognitiveservices-speech tidak terinstall"
+        elif name == "pyttsx3":
+            if not module_available("pyttsx3"):
+                scenario["skip"] = "pyttsx3 tidak terinstall"
+        elif name == "edge":
+            if not module_available("edge_tts"):
+                scenario["skip"] = "edge-tts tidak terinstall"
+            else:
+                server = MockEdgeServer(port=0, delay=latency).start()
+                servers.append(server)
+                scenario["config"] = {"wss_url": server.wss_url}
+        else:
+            scenario["skip"] = "backend tidak dikenal"
+        scenarios.append(scenario)
+    return scenarios, servers
+
+
+def apply_env(env):
+    """Terapkan env skenario ke proses ini (modul yang sudah ter-import ikut disesuaikan)"""
+    os.environ.update(env)
+    if "GTTS_BASE_URL" in env:
+        import gtts_parallel
+        gtts_parallel.BASE_URL = env["GTTS_BASE_URL"]
+
+
+def measure_cold_start(scenario, text, runs):
+    env = dict(os.environ, **scenario["env"])
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", COLD_CODE, scenario["backend"], json.dumps(scenario["config"]),
+             text, json.dumps(scenario["params"])],
+            cwd=os.path.dirname(os.path.abspath(__file__)), env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "cold start gagal")
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        "init_ms": round(statistics.median(s["init_ms"] for s in samples), 3),
+        "first_synthesis_ms": round(statistics.median(s["first_ms"] for s in samples), 3),
+    }
+
+
+def synthesize_once(backend, text, params):
+    """Return (ttfb_ms, total_ms, bytes)"""
+    start = time.perf_counter()
+    if hasattr(backend, "stream"):
+        first = None
+        size = 0
+        for chunk in backend.stream(text, **params):
+            if first is None:
+                first = time.perf_counter()
+            size += len(chunk)
+    else:
+        size = len(backend.synthesize(text, **params))
+        first = None
+    end = time.perf_counter()
+    return ((first or end) - start) * 1000, (end - start) * 1000, size
+
+
+def measure_backend(scenario, text, runs, concurrency, cold_runs):
+    apply_env(scenario["env"])
+    result = {"streaming": False}
+    if cold_runs:
+        result["cold_start"] = measure_cold_start(scenario, text, cold_runs)
+
+    backend = backends.get_backend(scenario["backend"], **scenario["config"])
+    params = scenario["params"]
+    result["streaming"] = hasattr(backend, "stream")
+    synthesize_once(backend, text, params)   # warm-up (koneksi, cache suara, dll.)
+
+    ttfb, total, errors = [], [], 0
+    size = 0
+    for _ in range(runs):
+        try:
+            first_ms, total_ms, size = synthesize_once(backend, text, params)
+        except Exception:
+            errors += 1
+            continue
+        ttfb.append(first_ms)
+        total.append(total_ms)
+    result.update({"ttfb_ms": percentiles(ttfb), "total_ms": percentiles(total), "errors": errors, "bytes": size})
+
+    # Throughput: request bersamaan
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda _: backend.synthesize(text, **params), range(runs)))
+    result["throughput_rps"] = round(runs / (time.perf_counter() - start), 3)
+
+    # Peak memory (putaran terpisah agar tracemalloc tidak mengganggu latency)
+    tracemalloc.start()
+    peak = 0
+    try:
+        for _ in range(min(runs, 5)):
+            tracemalloc.reset_peak()
+            backend.synthesize(text, **params)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+    result["peak_kb"] = round(peak / 1024, 1)
+    return result
+
+
+def measure_postprocess(data, semitones, runs):
+    """Biaya tiap tahap post-processing pada audio rekaman (ms)"""
+    import app
+    if not app.PYDUB_AVAILABLE:
+        return {"skipped": "pydub tidak terinstall"}
+
+    stages = {}
+    if app.NUMPY_AVAILABLE:
+        import dsp
+        samples, rate = dsp.decode(data)
+        stages["engine"] = "numpy"
+        stages["decode"] = timed_ms(lambda: dsp.decode(data), runs)
+        stages["change_pitch"] = timed_ms(lambda: dsp.process(samples, rate, semitones=semitones, normalize=False), runs)
+        stages["normalize"] = timed_ms(lambda: dsp.process(samples, rate), runs)
+        stages["export_mp3"] = timed_ms(lambda: dsp.encode(samples, rate), runs)
+    else:
+        from pydub import AudioSegment
+        from pydub.effects import normalize
+        audio = AudioSegment.from_file(io.BytesIO(data), format="mp3")
+
+        def pitch_only():
+            rate = int(audio.frame_rate * (2 ** (semitones / 12.0)))
+            return audio._spawn(audio.raw_data, overrides={"frame_rate": rate}).set_frame_rate(audio.frame_rate)
+
+        stages["engine"] = "pydub"
+        stages["decode"] = timed_ms(lambda: AudioSegment.from_file(io.BytesIO(data), format="mp3"), runs)
+        stages["change_pitch"] = timed_ms(pitch_only, runs)
+        stages["normalize"] = timed_ms(lambda: normalize(audio), runs)
+        stages["export_mp3"] = timed_ms(lambda: audio.export(io.BytesIO(), format="mp3"), runs)
+    stages["postprocess_total"] = timed_ms(lambda: app.postprocess(data, semitones), runs)
+    return {name: (value if isinstance(value, str) else percentiles(value)) for name, value in stages.items()}
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args):
+    names = [name.strip() for name in args.backends.split(",") if name.strip()]
+    with open(REPLAY_FILE, "rb") as f:
+        replay = f.read()
+
+    report = {
+        "meta": {
+            "commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "runs": args.runs, "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+            "concurrency": args.concurrency, "text": args.text,
+        },
+        "backends": {},
+    }
+
+    scenarios, servers = setup_scenarios(names, args.latency_ms / 1000, args.jitter_ms / 1000)
+    try:
+        for scenario in scenarios:
+            name = scenario["name"]
+            if "skip" in scenario:
+                print(f"  - {name:8s} dilewati: {scenario['skip']}")
+                report["backends"][name] = {"skipped": scenario["skip"]}
+                continue
+            try:
+                result = measure_backend(scenario, args.text, args.runs, args.concurrency, args.cold_runs)
+            except Exception as e:
+                print(f"  ✗ {name:8s} gagal: {type(e).__name__}: {e}")
+                report["backends"][name] = {"skipped": f"{type(e).__name__}: {e}"}
+                continue
+            report["backends"][name] = result
+            cold = result.get("cold_start", {}).get("first_synthesis_ms")
+            print(f"  ✓ {name:8s} TTFB p50 {result['ttfb_ms']['p50']:7.1f} ms | total p50 {result['total_ms']['p50']:7.1f}"
+                  f" p95 {result['total_ms']['p95']:7.1f} p99 {result['total_ms']['p99']:7.1f} ms"
+                  f" | {result['throughput_rps']:6.1f} req/s | peak {result['peak_kb']:8.1f} KB"
+                  + (f" | cold {cold:.0f} ms" if cold is not None else ""))
+    finally:
+        backends.close_all()
+        for server in servers:
+            server.stop()
+
+    print()
+    print("Post-processing (audio rekaman):")
+    try:
+        post = measure_postprocess(replay, PITCH_SHIFT, args.runs)
+    except Exception as e:
+        post = {"skipped": f"{type(e).__name__}: {e}"}
+    report["postprocess"] = post
+    if "skipped" in post:
+        print(f"  - dilewati: {post['skipped']}")
+    else:
+        for stage, stats in post.items():
+            if isinstance(stats, dict):
+                print(f"  {stage:18s} p50 {stats['p50']:7.2f} ms | p95 {stats['p95']:7.2f} ms ({post['engine']})")
+    return report
+
+
+def flatten(report):
+    """Metrik yang dibandingkan: {nama: (nilai, lebih_besar_lebih_baik, satuan ms?)}"""
+    metrics = {}
+    for name, result in report.get("backends", {}).items():
+        if "skipped" in result:
+            continue
+        for field in ("ttfb_ms", "total_ms"):
+            for p in ("p50", "p95", "p99"):
+                if result.get(field):
+                    metrics[f"{name}.{field}.{p}"] = (result[field][p], False, True)
+        if "cold_start" in result:
+            metrics[f"{name}.cold_start_ms"] = (result["cold_start"]["first_synthesis_ms"], False, True)
+        metrics[f"{name}.throughput_rps"] = (result["throughput_rps"], True, False)
+        metrics[f"{name}.peak_kb"] = (result["peak_kb"], False, False)
+    for stage, stats in report.get("postprocess", {}).items():
+        if isinstance(stats, dict):
+            metrics[f"postprocess.{stage}.p50"] = (stats["p50"], False, True)
+    return metrics
+
+
+def compare(old_path, new_path, threshold=THRESHOLD):
+    """Bandingkan dua file hasil, return False jika ada regresi"""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print("=" * 60)
+    print(f"PERBANDINGAN: {old['meta'].get('commit') or old_path} -> {new['meta'].get('commit') or new_path}")
+    print("=" * 60)
+    old_metrics, new_metrics = flatten(old), flatten(new)
+    regressions = []
+    for name in sorted(set(old_metrics) & set(new_metrics)):
+        before, higher_better, is_ms = old_metrics[name]
+        after = new_metrics[name][0]
+        change = (after - before) / before if before else 0.0
+        worse = -change if higher_better else change
+        regressed = worse > threshold and not (is_ms and abs(after - before) < MIN_DELTA_MS)
+        marker = "✗" if regressed else ("✓" if worse < -threshold else " ")
+        print(f"  {marker} {name:38s} {before:10.2f} -> {after:10.2f} ({change * 100:+6.1f}%)")
+        if regressed:
+            regressions.append(name)
+
+    missing = sorted({name.split(".")[0] for name in set(old_metrics) - set(new_metrics)})
+    if missing:
+        print(f"  ⚠️  Tidak ada di hasil baru (dilewati?): {', '.join(missing)}")
+    print()
+    if regressions:
+        print(f"✗ {len(regressions)} regresi (> {threshold * 100:.0f}%): {', '.join(regressions)}")
+        return False
+    print(f"✓ Tidak ada regresi (> {threshold * 100:.0f}%)")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend TTS dengan mock server lokal")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Daftar backend dipisah koma")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--cold-runs", type=int, default=COLD_RUNS, help="0 = tanpa cold start")
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=JITTER_MS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--text", default=TEXT)
+    parser.add_argument("-o", "--output", help="Tulis hasil JSON ke file ini")
+    parser.add_argument("--compare", nargs=2, metavar=("LAMA", "BARU"), help="Bandingkan dua file hasil")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(*args.compare, threshold=args.threshold)
+
+    print("=" * 60)
+    print("BENCHMARK BACKEND TTS (mock server lokal)")
+    print("=" * 60)
+    print(f"Latency mock: {args.latency_ms:.0f} ms (+0..{args.jitter_ms:.0f} ms), runs: {args.runs}, "
+          f"concurrency: {args.concurrency}")
+    print()
+    report = run_benchmark(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print()
+        print(f"✓ Hasil tersimpan di: {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
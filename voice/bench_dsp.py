@@ -0,0 +1,118 @@
+"""
+Benchmark: change_pitch versi pydub vs rantai efek NumPy (dsp.py)
+Pitch memakai mode "resample" di kedua sisi agar sebanding (phase vocoder: bench_pitch.py)
+Tidak membutuhkan internet, memakai file MP3 yang sudah ada di folder ini
+
+Penggunaan:
+  python bench_dsp.py
+  python bench_dsp.py output_id_slow.mp3 --runs 20 --semitones -7
+"""
+import argparse
+import io
+import statistics
+import time
+
+from pydub import AudioSegment
+from pydub.effects import normalize
+from pydub.silence import detect_leading_silence
+
+import dsp
+
+INPUT_FILE = "output_id_normal.mp3"
+RUNS = 10
+SEMITONES = -7
+
+
+def pydub_pitch(audio, semitones):
+    """Jalur lama (sama dengan change_pitch di app.py sebelum dsp.py)"""
+    new_sample_rate = int(audio.frame_rate * (2 ** (semitones / 12.0)))
+    audio_shifted = audio._spawn(audio.raw_data, overrides={"frame_rate": new_sample_rate})
+    audio_shifted = audio_shifted.set_frame_rate(audio.frame_rate)
+    return normalize(audio_shifted)
+
+
+def pydub_full(data, semitones):
+    """Decode -> pitch -> normalize -> export MP3 dengan pydub"""
+    audio = AudioSegment.from_file(io.BytesIO(data), format="mp3")
+    buf = io.BytesIO()
+    pydub_pitch(audio, semitones).export(buf, format="mp3")
+    return buf.getvalue()
+
+
+def numpy_full(data, semitones):
+    """Decode sekali -> rantai efek NumPy -> encode sekali"""
+    samples, rate = dsp.decode(data)
+    return dsp.encode(dsp.process(samples, rate, semitones=semitones, mode="resample"), rate)
+
+
+def pydub_trim(audio, silence_db):
+    """Trim dengan pydub.silence (loop per chunk 10 ms)"""
+    start = detect_leading_silence(audio, silence_db)
+    end = len(audio) - detect_leading_silence(audio.reverse(), silence_db)
+    return audio[start:end]
+
+
+def measure(fn, runs):
+    """Jalankan fn beberapa kali, return list durasi (ms)"""
+    fn()   # warm-up
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(label, pydub_times, numpy_times):
+    p = statistics.median(pydub_times)
+    n = statistics.median(numpy_times)
+    print(f"{label}")
+    print(f"  pydub : median {p:8.2f} ms  (min {min(pydub_times):.2f} ms)")
+    print(f"  numpy : median {n:8.2f} ms  (min {min(numpy_times):.2f} ms)")
+    print(f"  → speedup {p / n:.1f}x")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark change_pitch pydub vs NumPy")
+    parser.add_argument("input", nargs="?", default=INPUT_FILE, help="File MP3 input")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--semitones", type=float, default=SEMITONES)
+    args = parser.parse_args()
+
+    with open(args.input, "rb") as f:
+        data = f.read()
+    audio = AudioSegment.from_file(io.BytesIO(data), format="mp3")
+    samples, rate = dsp.segment_to_array(audio)
+
+    print("=" * 60)
+    print("BENCHMARK change_pitch: pydub vs NumPy")
+    print("=" * 60)
+    print(f"Input: {args.input} ({len(audio) / 1000:.2f} detik, {rate} Hz, {audio.channels} ch)")
+    print(f"Semitones: {args.semitones:+g}, runs: {args.runs}")
+    print()
+
+    report(
+        "1. Efek saja (pitch + normalize, audio sudah di memori)",
+        measure(lambda: pydub_pitch(audio, args.semitones), args.runs),
+        measure(lambda: dsp.process(samples, rate, semitones=args.semitones, mode="resample"), args.runs),
+    )
+    report(
+        "2. End-to-end (decode + efek + encode MP3)",
+        measure(lambda: pydub_full(data, args.semitones), args.runs),
+        measure(lambda: numpy_full(data, args.semitones), args.runs),
+    )
+    report(
+        "3. Trim senyap awal/akhir",
+        measure(lambda: pydub_trim(audio, dsp.SILENCE_DB), args.runs),
+        measure(lambda: dsp.trim(samples, rate), args.runs),
+    )
+    trimmed, start, end = dsp.trim(samples, rate)
+    before = dsp.analyze(samples, rate)
+    after = dsp.analyze(trimmed, rate)
+    print(f"  Suara pertama terdengar: {before['start_ms']:.0f} ms -> {after['start_ms']:.0f} ms")
+    print(f"  Durasi klip: {before['duration_ms']:.0f} ms -> {after['duration_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
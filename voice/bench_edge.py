@@ -0,0 +1,108 @@
+"""
+Benchmark edge-tts: shell-out per klip (test_voice.py lama, os.system) vs
+backend di dalam proses (API async, event loop permanen, sintesis bersamaan)
+Memakai mock_edge.py (websocket lokal) agar tidak tergantung internet
+
+Penggunaan:
+  python bench_edge.py
+  python bench_edge.py --clips 20 --delay-ms 150 --concurrency 4
+"""
+import argparse
+import os
+import shlex
+import statistics
+import sys
+import tempfile
+import time
+
+from backends.edge_backend import EDGE_TTS_AVAILABLE, VOICE, EdgeBackend
+from mock_edge import MockEdgeServer
+
+TEXT = "Selamat makan Budi Santoso, semangat lemburnya"
+CLIPS = 10
+DELAY_MS = 120
+CONCURRENCY = 4
+
+# Proses baru per klip seperti `edge-tts --text ... --write-media ...`, dengan URL websocket
+# diarahkan ke mock (argumen pertama); start interpreter + import edge-tts ikut terukur
+CLI_CODE = ("import sys, edge_tts.communicate as c; c.WSS_URL = sys.argv.pop(1); "
+            "from edge_tts.util import main; main()")
+
+
+def shell_out(wss_url, text, voice, path):
+    """Cara lama test_voice.py: string perintah shell lewat os.system (rusak jika teks berisi tanda kutip)"""
+    command = (f'{shlex.quote(sys.executable)} -c "{CLI_CODE}" {shlex.quote(wss_url)} '
+               f'--text "{text}" --voice {voice} --write-media {path}')
+    if os.system(command) != 0:
+        raise RuntimeError("edge-tts gagal")
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def timed(fn, clips):
+    """Return list waktu per klip (ms)"""
+    times = []
+    for _ in range(clips):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(label, times):
+    print(f"{label}")
+    print(f"  per klip median {statistics.median(times):7.1f} ms | max {max(times):7.1f} ms")
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark edge-tts: shell-out per klip vs di dalam proses")
+    parser.add_argument("--clips", type=int, default=CLIPS)
+    parser.add_argument("--delay-ms", type=float, default=DELAY_MS, help="Latency mock websocket (ms)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--text", default=TEXT)
+    args = parser.parse_args()
+
+    if not EDGE_TTS_AVAILABLE:
+        print("✗ ERROR: edge-tts tidak terinstall (pip install edge-tts)")
+        return False
+
+    server = MockEdgeServer(port=0, delay=args.delay_ms / 1000).start()
+    print("=" * 60)
+    print("BENCHMARK edge-tts: shell-out vs di dalam proses")
+    print("=" * 60)
+    print(f"Mock: {server.wss_url} (delay {args.delay_ms:.0f} ms), {args.clips} klip")
+    print()
+
+    fd, path = tempfile.mkstemp(suffix=".mp3")
+    os.close(fd)
+    try:
+        shell = report("Shell-out (os.system, proses baru per klip)",
+                       timed(lambda: shell_out(server.wss_url, args.text, VOICE, path), args.clips))
+    finally:
+        os.remove(path)
+
+    backend = EdgeBackend(wss_url=server.wss_url, max_concurrency=args.concurrency)
+    backend.synthesize(args.text)   # Pemanasan: event loop + import
+    inproc = report("Di dalam proses (berurutan)", timed(lambda: backend.synthesize(args.text), args.clips))
+
+    start = time.perf_counter()
+    backend.synthesize_many([args.text] * args.clips)
+    wall = (time.perf_counter() - start) * 1000
+    print(f"Di dalam proses ({args.concurrency} bersamaan)")
+    print(f"  total {wall:7.1f} ms | {wall / args.clips:7.1f} ms per klip (maks {server.max_active} websocket aktif)")
+
+    name = 'Budi "Ucok" O\'Neil'
+    data = backend.synthesize(f"Selamat makan {name}")
+    print()
+    print(f"✓ Nama dengan tanda kutip ({name}): {len(data):,} bytes")
+    print(f"💡 Per klip {shell / inproc:.1f}x lebih cepat di dalam proses, "
+          f"{shell / (wall / args.clips):.1f}x dengan {args.concurrency} bersamaan")
+    server.stop()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
@@ -0,0 +1,101 @@
+"""
+Benchmark pitch shift durasi tetap (phase vocoder, dsp.py) vs trik resample lama
+Mengukur real-time factor (RTF = durasi audio / waktu proses) di satu core,
+dan mengecek nada sinus benar-benar bergeser sementara durasinya tetap
+
+Penggunaan:
+  python bench_pitch.py
+  python bench_pitch.py output_id_slow.mp3 --runs 20 --semitones -7 5 12
+"""
+import os
+
+# Satu core: BLAS/FFT numpy tidak boleh memakai thread tambahan
+for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(name, "1")
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+import dsp
+
+INPUT_FILE = "output_id_normal.mp3"
+RUNS = 10
+SEMITONES = [-7, -3, 3, 7, 12]   # -7 = PITCH_SHIFT default app.py
+MIN_RTF = 50                     # Target minimal (x realtime)
+TONE_HZ = 220
+PITCH_TOLERANCE = 0.01           # Selisih frekuensi nada maksimal 1%
+
+
+def rtf(fn, duration, runs):
+    """Median real-time factor fn() dari beberapa run"""
+    fn()   # warm-up (tabel jendela, buffer FFT)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return duration / statistics.median(times)
+
+
+def dominant_hz(samples, rate):
+    """Frekuensi puncak spektrum (bagian tengah, tanpa efek tepi)"""
+    middle = samples[len(samples) // 4: 3 * len(samples) // 4, 0]
+    spectrum = np.abs(np.fft.rfft(middle * np.hanning(len(middle))))
+    return np.fft.rfftfreq(len(middle), 1.0 / rate)[np.argmax(spectrum)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pitch shift phase vocoder (RTF satu core)")
+    parser.add_argument("input", nargs="?", default=INPUT_FILE, help="File MP3 input")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--semitones", type=float, nargs="+", default=SEMITONES)
+    args = parser.parse_args()
+
+    samples, rate = dsp.decode(args.input)
+    duration = samples.shape[0] / rate
+    n_fft, hop = dsp.vocoder_size(rate)
+
+    print("=" * 60)
+    print("BENCHMARK PITCH SHIFT: phase vocoder vs resample")
+    print("=" * 60)
+    print(f"Input: {args.input} ({duration:.2f} detik, {rate} Hz, {samples.shape[1]} ch)")
+    print(f"STFT: n_fft {n_fft}, hop {hop}, runs {args.runs}")
+    print()
+
+    ok = True
+    print("1. Real-time factor (dsp.process, termasuk normalize)")
+    for semitones in args.semitones:
+        vocoder = rtf(lambda: dsp.process(samples, rate, semitones=semitones, mode="vocoder"), duration, args.runs)
+        resample = rtf(lambda: dsp.process(samples, rate, semitones=semitones, mode="resample"), duration, args.runs)
+        marker = "✓" if vocoder >= MIN_RTF else "✗"
+        ok = ok and vocoder >= MIN_RTF
+        print(f"  {marker} {semitones:+5.1f} semitone: vocoder {vocoder:6.0f}x realtime | resample {resample:6.0f}x")
+    print()
+
+    print(f"2. Nada sinus {TONE_HZ} Hz: pitch bergeser, durasi tetap")
+    t = np.arange(rate * 2) / rate
+    tone = (0.5 * np.sin(2 * np.pi * TONE_HZ * t)).astype(np.float32).reshape(-1, 1)
+    for semitones in args.semitones:
+        expected = TONE_HZ * 2 ** (semitones / 12.0)
+        out = dsp.pitch_shift(tone, rate, semitones)
+        got = dominant_hz(out, rate)
+        same_length = abs(out.shape[0] - tone.shape[0]) <= 1
+        good = same_length and abs(got - expected) <= expected * PITCH_TOLERANCE
+        ok = ok and good
+        print(f"  {'✓' if good else '✗'} {semitones:+5.1f} semitone: {got:6.1f} Hz (target {expected:6.1f} Hz), "
+              f"{out.shape[0]:,} vs {tone.shape[0]:,} frame")
+    old = dsp.resample(tone, 2 ** (args.semitones[0] / 12.0))
+    print(f"  💡 Resample lama {args.semitones[0]:+g} semitone: {tone.shape[0] / rate:.2f} -> "
+          f"{old.shape[0] / rate:.2f} detik")
+    print()
+    print(f"Hasil: {'semua cek berhasil' if ok else 'ada cek gagal'} (target vocoder >= {MIN_RTF}x realtime)")
+    return ok
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
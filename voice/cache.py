@@ -0,0 +1,304 @@
+"""
+Cache audio di disk berbasis hash konten (content-addressed)
+Kunci dibentuk dari (engine, teks ternormalisasi, parameter suara, rantai post-processing)
+Dilengkapi eviction LRU berdasarkan total ukuran dan umur file, penulisan atomik,
+serta counter hit/miss
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# ============================================
+# KONFIGURASI CACHE
+# ============================================
+CACHE_DIR = os.getenv("VOICE_CACHE_DIR", "cache")   # Folder penyimpanan cache
+CACHE_MAX_BYTES = 200 * 1024 * 1024                  # Batas total ukuran cache (200 MB)
+CACHE_MAX_AGE = 30 * 24 * 3600                       # Umur maksimal entry (30 hari, dalam detik)
+CACHE_EXT = "mp3"                                    # Ekstensi file audio di cache
+CACHE_BACKEND = os.getenv("VOICE_CACHE_BACKEND", "files")   # "files" (satu file per klip) atau "pack" (packstore.py)
+
+# ============================================
+# CATATAN:
+# ============================================
+# - Entry yang paling lama tidak diakses dibuang lebih dulu (LRU)
+#   saat total ukuran melebihi CACHE_MAX_BYTES
+# - Entry yang lebih tua dari CACHE_MAX_AGE dianggap kadaluarsa
+# - Waktu akses terakhir disimpan sebagai mtime file, sehingga urutan
+#   LRU tetap terjaga walaupun proses di-restart
+# - Metadata klip (peak, RMS, durasi, offset awal/akhir suara, lihat dsp.analyze)
+#   disimpan sebagai file .json di samping audio dan dibaca sekali per proses
+# - CACHE_BACKEND="pack": klip disimpan di pack file + index SQLite dan dibaca
+#   sebagai memoryview dari mmap (lihat packstore.py), cocok untuk puluhan ribu klip nama
+# ============================================
+
+
+def normalize_text(text):
+    """Normalisasi teks agar variasi spasi/unicode menghasilkan kunci yang sama"""
+    text = unicodedata.normalize("NFC", text)
+    return " ".join(text.split())
+
+
+def make_key(engine, text, params=None, chain=None):
+    """
+    Buat kunci cache dari engine, teks, parameter suara dan rantai post-processing
+    chain: list langkah post-processing, contoh [("pitch", -7), ("normalize",)]
+    """
+    payload = {
+        "engine": engine,
+        "text": normalize_text(text),
+        "params": params or {},
+        "chain": [list(step) if isinstance(step, (list, tuple)) else [step] for step in (chain or [])],
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Cache audio di disk dengan eviction LRU (ukuran + umur)"""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, max_age=CACHE_MAX_AGE, ext=CACHE_EXT):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.ext = ext
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> [ukuran, waktu akses terakhir, metadata], urutan = LRU
+        self._total_bytes = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.{self.ext}")
+
+    def _meta_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _write_atomic(self, path, data):
+        """Tulis ke file sementara di folder yang sama lalu rename (atomik)"""
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _load(self):
+        """Bangun index LRU dari file yang sudah ada di disk"""
+        found = []
+        suffix = f".{self.ext}"
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(suffix):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found.append((st.st_mtime, name[: -len(suffix)], st.st_size))
+
+        found.sort()
+        for mtime, key, size in found:
+            self._entries[key] = [size, mtime, None]
+            self._total_bytes += size
+        self.evict()
+
+    def _is_expired(self, entry, now):
+        return self.max_age is not None and now - entry[1] > self.max_age
+
+    def _drop(self, key):
+        """Hapus entry dari index dan disk (harus dipanggil dengan lock)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry[0]
+        for path in (self._path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._is_expired(entry, time.time())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self):
+        """Semua key, dari yang paling lama tidak diakses"""
+        with self._lock:
+            return list(self._entries)
+
+    def path_for(self, key):
+        """Path file untuk key (tanpa membaca isinya), atau None jika tidak ada"""
+        if self.get(key, read=False) is None:
+            return None
+        return self._path(key)
+
+    def get(self, key, read=True):
+        """
+        Ambil audio dari cache
+        Return: bytes (atau True jika read=False) saat hit, None saat miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self._is_expired(entry, now):
+                self._drop(key)
+                self.misses += 1
+                return None
+            entry[1] = now
+            self._entries.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            os.utime(path, (now, now))
+            if not read:
+                with self._lock:
+                    self.hits += 1
+                return True
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            # File dihapus dari luar proses ini
+            with self._lock:
+                self._drop(key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data, meta=None):
+        """
+        Simpan audio ke cache secara atomik, lalu jalankan eviction
+        meta: dict metadata klip (opsional, lihat dsp.analyze)
+        """
+        path = self._path(key)
+        # Metadata ditulis lebih dulu agar audio yang terlihat selalu punya metadatanya
+        if meta is not None:
+            self._write_atomic(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+        else:
+            try:
+                os.remove(self._meta_path(key))   # Metadata lama tidak berlaku untuk audio baru
+            except FileNotFoundError:
+                pass
+        self._write_atomic(path, data)
+
+        now = time.time()
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[0]
+            self._entries[key] = [len(data), now, meta]
+            self._total_bytes += len(data)
+        self.evict()
+        return path
+
+    def meta(self, key):
+        """Metadata klip (dict) atau None jika tidak ada; dibaca dari disk sekali lalu disimpan di memori"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] is not None:
+                return entry[2]
+        try:
+            with open(self._meta_path(key), "rb") as f:
+                meta = json.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2] = meta
+        return meta
+
+    def set_meta(self, key, meta):
+        """Simpan metadata untuk entry yang sudah ada (mis. entry lama tanpa metadata)"""
+        with self._lock:
+            if key not in self._entries:
+                return False
+        self._write_atomic(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2] = meta
+        return True
+
+    def evict(self):
+        """Buang entry kadaluarsa, lalu entry LRU sampai total ukuran di bawah batas"""
+        now = time.time()
+        with self._lock:
+            if self.max_age is not None:
+                expired = [k for k, e in self._entries.items() if self._is_expired(e, now)]
+                for key in expired:
+                    self._drop(key)
+                    self.evictions += 1
+
+            while self.max_bytes is not None and self._total_bytes > self.max_bytes and self._entries:
+                key = next(iter(self._entries))
+                self._drop(key)
+                self.evictions += 1
+
+    def stats(self):
+        """Statistik cache: hit/miss, rasio hit, jumlah entry, total ukuran"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
+
+
+def open_cache(**kwargs):
+    """Cache sesuai CACHE_BACKEND: AudioCache (folder) atau PackStore (pack + SQLite)"""
+    if CACHE_BACKEND == "pack":
+        from packstore import PackStore
+        return PackStore(**kwargs)
+    return AudioCache(**kwargs)
+
+
+def main():
+    print("=" * 50)
+    print("STATISTIK CACHE AUDIO")
+    print("=" * 50)
+    cache = AudioCache()
+    stats = cache.stats()
+    print(f"Folder: {cache.directory}")
+    print(f"Jumlah entry: {stats['entries']}")
+    print(f"Total ukuran: {stats['bytes']:,} bytes ({stats['bytes'] / 1024 / 1024:.2f} MB)")
+    print(f"Batas ukuran: {cache.max_bytes / 1024 / 1024:.0f} MB")
+    print(f"Entry dibuang saat load: {stats['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
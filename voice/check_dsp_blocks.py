@@ -0,0 +1,140 @@
+"""
+Cek rantai efek per blok (dsp_blocks.py): hasil sama dengan jalur buffer utuh
+(dsp.process + formats.convert) dan peak memory (tracemalloc) tetap walau
+durasi input dinaikkan 10x
+
+Penggunaan:
+  python check_dsp_blocks.py
+"""
+import os
+import shutil
+import tempfile
+import tracemalloc
+import wave
+
+import numpy as np
+
+import audio_codec
+import dsp
+import dsp_blocks
+import formats
+
+RATE = 24000              # Sama dengan output gTTS
+SHORT_SECONDS = 30
+LONG_SECONDS = 300        # Siaran daftar nama akhir shift ~5 menit
+SEMITONES = -7
+OUTPUT = "wav16"          # 16 kHz mono: low-pass + resample ikut diuji
+MEMORY_SLACK = 1.15       # Peak input 10x lebih panjang boleh naik maksimal 15% (noise alokasi)
+MEMORY_LIMIT = 4 * 1024 * 1024   # Batas absolut peak per blok (bytes)
+
+results = []
+
+
+def check(label, condition, detail=""):
+    results.append(condition)
+    marker = "✓" if condition else "✗"
+    print(f"  {marker} {label}" + (f" ({detail})" if detail else ""))
+
+
+def write_speech_like(path, seconds, rate=RATE, block=RATE):
+    """WAV sintetis (nada bergeser + noise, amplitudo naik-turun) ditulis per blok"""
+    rng = np.random.default_rng(7)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        for start in range(0, seconds * rate, block):
+            t = np.arange(start, start + block) / rate
+            tone = np.sin(2 * np.pi * (180 + 40 * np.sin(t)) * t) * (0.3 + 0.25 * np.sin(t * 3))
+            samples = tone + rng.standard_normal(block) * 0.02
+            w.writeframes(dsp.to_int16(samples.astype(np.float32)).tobytes())
+
+
+def read_wav(path):
+    with wave.open(path, "rb") as w:
+        data = w.readframes(w.getnframes())
+        return np.frombuffer(data, dtype=np.int16).reshape(-1, w.getnchannels()), w.getframerate()
+
+
+def peak_memory(fn):
+    """Peak alokasi Python/NumPy (bytes) selama fn() berjalan"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def whole_buffer(path, output):
+    """Jalur lama: seluruh audio di memori"""
+    samples, rate = dsp.decode(path, format="wav")
+    out = dsp.process(samples, rate, semitones=SEMITONES)
+    out, rate = formats.convert(out, rate, formats.parse_format(output))
+    return dsp.to_int16(out), rate
+
+
+def main():
+    print("=" * 60)
+    print("CEK RANTAI EFEK PER BLOK (memori tetap)")
+    print("=" * 60)
+    tmp = tempfile.mkdtemp(prefix="dsp_blocks_")
+    try:
+        short_in = os.path.join(tmp, "short.wav")
+        long_in = os.path.join(tmp, "long.wav")
+        write_speech_like(short_in, SHORT_SECONDS)
+        write_speech_like(long_in, LONG_SECONDS)
+        print(f"Input sintetis: {SHORT_SECONDS} detik dan {LONG_SECONDS} detik @ {RATE} Hz, "
+              f"pitch {SEMITONES} semitone, output {OUTPUT}")
+        print()
+
+        print("1. Hasil sama dengan buffer utuh")
+        out_path = os.path.join(tmp, "short_out.wav")
+        stats = dsp_blocks.process_file(short_in, out_path, "wav", OUTPUT, semitones=SEMITONES, block_frames=4096)
+        blocks, rate = read_wav(out_path)
+        reference, ref_rate = whole_buffer(short_in, OUTPUT)
+        check("sample rate & panjang sama", rate == ref_rate and blocks.shape == reference.shape,
+              f"{blocks.shape[0]:,} frame @ {rate} Hz")
+        diff = int(np.abs(blocks.astype(np.int32) - reference.astype(np.int32)).max())
+        check("selisih sample maksimal 1 LSB", diff <= 1, f"{diff} LSB, {stats['blocks']} blok")
+
+        print("2. Peak memory tetap walau input 10x lebih panjang (tracemalloc)")
+        peaks = {}
+        for label, path in (("short", short_in), ("long", long_in)):
+            dest = os.path.join(tmp, f"{label}_out.wav")
+            peaks[label] = peak_memory(lambda: dsp_blocks.process_file(path, dest, "wav", OUTPUT, semitones=SEMITONES))
+        check(f"peak {LONG_SECONDS} detik <= peak {SHORT_SECONDS} detik x {MEMORY_SLACK}",
+              peaks["long"] <= peaks["short"] * MEMORY_SLACK,
+              f"{peaks['short'] / 1024:.0f} KB vs {peaks['long'] / 1024:.0f} KB")
+        check(f"peak di bawah {MEMORY_LIMIT // (1024 * 1024)} MB", peaks["long"] < MEMORY_LIMIT)
+        whole = peak_memory(lambda: whole_buffer(long_in, OUTPUT))
+        check("jauh lebih kecil dari buffer utuh", peaks["long"] * 10 < whole,
+              f"buffer utuh {whole / (1024 * 1024):.0f} MB, {whole / peaks['long']:.0f}x")
+
+        print("3. Encode/decode bertahap lewat PyAV (MP3)")
+        if audio_codec.AV_AVAILABLE:
+            mp3_peaks = {}
+            for label, path in (("short", short_in), ("long", long_in)):
+                mp3 = os.path.join(tmp, f"{label}.mp3")
+                dsp_blocks.process_file(path, mp3, "wav", "mp3", normalize=False)
+                dest = os.path.join(tmp, f"{label}_out.mp3")
+                mp3_peaks[label] = peak_memory(
+                    lambda: dsp_blocks.process_file(mp3, dest, "mp3", "mp3", semitones=SEMITONES))
+            check("peak MP3 -> MP3 tetap", mp3_peaks["long"] <= mp3_peaks["short"] * MEMORY_SLACK,
+                  f"{mp3_peaks['short'] / 1024:.0f} KB vs {mp3_peaks['long'] / 1024:.0f} KB")
+        else:
+            print("  ⚠️ PyAV tidak terinstall, dilewati (pip install av)")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print()
+    print(f"Hasil: {sum(results)}/{len(results)} cek berhasil")
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
@@ -0,0 +1,96 @@
+"""
+Cek unduh segmen gTTS paralel (gtts_parallel.py) terhadap mock server lokal
+yang meniru endpoint batchexecute Google TTS (mock_gtts.py, tanpa internet)
+
+Penggunaan:
+  python check_gtts_parallel.py
+"""
+import time
+
+import gtts_parallel
+from mock_gtts import MockGTTSServer, segment_text
+
+SEGMENT_DELAY = 0.3     # Latency stub per segmen (detik)
+MARGIN = 0.25           # Toleransi scheduling thread (detik)
+
+TEXT = (
+    "Perhatian untuk Budi Santoso dari departemen produksi. "
+    "Pengajuan lembur Anda untuk hari ini belum terdaftar di sistem, sehingga kupon makan lembur tidak dapat diberikan. "
+    "Silakan hubungi atasan Anda atau bagian personalia untuk melakukan pendaftaran lembur terlebih dahulu. "
+    "Setelah pendaftaran disetujui, silakan scan kartu Anda kembali di kiosk ini. "
+    "Terima kasih atas perhatian dan kerja samanya, selamat bekerja."
+)
+
+results = []
+
+
+def check(label, condition, detail=""):
+    results.append(condition)
+    marker = "✓" if condition else "✗"
+    print(f"  {marker} {label}" + (f" ({detail})" if detail else ""))
+
+
+def segment_audio(text):
+    """Audio palsu per segmen: isinya teks segmen, sehingga urutan bisa dicek"""
+    return f"<{text}>".encode("utf-8")
+
+
+def main():
+    print("=" * 60)
+    print("CEK UNDUH SEGMEN gTTS PARALEL (stub lokal)")
+    print("=" * 60)
+
+    server = MockGTTSServer(port=0, audio_for=segment_audio, delay=SEGMENT_DELAY).start()
+    try:
+        prepared = gtts_parallel.prepare_requests(TEXT, "id", "co.id", False, base_url=server.base_url)
+        parts = [segment_text(p.body) for p in prepared]
+        expected = b"".join(segment_audio(part) for part in parts)
+        print(f"Teks {len(TEXT)} karakter -> {len(parts)} segmen, latency stub {SEGMENT_DELAY * 1000:.0f} ms/segmen")
+        print()
+
+        print("1. Segmen disambung berurutan tanpa celah")
+        start = time.perf_counter()
+        data = gtts_parallel.fetch_tts(TEXT, lang="id", tld="co.id", base_url=server.base_url)
+        elapsed = time.perf_counter() - start
+        check("hasil = gabungan segmen sesuai urutan", data == expected, f"{len(data)} bytes")
+
+        print("2. Waktu total ~ segmen paling lambat, bukan jumlah semua segmen")
+        waves = -(-len(parts) // gtts_parallel.MAX_WORKERS)   # Segmen > MAX_WORKERS diunduh bergelombang
+        check(f"paralel ({waves} gelombang, MAX_WORKERS={gtts_parallel.MAX_WORKERS})",
+              elapsed < waves * SEGMENT_DELAY + MARGIN,
+              f"{elapsed * 1000:.0f} ms vs berurutan ~{len(parts) * SEGMENT_DELAY * 1000:.0f} ms")
+
+        print("3. Koneksi keep-alive dipakai ulang")
+        before = server.connections
+        gtts_parallel.fetch_tts(TEXT, lang="id", tld="co.id", base_url=server.base_url)
+        check("tidak ada koneksi baru di pemanggilan kedua", server.connections == before,
+              f"{server.connections - before} koneksi baru")
+
+        print("4. Error 503 di-retry dengan backoff")
+        server.fail_next = 2
+        data = gtts_parallel.fetch_tts(TEXT, lang="id", tld="co.id", base_url=server.base_url)
+        check("tetap berhasil dan berurutan", data == expected)
+
+        print("5. Timeout per segmen")
+        server.delay = 1.0
+        start = time.perf_counter()
+        try:
+            gtts_parallel.fetch_segment(prepared[0], retries=1, timeout=(1, 0.2))
+            error = None
+        except gtts_parallel.gTTSError as e:
+            error = e
+        elapsed = time.perf_counter() - start
+        check("gTTSError setelah retry habis", error is not None, f"{elapsed * 1000:.0f} ms")
+        check("tidak menunggu respons lambat", elapsed < 0.2 * 2 + gtts_parallel.BACKOFF_BASE * 2 + MARGIN)
+    finally:
+        server.stop()
+
+    print()
+    print(f"Hasil: {sum(results)}/{len(results)} cek berhasil")
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
@@ -0,0 +1,142 @@
+"""
+Cek perilaku backend hedged + circuit breaker dengan stub lokal
+(tanpa internet / SDK, delay dan error disuntikkan lewat StubBackend)
+
+Penggunaan:
+  python check_hedged.py
+"""
+import io
+import time
+import wave
+
+from backends.hedged_backend import HedgedBackend
+from backends.stub_backend import StubBackend
+
+BUDGET = 0.2        # Latency budget (detik)
+MARGIN = 0.15       # Toleransi scheduling thread (detik)
+
+results = []
+
+
+def check(label, condition, detail=""):
+    results.append(condition)
+    marker = "✓" if condition else "✗"
+    print(f"  {marker} {label}" + (f" ({detail})" if detail else ""))
+
+
+def timed(backend, text="Halo"):
+    start = time.perf_counter()
+    try:
+        data, source = backend.synthesize_with_source(text)
+    except Exception as e:
+        return None, type(e).__name__, time.perf_counter() - start
+    return data, source, time.perf_counter() - start
+
+
+def wav_bytes(seconds=0.5, rate=22050):
+    """WAV senyap kecil (format output pyttsx3)"""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buf.getvalue()
+
+
+def main():
+    print("=" * 60)
+    print("CEK HEDGED BACKEND + CIRCUIT BREAKER (stub lokal)")
+    print("=" * 60)
+
+    print("1. Backend utama cepat -> backend utama menang")
+    hedged = HedgedBackend(StubBackend("utama", delay=0.05), [StubBackend("cadangan", delay=0.05)], budget=BUDGET)
+    _, source, elapsed = timed(hedged)
+    check("pemenang = utama", source == "utama", source)
+    check("tidak ada hedge", hedged.hedges == 0)
+    hedged.close()
+
+    print("2. Backend utama lambat -> hedge ke cadangan setelah budget")
+    hedged = HedgedBackend(StubBackend("utama", delay=2.0), [StubBackend("cadangan", delay=0.05)], budget=BUDGET)
+    _, source, elapsed = timed(hedged)
+    check("pemenang = cadangan", source == "cadangan", source)
+    check("latency <= budget + cadangan", elapsed <= BUDGET + 0.05 + MARGIN, f"{elapsed * 1000:.0f} ms")
+    hedged.close()
+
+    print("3. Backend utama error -> langsung ke cadangan tanpa menunggu budget")
+    hedged = HedgedBackend(StubBackend("utama", delay=0.01, error_rate=1.0), [StubBackend("cadangan", delay=0.05)],
+                           budget=BUDGET)
+    _, source, elapsed = timed(hedged)
+    check("pemenang = cadangan", source == "cadangan", source)
+    check("latency < budget", elapsed < BUDGET, f"{elapsed * 1000:.0f} ms")
+    hedged.close()
+
+    print("4. Circuit breaker membuka setelah gagal berturut-turut")
+    primary = StubBackend("utama", delay=0.01, error_rate=1.0)
+    hedged = HedgedBackend(primary, [StubBackend("cadangan", delay=0.01)], budget=BUDGET,
+                           failure_threshold=3, reset_timeout=0.3)
+    for _ in range(3):
+        timed(hedged)
+    time.sleep(0.05)
+    check("circuit utama = open", hedged.breakers["utama"].state == "open", hedged.breakers["utama"].state)
+    calls = primary.calls
+    timed(hedged)
+    check("backend utama tidak dikirimi traffic", primary.calls == calls, f"{primary.calls} panggilan")
+
+    print("5. Half-open setelah reset timeout, pulih jika berhasil")
+    time.sleep(0.35)
+    primary.error_rate = 0.0
+    _, source, _ = timed(hedged)
+    time.sleep(0.05)
+    check("percobaan dikirim ke utama", source == "utama", source)
+    check("circuit utama = closed", hedged.breakers["utama"].state == "closed", hedged.breakers["utama"].state)
+    hedged.close()
+
+    print("6. Semua backend gagal -> error")
+    hedged = HedgedBackend(StubBackend("utama", error_rate=1.0), [StubBackend("cadangan", error_rate=1.0)],
+                           budget=BUDGET)
+    _, source, _ = timed(hedged)
+    check("BackendError", source == "BackendError", source)
+    hedged.close()
+
+    print("7. Cadangan half-open yang tidak dijalankan tidak menghabiskan slot percobaan")
+    fallback = StubBackend("cadangan", delay=0.01)
+    hedged = HedgedBackend(StubBackend("utama", delay=0.01), [fallback], budget=BUDGET,
+                           failure_threshold=1, reset_timeout=0.1)
+    hedged.breakers["cadangan"].record_failure()
+    time.sleep(0.15)   # Circuit cadangan sekarang boleh half-open
+    _, source, _ = timed(hedged)
+    check("utama menang dalam budget, cadangan tidak dipanggil", source == "utama" and fallback.calls == 0,
+          f"{fallback.calls} panggilan")
+    hedged.backends[0].delay = 2.0
+    _, source, _ = timed(hedged)
+    time.sleep(0.05)
+    check("percobaan half-open berikutnya tetap dikirim ke cadangan", source == "cadangan", source)
+    check("circuit cadangan = closed", hedged.breakers["cadangan"].state == "closed",
+          hedged.breakers["cadangan"].state)
+    hedged.close()
+
+    print("8. Output cadangan WAV diubah ke format backend utama (MP3)")
+    try:
+        import audio_codec  # noqa: F401 (butuh pydub)
+    except ImportError:
+        print("  ⚠️ pydub tidak terinstall, dilewati (pip install pydub)")
+    else:
+        fallback = StubBackend("cadangan", delay=0.01, audio=wav_bytes())
+        fallback.extension = "wav"
+        hedged = HedgedBackend(StubBackend("utama", delay=2.0), [fallback], budget=BUDGET)
+        data, source, _ = timed(hedged)
+        is_mp3 = data is not None and (data[:3] == b"ID3" or data[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"))
+        check("pemenang = cadangan, bytes MP3", source == "cadangan" and is_mp3,
+              f"{hedged.extension}, {len(data or b''):,} bytes")
+        hedged.close()
+
+    print()
+    print(f"Hasil: {sum(results)}/{len(results)} cek berhasil")
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
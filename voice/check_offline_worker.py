@@ -0,0 +1,114 @@
+"""
+Cek OfflineWorker pyttsx3 (batch per runAndWait, pembatalan job) dengan engine
+palsu lokal: tidak butuh suara sistem / pyttsx3, waktu render disuntikkan
+
+Penggunaan:
+  python check_offline_worker.py
+"""
+import threading
+import time
+from concurrent.futures import TimeoutError
+
+from backends import pyttsx3_backend
+from backends.pyttsx3_backend import Pyttsx3Backend
+
+RENDER_DELAY = 0.4    # Durasi satu siklus runAndWait() engine palsu (detik)
+WAIT_TIMEOUT = 0.1    # TIMEOUT per job selama cek timeout (detik)
+
+results = []
+
+
+def check(label, condition, detail=""):
+    results.append(condition)
+    marker = "✓" if condition else "✗"
+    print(f"  {marker} {label}" + (f" ({detail})" if detail else ""))
+
+
+class FakeEngine:
+    """Meniru API engine pyttsx3 yang dipakai OfflineWorker; save_to_file ditulis saat runAndWait()"""
+
+    def __init__(self, delay=RENDER_DELAY):
+        self.delay = delay
+        self.pending = []
+        self.rendered = []
+        self.started = threading.Event()
+
+    def getProperty(self, name):
+        return [] if name == "voices" else "default"
+
+    def setProperty(self, name, value):
+        pass
+
+    def save_to_file(self, text, path):
+        self.pending.append((text, path))
+
+    def runAndWait(self):
+        self.started.set()
+        time.sleep(self.delay)
+        for text, path in self.pending:
+            with open(path, "wb") as f:
+                f.write(b"RIFF" + text.encode("utf-8"))
+            self.rendered.append(text)
+        self.pending = []
+
+
+def main():
+    print("=" * 60)
+    print("CEK OFFLINE WORKER pyttsx3 (engine palsu)")
+    print("=" * 60)
+
+    print("1. Job yang menunggu dirender dalam satu siklus runAndWait()")
+    engine = FakeEngine(delay=0.05)
+    backend = Pyttsx3Backend(engine_factory=lambda: engine)
+    data = backend.synthesize_many(["Budi", "Siti", "Ani"])
+    check("hasil sesuai urutan", data == [b"RIFFBudi", b"RIFFSiti", b"RIFFAni"])
+    check("maksimal 2 siklus", backend.worker.batches <= 2, f"{backend.worker.batches} siklus")
+    backend.close()
+
+    print("2. Job yang dibatalkan selagi menunggu di queue tidak dirender")
+    engine = FakeEngine()
+    backend = Pyttsx3Backend(engine_factory=lambda: engine)
+    busy = backend.submit("Sibuk")
+    engine.started.wait()
+    queued = backend.submit("Dibatalkan")
+    check("cancel() berhasil", queued.cancel())
+    busy.result(timeout=5)
+    backend.synthesize("Berikutnya")
+    check("job batal dilewati", "Dibatalkan" not in engine.rendered, ", ".join(engine.rendered))
+    backend.close()
+
+    print("3. Timeout synthesize() membatalkan job-nya")
+    engine = FakeEngine()
+    backend = Pyttsx3Backend(engine_factory=lambda: engine)
+    original = pyttsx3_backend.TIMEOUT
+    pyttsx3_backend.TIMEOUT = WAIT_TIMEOUT
+    try:
+        busy = backend.submit("Sibuk")
+        engine.started.wait()
+        try:
+            backend.synthesize("Terlambat")
+            timed_out = False
+        except TimeoutError:
+            timed_out = True
+        check("TimeoutError", timed_out)
+        try:
+            backend.synthesize_many(["Terlambat 1", "Terlambat 2"])
+        except TimeoutError:
+            pass
+    finally:
+        pyttsx3_backend.TIMEOUT = original
+    busy.result(timeout=5)
+    backend.synthesize("Berikutnya")
+    late = [text for text in engine.rendered if text.startswith("Terlambat")]
+    check("job yang ditinggal tidak dirender", not late, ", ".join(engine.rendered))
+    backend.close()
+
+    print()
+    print(f"Hasil: {sum(results)}/{len(results)} cek berhasil")
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
@@ -0,0 +1,88 @@
+"""
+Cek backend openai terhadap mock server lokal (mock_openai.py)
+Tanpa internet / API key asli: client bersama, streaming chunk, batch
+dengan batas concurrency, dan retry saat rate limit (429)
+
+Penggunaan:
+  python check_openai.py
+"""
+import time
+
+from backends.openai_backend import OpenAIBackend
+from mock_openai import MockSpeechServer
+
+FIRST_BYTE_DELAY = 0.05
+CHUNK_DELAY = 0.02
+CONCURRENCY = 3
+BATCH = 9
+
+results = []
+
+
+def check(label, condition, detail=""):
+    results.append(condition)
+    marker = "✓" if condition else "✗"
+    print(f"  {marker} {label}" + (f" ({detail})" if detail else ""))
+
+
+def main():
+    print("=" * 60)
+    print("CEK BACKEND OPENAI (mock server lokal)")
+    print("=" * 60)
+
+    server = MockSpeechServer(port=0, first_byte_delay=FIRST_BYTE_DELAY, chunk_delay=CHUNK_DELAY).start()
+    try:
+        backend = OpenAIBackend(api_key="mock", base_url=server.base_url, max_concurrency=CONCURRENCY)
+
+        print("1. Audio utuh sama dengan yang dikirim server")
+        data = backend.synthesize("Halo")
+        check("bytes identik", data == server.audio, f"{len(data):,} bytes")
+
+        print("2. Chunk pertama datang sebelum audio selesai dikirim")
+        start = time.perf_counter()
+        ttfb = None
+        chunks = 0
+        for _ in backend.stream("Selamat makan"):
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+            chunks += 1
+        total = time.perf_counter() - start
+        check("beberapa chunk", chunks > 1, f"{chunks} chunk")
+        check("TTFB jauh di bawah total", ttfb < total / 2, f"{ttfb * 1000:.0f} ms vs {total * 1000:.0f} ms")
+
+        print("3. Client dan koneksi HTTP dipakai ulang")
+        other = OpenAIBackend(api_key="mock", base_url=server.base_url)
+        check("client sama untuk instance lain", other.client is backend.client)
+        before = server.connections
+        for i in range(5):
+            backend.synthesize(f"Ulang {i}")
+        check("tidak ada koneksi baru untuk request berurutan", server.connections == before,
+              f"{server.connections - before} koneksi baru")
+
+        print("4. Batch bersamaan dibatasi semaphore")
+        server.max_active = 0
+        server.inputs.clear()
+        texts = [f"Karyawan {i}" for i in range(BATCH)]
+        start = time.perf_counter()
+        batch = backend.synthesize_many(texts)
+        elapsed = time.perf_counter() - start
+        check("semua hasil lengkap", len(batch) == BATCH and all(b == server.audio for b in batch))
+        check(f"concurrency <= {CONCURRENCY}", server.max_active <= CONCURRENCY, f"maks {server.max_active}")
+        check("benar-benar paralel", server.max_active > 1, f"{elapsed * 1000:.0f} ms")
+
+        print("5. Rate limit (429) di-retry oleh client")
+        server.rate_limit_first = server.requests + 1
+        data = backend.synthesize("Setelah 429")
+        check("berhasil setelah retry", data == server.audio)
+    finally:
+        server.stop()
+
+    print()
+    print(f"Hasil: {sum(results)}/{len(results)} cek berhasil")
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
@@ -0,0 +1,479 @@
+"""
+Rantai efek audio di memori dengan NumPy
+Audio di-decode sekali ke buffer float32, lalu pitch, speed, gain dan
+normalisasi peak diterapkan sebagai operasi vektor dalam satu rantai,
+kemudian di-encode sekali
+Pengganti change_pitch versi pydub yang decode/export berulang kali
+Pitch shift default memakai phase vocoder (durasi tetap), lihat PITCH_MODE
+"""
+import functools
+import math
+import os
+import threading
+
+import numpy as np
+from pydub import AudioSegment
+
+import audio_codec
+import metrics
+
+# ============================================
+# KONFIGURASI DEFAULT
+# ============================================
+HEADROOM_DB = 0.1     # Headroom normalisasi peak (sama dengan default pydub.effects.normalize)
+SILENCE_DB = -50.0    # Level di bawah ini dianggap senyap saat mencari awal/akhir suara (dBFS)
+TRIM_PAD_MS = 30      # Senyap yang disisakan di awal/akhir setelah trim (ms)
+# "vocoder" = pitch berubah, durasi & tempo tetap (phase vocoder)
+# "resample" = trik lama: pitch dan durasi ikut berubah (lebih cepat, suara melambat/"berat")
+PITCH_MODE = os.getenv("VOICE_PITCH_MODE", "vocoder")
+VOCODER_WINDOW_MS = 40   # Panjang jendela FFT phase vocoder (dibulatkan ke pangkat 2)
+VOCODER_OVERLAP = 4      # Jendela per hop (hop = n_fft / 4, overlap 75%)
+VOCODER_BATCH = 32768    # Frame input per potongan STFT (membatasi memori sementara)
+TWO_PI = np.float32(2 * np.pi)
+
+# ============================================
+# CATATAN:
+# ============================================
+# - semitones (PITCH_MODE="vocoder"): audio di-time-stretch dengan faktor 2 ** (semitones / 12)
+#   lewat phase vocoder lalu di-resample dengan faktor yang sama, sehingga pitch berubah
+#   tetapi durasi tetap. PITCH_MODE="resample" = trik change_pitch lama (pitch DAN durasi berubah)
+# - Phase vocoder: STFT semua frame sekaligus (jendela Hann & tabel frekuensi dihitung sekali,
+#   buffer FFT dipakai ulang), fase disambung per bin dengan cumsum, plus identity phase
+#   locking (fase bin mengikuti puncak spektrum terdekat) agar suara tidak "bergema"
+# - speed: faktor kecepatan tambahan (1.0 = normal, 1.2 = 20% lebih cepat)
+# - gain_db diterapkan setelah normalisasi peak
+# - Samples disimpan sebagai array float32 berbentuk (frames, channels), rentang -1.0 s/d 1.0
+# - analyze() dijalankan sekali saat klip dibuat; hasilnya disimpan bersama klip di cache
+#   sehingga normalisasi/penyamaan loudness berikutnya cukup satu perkalian gain
+# - trim() memotong senyap awal/akhir (gTTS/pyttsx3 biasanya diawali beberapa ratus ms
+#   senyap); dijalankan sekali saat klip dibuat, offset potongannya ikut disimpan
+# ============================================
+
+_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def segment_to_array(audio):
+    """AudioSegment -> (samples float32 (frames, channels), frame_rate)"""
+    dtype = _DTYPES[audio.sample_width]
+    samples = np.frombuffer(audio.raw_data, dtype=dtype).astype(np.float32)
+    samples *= 1.0 / float(np.iinfo(dtype).max + 1)
+    return samples.reshape(-1, audio.channels), audio.frame_rate
+
+
+def array_to_segment(samples, rate):
+    """(samples float32, frame_rate) -> AudioSegment 16-bit"""
+    pcm = to_int16(samples)
+    return AudioSegment(data=pcm.tobytes(), sample_width=2, frame_rate=rate, channels=pcm.shape[1])
+
+
+def to_int16(samples):
+    """Konversi float32 -> int16 dengan clipping"""
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    return (np.clip(samples, -1.0, 32767.0 / 32768.0) * 32768.0).astype(np.int16)
+
+
+def decode(source, format="mp3"):
+    """
+    Decode audio sekali ke buffer NumPy
+    source: path file, bytes, atau file-like object
+    """
+    with metrics.stage("decode", backend="dsp"):
+        return segment_to_array(audio_codec.decode_segment(source, format=format))
+
+
+def encode(samples, rate, format="mp3", codec=None, bitrate=None, level=None):
+    """Encode buffer NumPy sekali ke bytes (lihat audio_codec.encode_segment)"""
+    with metrics.stage("encode", backend="dsp") as stage:
+        data = audio_codec.encode_segment(array_to_segment(samples, rate), format, codec, bitrate, level)
+        stage.bytes = len(data)
+        return data
+
+
+def to_db(value):
+    """Amplitudo linear (0..1) -> dBFS, None untuk senyap total"""
+    return round(20 * math.log10(value), 3) if value > 0 else None
+
+
+def audible_bounds(samples, silence_db=SILENCE_DB):
+    """(frame awal, frame akhir) bagian yang terdengar, (0, 0) jika senyap semua"""
+    if samples.shape[0] == 0:
+        return 0, 0
+    level = np.abs(samples).max(axis=1) if samples.shape[1] > 1 else np.abs(samples[:, 0])
+    loud = level > 10 ** (silence_db / 20.0)
+    start = int(loud.argmax())
+    if not loud[start]:
+        return 0, 0
+    end = samples.shape[0] - int(loud[::-1].argmax())
+    return start, end
+
+
+def trim(samples, rate, silence_db=SILENCE_DB, pad_ms=TRIM_PAD_MS):
+    """
+    Potong senyap di awal dan akhir, sisakan pad_ms
+    Return: (samples (view, tanpa copy), frame awal, frame akhir) relatif terhadap input
+    """
+    frames = samples.shape[0]
+    start, end = audible_bounds(samples, silence_db)
+    if end == 0:
+        return samples, 0, frames
+    pad = int(rate * pad_ms / 1000)
+    start = max(0, start - pad)
+    end = min(frames, end + pad)
+    return samples[start:end], start, end
+
+
+def analyze(samples, rate, silence_db=SILENCE_DB):
+    """
+    Metadata loudness satu klip dalam satu kali scan buffer
+    Return: dict duration_ms, peak, peak_dbfs, rms_dbfs, start_ms, end_ms
+    (start_ms/end_ms = batas bagian yang terdengar, di atas silence_db)
+    """
+    frames = samples.shape[0]
+    if frames == 0:
+        return {"duration_ms": 0.0, "peak": 0.0, "peak_dbfs": None, "rms_dbfs": None, "start_ms": 0.0, "end_ms": 0.0}
+    peak = max(float(samples.max()), -float(samples.min()))
+    rms = math.sqrt(float(np.dot(samples.ravel(), samples.ravel())) / samples.size)
+    start, end = audible_bounds(samples, silence_db)
+    ms = 1000.0 / rate
+    return {
+        "duration_ms": round(frames * ms, 3),
+        "peak": round(peak, 6),
+        "peak_dbfs": to_db(peak),
+        "rms_dbfs": to_db(rms),
+        "start_ms": round(start * ms, 3),
+        "end_ms": round(end * ms, 3),
+    }
+
+
+def analyze_segment(audio, silence_db=SILENCE_DB):
+    """analyze() untuk AudioSegment"""
+    samples, rate = segment_to_array(audio)
+    return analyze(samples, rate, silence_db)
+
+
+def trim_segment(audio, silence_db=SILENCE_DB, pad_ms=TRIM_PAD_MS):
+    """
+    trim() untuk AudioSegment
+    Return: (AudioSegment, {"trim_start_ms", "trim_end_ms", "original_ms"})
+    """
+    samples, rate = segment_to_array(audio)
+    trimmed, start, end = trim(samples, rate, silence_db, pad_ms)
+    bytes_per_frame = audio.sample_width * audio.channels
+    out = audio._spawn(audio.raw_data[start * bytes_per_frame:end * bytes_per_frame])
+    return out, trim_info(start, end, samples.shape[0], rate)
+
+
+def trim_bytes(data, format="mp3", silence_db=SILENCE_DB, pad_ms=TRIM_PAD_MS):
+    """
+    Decode, trim senyap, encode ulang (untuk output backend apa pun)
+    Return: (bytes, offset trim)
+    """
+    samples, rate = decode(data, format=format)
+    with metrics.stage("trim", backend="dsp"):
+        trimmed, start, end = trim(samples, rate, silence_db, pad_ms)
+    return encode(trimmed, rate, format=format), trim_info(start, end, samples.shape[0], rate)
+
+
+def trim_info(start, end, frames, rate):
+    """Offset potongan trim (ms) untuk disimpan di metadata klip"""
+    ms = 1000.0 / rate
+    return {"trim_start_ms": round(start * ms, 3), "trim_end_ms": round(end * ms, 3),
+            "original_ms": round(frames * ms, 3)}
+
+
+def resample(samples, factor):
+    """
+    Resample dengan interpolasi linear: output[i] = input[i * factor]
+    factor > 1 = lebih cepat & lebih tinggi, factor < 1 = lebih lambat & lebih rendah
+    """
+    if factor == 1.0 or samples.shape[0] < 2:
+        return samples
+    frames = samples.shape[0]
+    out_frames = max(1, int(frames / factor))
+    positions = np.arange(out_frames) * factor
+    np.minimum(positions, frames - 1, out=positions)
+    index = positions.astype(np.intp)
+    np.minimum(index, frames - 2, out=index)
+    frac = (positions - index).astype(np.float32)
+
+    # Interpolasi linear tanpa pencarian biner: a + (b - a) * frac
+    columns = []
+    for ch in range(samples.shape[1]):
+        column = samples[:, ch]
+        left = column[index]
+        right = column[index + 1]
+        right -= left
+        right *= frac
+        right += left
+        columns.append(right)
+    if len(columns) == 1:
+        return columns[0].reshape(-1, 1)
+    return np.stack(columns, axis=1)
+
+
+@functools.lru_cache(maxsize=8)
+def vocoder_tables(n_fft, hop):
+    """
+    Tabel yang dihitung sekali per ukuran: jendela Hann, frekuensi per bin (rad/sample),
+    kenaikan fase per hop (mod 2 pi) dan normalisasi overlap-add
+    """
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+    bins = np.arange(n_fft // 2 + 1)
+    omega = (2 * np.pi * bins / n_fft).astype(np.float32)
+    advance = (2 * np.pi * ((bins * hop) % n_fft) / n_fft).astype(np.float32)
+    squared = window.astype(np.float64) ** 2
+    # Jumlah jendela^2 yang saling tumpang tindih di setiap posisi (awal sinyal: lebih sedikit frame)
+    norm = np.zeros(n_fft)
+    for start in range(0, n_fft, hop):
+        norm[start:] += squared[:n_fft - start]
+    norm = norm.astype(np.float32)
+    for table in (window, omega, advance, norm):
+        table.setflags(write=False)
+    return window, omega, advance, norm
+
+
+def vocoder_size(rate):
+    """n_fft (pangkat 2 terdekat dari VOCODER_WINDOW_MS) dan hop untuk sample rate"""
+    n_fft = 2 ** max(6, round(math.log2(rate * VOCODER_WINDOW_MS / 1000.0)))
+    return n_fft, n_fft // VOCODER_OVERLAP
+
+
+class PhaseVocoder:
+    """
+    Time-stretch dengan phase vocoder: durasi x ratio, pitch tetap
+    Bisa dipakai per blok (process() berulang lalu flush()) dengan hasil sama seperti buffer utuh
+    Frame analisis diambil setiap hop / ratio sample, disintesis setiap hop sample
+    """
+
+    def __init__(self, ratio, channels, rate=24000, phase_lock=True):
+        self.ratio = ratio
+        self.channels = channels
+        self.n_fft, self.hop = vocoder_size(rate)
+        self.window, self.omega, self.advance, self.norm = vocoder_tables(self.n_fft, self.hop)
+        self.analysis_hop = self.hop / ratio
+        self.phase_lock = phase_lock
+        self._spectrum = None   # Buffer rfft dipakai ulang antar batch
+        self.reset()
+
+    def reset(self):
+        center = self.n_fft // 2
+        self.buf = np.zeros((center, self.channels), dtype=np.float32)   # Input (koordinat + padding awal)
+        self.buf_start = 0
+        self.total = 0                 # Frame input yang sudah masuk
+        self.frame = 0                 # Indeks frame berikutnya
+        self.last_pos = None           # Posisi frame analisis sebelumnya
+        self.last_phase = None         # Fase analisis frame sebelumnya (channels, bins)
+        self.synth_phase = None        # Akumulator fase sintesis per bin (channels, bins)
+        self.tail = np.zeros((self.channels, self.n_fft - self.hop), dtype=np.float32)
+        self.emitted = 0               # Sample output (koordinat + padding awal) yang sudah final
+
+    def _position(self, t):
+        return np.round(np.arange(t[0], t[1]) * self.analysis_hop).astype(np.intp)
+
+    def _nearest_peak(self, mag):
+        """Indeks (flat) puncak spektrum terdekat untuk setiap bin; frame tanpa puncak menunjuk bin itu sendiri"""
+        bins = mag.shape[-1]
+        inner = mag[..., 1:-1]
+        peaks = np.zeros(mag.shape, dtype=bool)
+        peaks[..., 1:-1] = (inner > mag[..., :-2]) & (inner >= mag[..., 2:])
+        index = np.arange(bins, dtype=np.int32)
+        left = np.maximum.accumulate(np.where(peaks, index, -bins), axis=-1)
+        right = np.minimum.accumulate(np.where(peaks, index, 2 * bins)[..., ::-1], axis=-1)[..., ::-1]
+        nearest = np.where(right - index < index - left, right, left)
+        nearest = np.where((nearest < 0) | (nearest >= bins), index, nearest)
+        rows = mag.reshape(-1, bins).shape[0]
+        return nearest.reshape(-1, bins) + (np.arange(rows, dtype=np.int32) * bins)[:, None]
+
+    def _frames(self, count):
+        """Sintesis count frame berikutnya, return sample output yang sudah final (channels, n)"""
+        t = (self.frame, self.frame + count)
+        pos = self._position(t)
+        local = pos - self.buf_start
+        frames = np.empty((self.channels, count, self.n_fft), dtype=np.float32)
+        for ch in range(self.channels):
+            frames[ch] = np.lib.stride_tricks.sliding_window_view(self.buf[:, ch], self.n_fft)[local]
+        frames *= self.window
+        bins = self.n_fft // 2 + 1
+        if self._spectrum is None or self._spectrum.shape[1] < count:
+            self._spectrum = np.empty((self.channels, max(count, 64), bins), dtype=np.complex64)
+        spectrum = self._spectrum[:, :count]
+        np.fft.rfft(frames, axis=-1, out=spectrum)
+        phase = np.angle(spectrum)
+
+        # Beda fase antar frame analisis -> frekuensi sesaat per bin -> kenaikan fase sintesis per hop
+        if self.last_pos is None:
+            previous_pos = np.concatenate(([pos[0] - 1], pos[:-1]))
+            previous = np.concatenate((phase[:, :1], phase[:, :-1]), axis=1)
+        else:
+            previous_pos = np.concatenate(([self.last_pos], pos[:-1]))
+            previous = np.concatenate((self.last_phase[:, None], phase[:, :-1]), axis=1)
+        hops = (pos - previous_pos).astype(np.float32)[:, None]
+        delta = phase - previous
+        delta -= self.omega * hops
+        delta -= TWO_PI * np.round(delta * (1 / TWO_PI))
+        delta *= self.hop / hops
+        delta += self.advance
+        if self.synth_phase is None:
+            delta[:, 0] = phase[:, 0]   # Frame pertama: fase analisis apa adanya
+        else:
+            delta[:, 0] += self.synth_phase
+        # Akumulasi float64 lalu mod 2 pi: hasil tidak tergantung pembagian blok input
+        synth = np.cumsum(delta, axis=1, dtype=np.float64)
+        turns = synth * (1 / (2 * np.pi))
+        np.floor(turns, out=turns)
+        turns *= 2 * np.pi
+        synth -= turns
+        self.synth_phase = synth[:, -1]
+        synth = synth.astype(np.float32)
+        self.last_phase = phase[:, -1]
+        self.last_pos = pos[-1]
+
+        # Spektrum sintesis = spektrum analisis diputar (synth - analisis); dengan phase locking
+        # setiap bin ikut putaran puncak terdekat sehingga hubungan fase di sekitar puncak terjaga
+        synth -= phase
+        rotation = np.cos(synth) + 1j * np.sin(synth).astype(np.float32)
+        if self.phase_lock:
+            rotation = rotation.reshape(-1)[self._nearest_peak(np.abs(spectrum))].reshape(spectrum.shape)
+        spectrum *= rotation
+        frames = np.fft.irfft(spectrum, n=self.n_fft, axis=-1).astype(np.float32, copy=False)
+        frames *= self.window
+
+        # Overlap-add: frame t ditaruh di t * hop, sample sebelum frame berikutnya sudah final
+        hop = self.hop
+        acc = np.zeros((self.channels, (count - 1) * hop + self.n_fft), dtype=np.float32)
+        acc[:, :self.tail.shape[1]] += self.tail
+        for j in range(0, self.n_fft, hop):
+            acc[:, j:j + count * hop] += frames[:, :, j:j + hop].reshape(self.channels, count * hop)
+        done = acc[:, :count * hop]
+        self.tail = acc[:, count * hop:]
+        first = t[0] * hop
+        if first < self.n_fft:
+            head = min(self.n_fft - first, done.shape[1])
+            done[:, :head] /= np.maximum(self.norm[first:first + head], 1e-6)
+            done[:, head:] /= self.norm[-1]
+        else:
+            done /= self.norm[-1]
+
+        self.frame = t[1]
+        next_pos = int(round(self.frame * self.analysis_hop))
+        drop = max(0, next_pos - self.buf_start)
+        self.buf = self.buf[drop:]
+        self.buf_start += drop
+        return done
+
+    def _emit(self, done, end=None):
+        """Buang padding awal (n_fft / 2) dan potong di panjang akhir"""
+        center = self.n_fft // 2
+        start = self.emitted
+        self.emitted += done.shape[1]
+        lo = max(0, center - start)
+        hi = done.shape[1] if end is None else max(lo, min(done.shape[1], end - start))
+        return np.ascontiguousarray(done[:, lo:hi].T)
+
+    def process(self, block):
+        """Blok input float32 (frames, channels) -> output yang sudah final (bisa kosong)"""
+        self.total += block.shape[0]
+        self.buf = np.concatenate((self.buf, block))
+        available = self.buf_start + self.buf.shape[0]
+        # Frame t siap jika seluruh jendelanya sudah ada di buffer
+        count = 0
+        while round((self.frame + count) * self.analysis_hop) + self.n_fft <= available:
+            count += 1
+        if not count:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        return self._emit(self._frames(count))
+
+    def flush(self):
+        """Sisa output setelah input terakhir; panjang total = round(input x ratio)"""
+        center = self.n_fft // 2
+        out_len = int(round(self.total * self.ratio))
+        end = center + out_len
+        frames = -(-end // self.hop) - self.frame   # Frame sampai seluruh output tertutup
+        if frames <= 0 or out_len == 0:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        last = round((self.frame + frames - 1) * self.analysis_hop) + self.n_fft
+        pad = max(0, last - (self.buf_start + self.buf.shape[0]))
+        if pad:
+            self.buf = np.concatenate((self.buf, np.zeros((pad, self.channels), dtype=np.float32)))
+        return self._emit(self._frames(frames), end)
+
+
+_vocoders = threading.local()
+
+
+def time_stretch(samples, rate, ratio, phase_lock=True):
+    """
+    Ubah durasi audio x ratio tanpa mengubah pitch (phase vocoder, buffer utuh)
+    Instance PhaseVocoder (tabel + buffer FFT) dipakai ulang per thread
+    """
+    if ratio == 1.0 or samples.shape[0] == 0:
+        return samples
+    key = (ratio, samples.shape[1], rate, phase_lock)
+    cache = getattr(_vocoders, "items", None)
+    if cache is None:
+        cache = _vocoders.items = {}
+    vocoder = cache.get(key)
+    if vocoder is None:
+        if len(cache) >= 8:
+            cache.clear()
+        vocoder = cache[key] = PhaseVocoder(ratio, samples.shape[1], rate, phase_lock)
+    else:
+        vocoder.reset()
+    # Input diumpankan per potongan agar buffer STFT sementara tidak ikut membesar untuk audio panjang
+    parts = [vocoder.process(samples[start:start + VOCODER_BATCH])
+             for start in range(0, samples.shape[0], VOCODER_BATCH)]
+    parts.append(vocoder.flush())
+    return np.concatenate(parts)
+
+
+def pitch_shift(samples, rate, semitones, phase_lock=True):
+    """Pitch shift dengan durasi tetap: time-stretch x 2^(semitones/12) lalu resample kembali"""
+    ratio = 2 ** (semitones / 12.0)
+    return resample(time_stretch(samples, rate, ratio, phase_lock), ratio)
+
+
+def process(samples, rate, semitones=0, speed=1.0, gain_db=0.0, normalize=True, headroom_db=HEADROOM_DB, peak=None,
+            mode=None):
+    """
+    Terapkan pitch, speed, gain dan normalisasi peak dalam satu rantai
+    peak: peak setelah pitch/speed (0..1, mis. dari metadata cache) jika sudah diketahui,
+          agar tidak perlu scan ulang buffer; bukan peak input (vocoder/resample mengubah peak)
+    mode: "vocoder" / "resample" (None = PITCH_MODE)
+    Return: samples float32 baru (frame_rate tidak berubah)
+    """
+    ratio = 2 ** (semitones / 12.0)
+    factor = ratio * speed
+    with metrics.stage("pitch", backend="dsp"):
+        if semitones and (mode or PITCH_MODE) == "vocoder":
+            samples = time_stretch(samples, rate, ratio)
+        out = resample(samples, factor)
+        if out is samples:
+            out = samples.copy()
+
+    # Gabungkan normalisasi dan gain menjadi satu perkalian
+    with metrics.stage("normalize", backend="dsp"):
+        scale = 10 ** (gain_db / 20.0)
+        if normalize:
+            if peak is None:
+                peak = max(float(out.max()), -float(out.min())) if out.size else 0.0
+            if peak > 0:
+                scale *= (10 ** (-headroom_db / 20.0)) / peak
+        if scale != 1.0:
+            out *= np.float32(scale)
+    return out
+
+
+def pitch_segment(audio, semitones, mode=None):
+    """Drop-in untuk app.pitch_segment: AudioSegment -> AudioSegment"""
+    samples, rate = segment_to_array(audio)
+    return array_to_segment(process(samples, rate, semitones=semitones, mode=mode), rate)
+
+
+def change_pitch(audio_file, semitones, format="mp3", mode=None):
+    """Drop-in untuk change_pitch: decode sekali, proses di memori, encode sekali (durasi tetap, lihat PITCH_MODE)"""
+    samples, rate = decode(audio_file, format=format)
+    data = encode(process(samples, rate, semitones=semitones, mode=mode), rate, format=format)
+    with open(audio_file, "wb") as f:
+        f.write(data)
+    return True
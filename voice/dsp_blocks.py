@@ -0,0 +1,371 @@
+"""
+Rantai efek per blok untuk audio panjang (mis. siaran daftar nama akhir shift)
+Audio di-decode, diproses (pitch/speed, gain, normalisasi peak, downmix,
+low-pass + resample format output) dan di-encode per blok berukuran tetap,
+sehingga peak memory tetap sama berapapun durasi input
+Hasilnya sama dengan dsp.process() + formats.convert() pada buffer utuh
+
+Penggunaan:
+  import dsp_blocks
+  dsp_blocks.process_file("siaran.mp3", "siaran_out.mp3", semitones=-7)
+  python dsp_blocks.py siaran.mp3 siaran_out.ogg --semitones -7 --format kiosk
+"""
+import argparse
+import math
+import time
+import wave
+
+import numpy as np
+
+import audio_codec
+import dsp
+import formats
+import metrics
+from dsp import HEADROOM_DB, to_int16
+
+# ============================================
+# KONFIGURASI BLOK
+# ============================================
+BLOCK_FRAMES = 8192   # Frame per blok (8192 @ 24 kHz ~ 0.34 detik)
+
+# ============================================
+# CATATAN:
+# ============================================
+# - Resample (pitch/speed dan sample rate output) memakai interpolasi linear yang sama
+#   dengan dsp.resample(): beberapa frame terakhir setiap blok dibawa ke blok berikutnya
+#   (overlap), dan posisi output dihitung dari indeks absolut agar tidak ada drift
+# - Pitch mode "vocoder" (dsp.PITCH_MODE): dsp.PhaseVocoder per blok sebelum resample,
+#   frame STFT yang belum lengkap menunggu blok berikutnya (hasil sama dengan buffer utuh)
+# - Low-pass sebelum downsampling: FIR yang sama dengan formats.lowpass(), riwayat
+#   LOWPASS_TAPS - 1 frame dibawa antar blok (overlap-save)
+# - Normalisasi peak butuh peak seluruh audio: tanpa parameter peak (mis. dari metadata
+#   cache), input di-decode dua kali (lintasan pertama hanya mengukur peak)
+# - Memori tetap hanya jika source dan dest berupa path file (atau file-like yang
+#   tidak menahan seluruh isi di memori) dan PyAV terinstall (lihat audio_codec.py)
+# - pcm / wav ditulis langsung per blok (stdlib wave), opus / mp3 lewat audio_codec.BlockEncoder
+# ============================================
+
+_PCM_SCALE = np.float32(1.0 / 32768.0)
+
+
+class BlockResampler:
+    """
+    Resample per blok dengan interpolasi linear: output[k] = input[k * factor]
+    Panjang dan nilai output sama dengan dsp.resample() pada buffer utuh
+    """
+
+    def __init__(self, factor, channels):
+        self.factor = factor
+        self.channels = channels
+        self.keep = int(factor) + 2                  # Frame yang dibawa ke blok berikutnya
+        self.tail = np.zeros((0, channels), dtype=np.float32)
+        self.base = 0                                # Indeks absolut tail[0]
+        self.emitted = 0                             # Jumlah frame output yang sudah keluar
+        self.total = 0                               # Jumlah frame input yang sudah masuk
+
+    def _interpolate(self, buf, count, clamp_to=None):
+        positions = np.arange(self.emitted, self.emitted + count) * self.factor
+        if clamp_to is not None:
+            np.minimum(positions, clamp_to - 1, out=positions)
+        index = positions.astype(np.intp)
+        if clamp_to is not None:
+            np.minimum(index, clamp_to - 2, out=index)
+        frac = (positions - index).astype(np.float32)
+        local = index - self.base
+        left = buf[local]
+        right = buf[local + 1]
+        right -= left
+        right *= frac[:, None]
+        right += left
+        self.emitted += count
+        return right
+
+    def process(self, block):
+        """Blok input float32 (frames, channels) -> blok output (bisa kosong)"""
+        if self.factor == 1.0:
+            return block
+        self.total += block.shape[0]
+        buf = np.concatenate((self.tail, block)) if self.tail.shape[0] else block
+        # Output k butuh frame floor(k * factor) + 1 (sudah ada di buf), dan hanya dikeluarkan
+        # jika pasti masuk panjang akhir int(total / factor) walau input berhenti di sini
+        limit = min(int(self.total / self.factor), math.ceil((self.total - 1) / self.factor) + 1)
+        while limit > self.emitted and (limit - 1) * self.factor >= self.total - 1:
+            limit -= 1
+        count = max(0, limit - self.emitted)
+        out = self._interpolate(buf, count) if count else np.zeros((0, self.channels), dtype=np.float32)
+        keep = min(self.keep, buf.shape[0])
+        self.tail = buf[-keep:].copy()
+        self.base = self.total - keep
+        return out
+
+    def flush(self):
+        """Sisa output setelah blok terakhir (posisi di ujung dijepit ke frame terakhir)"""
+        if self.factor == 1.0 or self.total == 0:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        if self.total < 2:
+            return self.tail   # Sama dengan dsp.resample(): input < 2 frame dikembalikan apa adanya
+        count = max(1, int(self.total / self.factor)) - self.emitted
+        if count <= 0:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        return self._interpolate(self.tail, count, clamp_to=self.total)
+
+
+class BlockPitch:
+    """Pitch shift durasi tetap per blok: time-stretch (dsp.PhaseVocoder) lalu BlockResampler"""
+
+    def __init__(self, stretch, factor, channels, rate):
+        self.vocoder = dsp.PhaseVocoder(stretch, channels, rate)
+        self.resampler = BlockResampler(factor, channels)
+
+    def process(self, block):
+        return self.resampler.process(self.vocoder.process(block))
+
+    def flush(self):
+        out = self.resampler.process(self.vocoder.flush())
+        return np.concatenate((out, self.resampler.flush()))
+
+
+def pitch_stage(rate, channels, factor, stretch=1.0):
+    """Tahap pitch/speed per blok (None jika tidak ada perubahan)"""
+    if stretch != 1.0:
+        return BlockPitch(stretch, factor, channels, rate)
+    if factor != 1.0:
+        return BlockResampler(factor, channels)
+    return None
+
+
+class BlockLowpass:
+    """FIR low-pass per blok (overlap-save), hasil sama dengan formats.lowpass() mode "same" """
+
+    def __init__(self, cutoff, channels, taps=formats.LOWPASS_TAPS):
+        n = np.arange(taps) - (taps - 1) / 2
+        kernel = (2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)).astype(np.float32)
+        kernel /= kernel.sum()
+        self.kernel = kernel
+        self.delay = (taps - 1) // 2                 # Output "same" = output kausal digeser delay frame
+        self.skip = self.delay
+        self.history = np.zeros((taps - 1, channels), dtype=np.float32)
+
+    def process(self, block):
+        buf = np.concatenate((self.history, block))
+        self.history = buf[-self.history.shape[0]:].copy()
+        columns = [np.convolve(buf[:, ch], self.kernel, mode="valid") for ch in range(buf.shape[1])]
+        out = np.stack(columns, axis=1).astype(np.float32, copy=False)
+        if self.skip:
+            dropped = min(self.skip, out.shape[0])
+            self.skip -= dropped
+            out = out[dropped:]
+        return out
+
+    def flush(self):
+        return self.process(np.zeros((self.delay, self.history.shape[1]), dtype=np.float32))
+
+
+def _float_blocks(blocks, channels):
+    """Bytes PCM 16-bit -> blok float32 (frames, channels)"""
+    for pcm in blocks:
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+        samples *= _PCM_SCALE
+        yield samples.reshape(-1, channels)
+
+
+def _stages(rate, channels, factor, fmt, stretch=1.0):
+    """Tahap per blok: [pitch (jika ada), low-pass, resample], rate output, channels output"""
+    stages = []
+    pitch = pitch_stage(rate, channels, factor, stretch)
+    if pitch is not None:
+        stages.append(pitch)
+    out_channels = channels
+    if fmt.channels == 1 and channels > 1:
+        out_channels = 1
+    elif fmt.channels == 2 and channels == 1:
+        out_channels = 2
+    target = fmt.sample_rate or rate
+    if target != rate:
+        if target < rate:
+            stages.append(BlockLowpass(0.5 * target / rate * 0.95, out_channels))
+        stages.append(BlockResampler(rate / target, out_channels))
+    return stages, target, out_channels
+
+
+def _downmix(block, out_channels):
+    if block.shape[1] == out_channels:
+        return block
+    if out_channels == 1:
+        return block.mean(axis=1, keepdims=True, dtype=np.float32)
+    return np.repeat(block, 2, axis=1)
+
+
+def effect_chain(blocks, rate, channels, factor=1.0, scale=1.0, fmt=None, stretch=1.0):
+    """
+    Generator blok float32 hasil rantai efek: pitch/speed -> gain -> downmix -> low-pass -> resample
+    Urutan sama dengan dsp.process() lalu formats.convert()
+    stretch: faktor time-stretch phase vocoder sebelum resample (1.0 = pitch mode "resample")
+    """
+    fmt = formats.parse_format(fmt)
+    stages, _, out_channels = _stages(rate, channels, factor, fmt, stretch)
+    pitch = stages[0] if factor != 1.0 or stretch != 1.0 else None
+    rest = stages[1:] if pitch is not None else stages
+    scale = np.float32(scale)
+
+    def tail(block):
+        if scale != 1.0:
+            block = block * scale
+        block = _downmix(block, out_channels)
+        for stage in rest:
+            block = stage.process(block)
+        return block
+
+    for block in blocks:
+        if pitch is not None:
+            block = pitch.process(block)
+        block = tail(block)
+        if block.shape[0]:
+            yield block
+    # Flush berurutan: sisa setiap tahap lewat tahap berikutnya
+    if pitch is not None:
+        block = tail(pitch.flush())
+        if block.shape[0]:
+            yield block
+    for i, stage in enumerate(rest):
+        block = stage.flush()
+        for later in rest[i + 1:]:
+            block = later.process(block)
+        if block.shape[0]:
+            yield block
+
+
+def measure_peak(source, input_format="mp3", factor=1.0, block_frames=BLOCK_FRAMES, stretch=1.0):
+    """Peak (0..1) audio setelah pitch/speed, diukur per blok tanpa menyimpan output"""
+    rate, channels, blocks = audio_codec.decode_blocks(source, input_format, block_frames)
+    pitch = pitch_stage(rate, channels, factor, stretch) or BlockResampler(1.0, channels)
+    peak = 0.0
+    for block in _float_blocks(blocks, channels):
+        out = pitch.process(block)
+        if out.size:
+            peak = max(peak, float(out.max()), -float(out.min()))
+    out = pitch.flush()
+    if out.size:
+        peak = max(peak, float(out.max()), -float(out.min()))
+    return peak
+
+
+class _RawWriter:
+    """Sink pcm / wav per blok (tanpa encoder)"""
+
+    def __init__(self, dest, rate, channels, codec):
+        self._own = isinstance(dest, str)
+        self._file = open(dest, "wb") if self._own else dest
+        self._wave = None
+        if codec == "wav":
+            self._wave = wave.open(self._file, "wb")
+            self._wave.setnchannels(channels)
+            self._wave.setsampwidth(2)
+            self._wave.setframerate(rate)
+
+    def write(self, pcm):
+        if self._wave is not None:
+            self._wave.writeframesraw(pcm)
+        else:
+            self._file.write(pcm)
+
+    def close(self):
+        if self._wave is not None:
+            self._wave.close()   # Tulis ulang panjang data di header
+        if self._own:
+            self._file.close()
+
+
+def open_sink(dest, rate, channels, fmt):
+    """Sink blok PCM 16-bit sesuai format output"""
+    if fmt.codec in ("pcm", "wav"):
+        return _RawWriter(dest, rate, channels, fmt.codec)
+    _, _, container, codec = formats.CODECS[fmt.codec]
+    return audio_codec.BlockEncoder(dest, rate, channels, container, codec, fmt.bitrate, fmt.level)
+
+
+def process_file(source, dest, input_format="mp3", output="mp3", semitones=0, speed=1.0, gain_db=0.0,
+                 normalize=True, headroom_db=HEADROOM_DB, peak=None, block_frames=BLOCK_FRAMES, mode=None):
+    """
+    Proses audio panjang per blok dari source (path/bytes/file-like) ke dest (path/file-like)
+    output: preset/spec formats.py; parameter efek sama dengan dsp.process()
+    (peak = peak setelah pitch/speed, lihat measure_peak())
+    Return: dict statistik (frames_in, frames_out, rate, peak, blocks)
+    """
+    fmt = formats.parse_format(output)
+    ratio = 2 ** (semitones / 12.0)
+    factor = ratio * speed
+    stretch = ratio if semitones and (mode or dsp.PITCH_MODE) == "vocoder" else 1.0
+    scale = 10 ** (gain_db / 20.0)
+    if normalize:
+        if peak is None:
+            with metrics.stage("peak", backend="dsp_blocks"):
+                peak = measure_peak(source, input_format, factor, block_frames, stretch)
+        if peak > 0:
+            scale *= (10 ** (-headroom_db / 20.0)) / peak
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    rate, channels, blocks = audio_codec.decode_blocks(source, input_format, block_frames)
+    stats = {"frames_in": 0, "frames_out": 0, "rate": None, "peak": peak, "blocks": 0}
+
+    def counted(items):
+        for block in _float_blocks(items, channels):
+            stats["frames_in"] += block.shape[0]
+            stats["blocks"] += 1
+            yield block
+
+    _, out_rate, out_channels = _stages(rate, channels, factor, fmt, stretch)
+    stats["rate"] = out_rate
+    with metrics.stage(f"encode_{fmt.codec}", backend="dsp_blocks"):
+        sink = open_sink(dest, out_rate, out_channels, fmt)
+        try:
+            for block in effect_chain(counted(blocks), rate, channels, factor, scale, fmt, stretch):
+                stats["frames_out"] += block.shape[0]
+                sink.write(to_int16(block).tobytes())
+        finally:
+            sink.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rantai efek per blok untuk audio panjang (memori tetap)")
+    parser.add_argument("input", help="File audio input")
+    parser.add_argument("output", help="File audio output")
+    parser.add_argument("--semitones", type=float, default=0)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--pitch-mode", choices=("vocoder", "resample"), default=None,
+                        help="vocoder = durasi tetap (default dsp.PITCH_MODE)")
+    parser.add_argument("--gain-db", type=float, default=0.0)
+    parser.add_argument("--no-normalize", action="store_true")
+    parser.add_argument("--format", default=None, help="Format output (lihat formats.py), default dari ekstensi")
+    parser.add_argument("--block-frames", type=int, default=BLOCK_FRAMES)
+    args = parser.parse_args()
+
+    input_format = args.input.rsplit(".", 1)[-1].lower()
+    output = args.format or {"ogg": "opus"}.get(args.output.rsplit(".", 1)[-1].lower(),
+                                                 args.output.rsplit(".", 1)[-1].lower())
+    try:
+        fmt = formats.parse_format(output)
+    except ValueError as e:
+        print(f"✗ ERROR: {e}")
+        return False
+
+    print("=" * 60)
+    print("RANTAI EFEK PER BLOK")
+    print("=" * 60)
+    print(f"Input: {args.input} -> {args.output} ({fmt.spec()})")
+    start = time.perf_counter()
+    stats = process_file(args.input, args.output, input_format, fmt, args.semitones, args.speed, args.gain_db,
+                         not args.no_normalize, block_frames=args.block_frames, mode=args.pitch_mode)
+    elapsed = time.perf_counter() - start
+    duration = stats["frames_out"] / stats["rate"]
+    print(f"✓ {stats['blocks']} blok, {duration:.1f} detik audio dalam {elapsed:.2f} detik "
+          f"({duration / elapsed:.0f}x realtime)")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
@@ -0,0 +1,269 @@
+"""
+Format output audio yang bisa dipilih: PCM mentah, WAV, Ogg/Opus, MP3
+dengan sample rate, jumlah channel (mono downmix) dan bitrate yang bisa diatur
+PCM dan WAV ditulis langsung (stdlib wave, tanpa ffmpeg); Opus dan MP3 lewat audio_codec
+
+Penggunaan:
+  import formats
+  data = formats.encode(samples, rate, "kiosk")                    # preset
+  data = formats.encode(samples, rate, "opus,rate=16000,mono,bitrate=24k")
+  python formats.py output_id_normal.mp3                            # bandingkan ukuran & waktu encode
+"""
+import argparse
+import io
+import os
+import time
+import wave
+
+import metrics
+
+try:
+    import numpy as np
+    import dsp
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# ============================================
+# KONFIGURASI FORMAT
+# ============================================
+DEFAULT_FORMAT = os.getenv("VOICE_OUTPUT_FORMAT", "mp3")   # Preset atau spec default
+
+# Preset: nama -> spec "codec,rate=...,mono,bitrate=..."
+PRESETS = {
+    "mp3": "mp3",                                  # Sama seperti sebelumnya (rate asli, bitrate default ffmpeg)
+    "mp3-small": "mp3,rate=16000,mono,bitrate=32k",
+    "kiosk": "opus,rate=16000,mono,bitrate=24k,level=3",   # Ucapan pendek untuk kiosk: kecil & cepat di-serve
+    "opus": "opus,bitrate=32k",
+    "wav": "wav",
+    "wav16": "wav,rate=16000,mono",
+    "pcm16": "pcm,rate=16000,mono",
+}
+
+# ============================================
+# CATATAN:
+# ============================================
+# Spec: codec[,rate=HZ][,mono|stereo|channels=N][,bitrate=NNk][,level=N]
+#   codec  : pcm (int16 little-endian tanpa header), wav, opus (dalam Ogg), mp3
+#   rate   : sample rate output; kosong = sama dengan input
+#            Opus hanya mendukung 8000, 12000, 16000, 24000, 48000
+#   mono   : downmix ke 1 channel (rata-rata channel)
+#   bitrate: hanya untuk opus / mp3, contoh "24k"
+#   level  : -compression_level encoder (opus 0-10, default 10 = paling lambat;
+#            level 3 kira-kira 4x lebih cepat dengan ukuran hampir sama untuk ucapan pendek)
+# Downsampling memakai filter low-pass sebelum resample agar tidak aliasing
+# ============================================
+
+CODECS = {
+    # codec: (ekstensi file, MIME type, format pydub/ffmpeg, encoder ffmpeg)
+    "pcm": ("pcm", "audio/L16", None, None),
+    "wav": ("wav", "audio/wav", None, None),
+    "opus": ("ogg", "audio/ogg; codecs=opus", "ogg", "libopus"),
+    "mp3": ("mp3", "audio/mpeg", "mp3", None),
+}
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+LOWPASS_TAPS = 63
+
+
+class OutputFormat:
+    """Spesifikasi format output (codec, sample rate, channels, bitrate)"""
+
+    def __init__(self, codec="mp3", sample_rate=None, channels=None, bitrate=None, level=None):
+        if codec not in CODECS:
+            raise ValueError(f"Codec tidak dikenal: {codec} (pilihan: {', '.join(CODECS)})")
+        if channels not in (None, 1, 2):
+            raise ValueError("channels harus 1 (mono) atau 2 (stereo)")
+        if codec == "opus" and sample_rate not in (None,) + OPUS_RATES:
+            raise ValueError(f"Opus hanya mendukung sample rate {', '.join(map(str, OPUS_RATES))}")
+        if (bitrate or level is not None) and codec in ("pcm", "wav"):
+            raise ValueError(f"bitrate/level tidak berlaku untuk {codec}")
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bitrate = bitrate
+        self.level = level
+
+    @property
+    def extension(self):
+        return CODECS[self.codec][0]
+
+    @property
+    def mime(self):
+        if self.codec == "pcm":
+            rate = f";rate={self.sample_rate}" if self.sample_rate else ""
+            channels = f";channels={self.channels}" if self.channels else ""
+            return f"audio/L16{rate}{channels}"
+        return CODECS[self.codec][1]
+
+    def spec(self):
+        """Bentuk kanonik (dipakai untuk kunci cache)"""
+        parts = [self.codec]
+        if self.sample_rate:
+            parts.append(f"rate={self.sample_rate}")
+        if self.channels:
+            parts.append("mono" if self.channels == 1 else "stereo")
+        if self.bitrate:
+            parts.append(f"bitrate={self.bitrate}")
+        if self.level is not None:
+            parts.append(f"level={self.level}")
+        return ",".join(parts)
+
+    def is_default_mp3(self):
+        return self.spec() == "mp3"
+
+    def __eq__(self, other):
+        return isinstance(other, OutputFormat) and self.spec() == other.spec()
+
+    def __hash__(self):
+        return hash(self.spec())
+
+    def __repr__(self):
+        return f"OutputFormat({self.spec()!r})"
+
+
+def parse_format(spec=None):
+    """OutputFormat dari instance, nama preset, atau spec string (None = DEFAULT_FORMAT)"""
+    if isinstance(spec, OutputFormat):
+        return spec
+    spec = (spec or DEFAULT_FORMAT).strip().lower()
+    spec = PRESETS.get(spec, spec)
+
+    codec, *options = [part.strip() for part in spec.split(",") if part.strip()]
+    kwargs = {}
+    for option in options:
+        name, sep, value = option.partition("=")
+        if not sep and name in ("mono", "stereo"):
+            kwargs["channels"] = 1 if name == "mono" else 2
+        elif name in ("rate", "sample_rate"):
+            try:
+                kwargs["sample_rate"] = int(value)
+            except ValueError:
+                raise ValueError(f"Sample rate tidak valid: {value}")
+        elif name == "channels":
+            try:
+                kwargs["channels"] = int(value)
+            except ValueError:
+                raise ValueError(f"Jumlah channel tidak valid: {value}")
+        elif name == "bitrate" and value:
+            kwargs["bitrate"] = value
+        elif name == "level":
+            try:
+                kwargs["level"] = int(value)
+            except ValueError:
+                raise ValueError(f"Level kompresi tidak valid: {value}")
+        else:
+            raise ValueError(f"Opsi format tidak dikenal: {option}")
+    return OutputFormat(codec, **kwargs)
+
+
+def lowpass(samples, cutoff):
+    """Filter low-pass windowed-sinc; cutoff relatif terhadap sample rate (0..0.5)"""
+    n = np.arange(LOWPASS_TAPS) - (LOWPASS_TAPS - 1) / 2
+    kernel = (2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(LOWPASS_TAPS)).astype(np.float32)
+    kernel /= kernel.sum()
+    columns = [np.convolve(samples[:, ch], kernel, mode="same") for ch in range(samples.shape[1])]
+    return np.stack(columns, axis=1).astype(np.float32, copy=False)
+
+
+def convert(samples, rate, fmt):
+    """Downmix + resample buffer NumPy sesuai format, return (samples, rate)"""
+    if fmt.channels == 1 and samples.shape[1] > 1:
+        samples = samples.mean(axis=1, keepdims=True, dtype=np.float32)
+    elif fmt.channels == 2 and samples.shape[1] == 1:
+        samples = np.repeat(samples, 2, axis=1)
+    target = fmt.sample_rate or rate
+    if target != rate:
+        if target < rate:
+            samples = lowpass(samples, 0.5 * target / rate * 0.95)
+        samples = dsp.resample(samples, rate / target)
+    return samples, target
+
+
+def _export(audio, fmt):
+    """Encode AudioSegment (rate & channel sudah sesuai) ke bytes"""
+    if fmt.codec == "pcm":
+        return audio.raw_data
+    if fmt.codec == "wav":
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(audio.channels)
+            w.setsampwidth(audio.sample_width)
+            w.setframerate(audio.frame_rate)
+            w.writeframes(audio.raw_data)
+        return buf.getvalue()
+    import audio_codec   # Butuh pydub, hanya untuk opus / mp3
+    _, _, pydub_format, codec = CODECS[fmt.codec]
+    return audio_codec.encode_segment(audio, pydub_format, codec, fmt.bitrate, fmt.level)
+
+
+def encode(samples, rate, fmt=None):
+    """Encode buffer NumPy float32 (frames, channels) ke bytes sesuai format"""
+    fmt = parse_format(fmt)
+    with metrics.stage(f"encode_{fmt.codec}", backend="dsp") as stage:
+        samples, rate = convert(samples, rate, fmt)
+        data = _export(dsp.array_to_segment(samples, rate), fmt)
+        stage.bytes = len(data)
+        return data
+
+
+def encode_segment(audio, fmt=None):
+    """Encode AudioSegment ke bytes sesuai format (jalur pydub, tanpa numpy)"""
+    fmt = parse_format(fmt)
+    with metrics.stage(f"encode_{fmt.codec}", backend="pydub") as stage:
+        if fmt.channels and audio.channels != fmt.channels:
+            audio = audio.set_channels(fmt.channels)
+        if fmt.sample_rate and audio.frame_rate != fmt.sample_rate:
+            audio = audio.set_frame_rate(fmt.sample_rate)
+        if fmt.codec in ("pcm", "wav") and audio.sample_width != 2:
+            audio = audio.set_sample_width(2)
+        data = _export(audio, fmt)
+        stage.bytes = len(data)
+        return data
+
+
+def compare_formats(samples, rate, specs, runs=3):
+    """Ukur ukuran dan waktu encode setiap format, return list dict"""
+    results = []
+    for spec in specs:
+        fmt = parse_format(spec)
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            data = encode(samples, rate, fmt)
+            times.append((time.perf_counter() - start) * 1000)
+        results.append({"format": spec, "spec": fmt.spec(), "bytes": len(data), "encode_ms": min(times)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan ukuran dan waktu encode tiap format output")
+    parser.add_argument("input", nargs="?", default="output_id_normal.mp3", help="File audio input")
+    parser.add_argument("--formats", default=",".join(PRESETS), help="Preset dipisah koma")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("✗ ERROR: numpy tidak terinstall (pip install numpy)")
+        return False
+
+    samples, rate = dsp.decode(args.input)
+    duration = samples.shape[0] / rate
+    print("=" * 60)
+    print("PERBANDINGAN FORMAT OUTPUT")
+    print("=" * 60)
+    print(f"Input: {args.input} ({duration:.2f} detik, {rate} Hz, {samples.shape[1]} ch)")
+    print()
+
+    results = compare_formats(samples, rate, args.formats.split(","), args.runs)
+    baseline = next((r["bytes"] for r in results if r["spec"] == "mp3"), None)
+    print(f"{'Format':12s} {'Spec':42s} {'Ukuran':>10s} {'Encode':>10s}")
+    for r in results:
+        ratio = f" ({baseline / r['bytes']:.1f}x lebih kecil)" if baseline and r["bytes"] < baseline else ""
+        print(f"{r['format']:12s} {r['spec']:42s} {r['bytes']:>8,} B {r['encode_ms']:>7.1f} ms{ratio}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
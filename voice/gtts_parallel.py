@@ -0,0 +1,150 @@
+"""
+Unduh audio gTTS per segmen secara paralel
+gTTS memecah teks panjang (> ~100 karakter) menjadi beberapa segmen dan
+mengunduhnya satu per satu, masing-masing dengan koneksi baru. Modul ini
+memakai request yang sama (gTTS._prepare_requests) tetapi mengirimnya
+bersamaan lewat satu requests.Session (koneksi keep-alive di-pool), dengan
+retry + backoff ber-jitter dan timeout per segmen. Hasil disusun kembali
+sesuai urutan segmen, sama persis dengan gTTS.write_to_fp()
+
+Penggunaan:
+  from gtts_parallel import fetch_tts
+  data = fetch_tts("Teks pengumuman yang panjang ...", lang="id", tld="co.id")
+"""
+import base64
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from gtts import gTTS
+from gtts.tts import gTTSError
+
+# ============================================
+# KONFIGURASI
+# ============================================
+MAX_WORKERS = 8            # Maksimal segmen yang diunduh bersamaan (semua pemanggil)
+POOL_SIZE = 10             # Koneksi keep-alive per host di connection pool
+RETRIES = 3                # Jumlah percobaan ulang per segmen
+BACKOFF_BASE = 0.25        # Backoff awal (detik), naik 2x tiap percobaan
+BACKOFF_MAX = 4.0          # Backoff maksimal (detik)
+CONNECT_TIMEOUT = 3.05     # Timeout koneksi per segmen (detik)
+READ_TIMEOUT = 10          # Timeout baca per segmen (detik)
+BASE_URL = os.getenv("GTTS_BASE_URL", "")   # Ganti scheme+host (mis. server stub lokal), kosong = Google
+
+# ============================================
+# CATATAN:
+# ============================================
+# - Status 429 / 5xx dan error koneksi/timeout di-retry dengan "full jitter":
+#   tunggu acak 0..min(BACKOFF_MAX, BACKOFF_BASE * 2^percobaan), atau sesuai Retry-After
+# - Status 4xx lain langsung gagal (request memang tidak valid)
+# - Waktu total kira-kira = segmen paling lambat, bukan jumlah semua segmen
+# ============================================
+
+AUDIO_PATTERN = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_session = None
+_executor = None
+_lock = threading.Lock()
+
+
+def get_session():
+    """Session bersama dengan connection pool (dibuat saat pertama dipakai)"""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="gtts-segment")
+        return _executor
+
+
+def prepare_requests(text, lang, tld, slow, base_url=None):
+    """Request per segmen dari gTTS (tokenisasi dan payload sama persis dengan gTTS)"""
+    prepared = gTTS(text=text, lang=lang, tld=tld, slow=slow)._prepare_requests()
+    base_url = BASE_URL if base_url is None else base_url
+    if base_url:
+        base = urlsplit(base_url)
+        for request in prepared:
+            url = urlsplit(request.url)
+            request.url = urlunsplit((base.scheme, base.netloc, url.path, url.query, url.fragment))
+    return prepared
+
+
+def decode_audio(body):
+    """Ambil bytes MP3 dari respons batchexecute (format sama dengan gTTS.stream)"""
+    chunks = []
+    for line in body.splitlines():
+        if "jQ1olc" not in line:
+            continue
+        match = AUDIO_PATTERN.search(line)
+        if not match:
+            raise gTTSError("Respons Google TTS tidak berisi audio")
+        chunks.append(base64.b64decode(match.group(1).encode("ascii")))
+    if not chunks:
+        raise gTTSError("Respons Google TTS tidak berisi audio")
+    return b"".join(chunks)
+
+
+def backoff_delay(attempt, retry_after=None):
+    if retry_after:
+        try:
+            return min(BACKOFF_MAX, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def fetch_segment(prepared, session=None, retries=RETRIES, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+    """Kirim satu segmen dengan retry, return bytes MP3 segmen tersebut"""
+    session = session or get_session()
+    # session.send() tidak membaca proxy dari environment, jadi diambil manual (seperti gTTS)
+    settings = session.merge_environment_settings(prepared.url, {}, None, None, None)
+    for attempt in range(retries + 1):
+        retry_after = None
+        try:
+            response = session.send(prepared, timeout=timeout, **settings)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == retries:
+                raise gTTSError(f"Gagal mengunduh segmen setelah {retries + 1} percobaan: {e}")
+        else:
+            if response.status_code == 200:
+                return decode_audio(response.text)
+            if response.status_code not in RETRY_STATUS or attempt == retries:
+                raise gTTSError(f"Google TTS membalas {response.status_code} {response.reason}")
+            retry_after = response.headers.get("Retry-After")
+        time.sleep(backoff_delay(attempt, retry_after))
+
+
+def fetch_segments(prepared, session=None):
+    """Unduh semua segmen bersamaan, return list bytes sesuai urutan segmen"""
+    if len(prepared) == 1:
+        return [fetch_segment(prepared[0], session)]
+    return list(get_executor().map(lambda request: fetch_segment(request, session), prepared))
+
+
+def fetch_tts(text, lang="id", tld="com", slow=False, base_url=None):
+    """
+    Pengganti gTTS(...).write_to_fp(): segmen diunduh paralel lalu disambung berurutan
+    Return: bytes MP3
+    """
+    data = b"".join(fetch_segments(prepare_requests(text, lang, tld, slow, base_url)))
+    if not data:
+        raise gTTSError("Audio dari Google TTS kosong")
+    return data
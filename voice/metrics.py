@@ -0,0 +1,326 @@
+"""
+Metrik pipeline suara (histogram, counter, gauge) dalam format teks Prometheus
+Tanpa dependency tambahan. Jika dimatikan (VOICE_METRICS=0), setiap pemanggilan
+hanya berupa satu pengecekan flag sehingga aman dibiarkan di kode produksi
+
+Penggunaan:
+  import metrics
+  with metrics.stage("fetch", backend="gtts") as s:
+      data = fetch(...)
+      s.bytes = len(data)
+  print(metrics.render())              # teks Prometheus
+  metrics.write_file("voice.prom")     # untuk textfile collector node_exporter
+  # server.py juga menyediakan GET /metrics
+"""
+import bisect
+import math
+import os
+import tempfile
+import threading
+import time
+
+# ============================================
+# KONFIGURASI METRIK
+# ============================================
+ENABLED = os.getenv("VOICE_METRICS", "1").lower() not in ("0", "false", "no", "off")
+METRICS_FILE = os.getenv("VOICE_METRICS_FILE", "")   # Jika di-set, script menulis metrik ke file ini saat selesai
+
+# Batas bucket histogram
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# ============================================
+# CATATAN:
+# ============================================
+# voice_stage_duration_seconds{backend,stage}  histogram durasi per tahap
+#   (fetch, decode, pitch, normalize, encode, encode_<codec>, synthesize, ...)
+# voice_stage_bytes{backend,stage}             histogram ukuran output per tahap
+# voice_stage_errors_total{backend,stage}      counter tahap yang gagal
+# voice_inflight{what}                         gauge pekerjaan yang sedang berjalan
+# voice_cache_*{cache}                         hit, miss, hit ratio, bytes (register_cache)
+# Label backend = nama backend TTS untuk tahap jaringan/sintesis, atau engine
+# post-processing ("dsp" / "pydub") untuk decode, pitch, normalize, encode
+# ============================================
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(key)} {_number(value)}" for key, value in items]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not ENABLED:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        if not ENABLED:
+            return
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+    def inc(self, amount=1, **labels):
+        if not ENABLED:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, buckets=DURATION_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        if not ENABLED:
+            return
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [jumlah per bucket (non-kumulatif) + bucket +Inf, sum]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', _number(float(bound))),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(key)} {cumulative}")
+        return lines
+
+
+class Callback(Metric):
+    """Metrik yang nilainya dihitung saat render: fn() -> angka atau {tuple label: angka}"""
+
+    def __init__(self, name, help, type, fn):
+        super().__init__(name, help)
+        self.type = type
+        self.fn = fn
+
+    def samples(self):
+        value = self.fn()
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [f"{self.name}{_labels(key)} {_number(v)}" for key, v in sorted(value.items())]
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _get_or_create(cls, name, *args):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, *args)
+        return metric
+
+
+def counter(name, help):
+    return _get_or_create(Counter, name, help)
+
+
+def gauge(name, help):
+    return _get_or_create(Gauge, name, help)
+
+
+def histogram(name, help, buckets=DURATION_BUCKETS):
+    return _get_or_create(Histogram, name, help, buckets)
+
+
+def register_callback(name, help, fn, type="gauge"):
+    """Daftarkan (atau ganti) metrik yang dihitung saat render, mis. hit ratio cache"""
+    with _registry_lock:
+        _registry[name] = Callback(name, help, type, fn)
+
+
+def register_cache(cache, name="audio"):
+    """Ekspor statistik AudioCache (hit, miss, hit ratio, ukuran) sebagai metrik callback"""
+    register_callback("voice_cache_hits_total", "Lookup cache yang ditemukan",
+                      lambda: {(("cache", name),): cache.stats()["hits"]}, "counter")
+    register_callback("voice_cache_misses_total", "Lookup cache yang tidak ditemukan",
+                      lambda: {(("cache", name),): cache.stats()["misses"]}, "counter")
+    register_callback("voice_cache_hit_ratio", "Rasio hit cache sejak proses dimulai",
+                      lambda: {(("cache", name),): cache.stats()["hit_ratio"]})
+    register_callback("voice_cache_bytes", "Total ukuran audio di cache",
+                      lambda: {(("cache", name),): cache.stats()["bytes"]})
+
+
+STAGE_SECONDS = histogram("voice_stage_duration_seconds", "Durasi tiap tahap pipeline suara (detik)")
+STAGE_BYTES = histogram("voice_stage_bytes", "Ukuran output tiap tahap pipeline suara (bytes)", BYTES_BUCKETS)
+STAGE_ERRORS = counter("voice_stage_errors_total", "Tahap pipeline suara yang gagal")
+INFLIGHT = gauge("voice_inflight", "Pekerjaan suara yang sedang berjalan")
+
+
+class _Stage:
+    """Context manager pencatat durasi (+ bytes jika diisi) satu tahap"""
+
+    __slots__ = ("stage", "backend", "bytes", "start")
+
+    def __init__(self, stage, backend):
+        self.stage = stage
+        self.backend = backend
+        self.bytes = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, backend=self.backend, stage=self.stage)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(backend=self.backend, stage=self.stage)
+        elif self.bytes is not None:
+            STAGE_BYTES.observe(self.bytes, backend=self.backend, stage=self.stage)
+        return False
+
+
+class _NoopStage:
+    """Pengganti _Stage saat metrik dimatikan (tanpa alokasi, tanpa timer)"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NOOP = _NoopStage()
+
+
+def stage(name, backend=""):
+    """with stage("decode", backend="gtts") as s: ...; s.bytes = len(data)"""
+    if not ENABLED:
+        return _NOOP
+    return _Stage(name, backend)
+
+
+class _Inflight:
+    __slots__ = ("what",)
+
+    def __init__(self, what):
+        self.what = what
+
+    def __enter__(self):
+        INFLIGHT.inc(what=self.what)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        INFLIGHT.dec(what=self.what)
+        return False
+
+
+def inflight(what):
+    """with inflight("synthesis"): ... (gauge voice_inflight naik selama blok berjalan)"""
+    if not ENABLED:
+        return _NOOP
+    return _Inflight(what)
+
+
+def render():
+    """Semua metrik dalam format teks Prometheus (text/plain; version=0.0.4)"""
+    with _registry_lock:
+        metrics = [_registry[name] for name in sorted(_registry)]
+    lines = []
+    for metric in metrics:
+        samples = metric.samples()
+        if samples:
+            lines.extend(metric.header())
+            lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path=None):
+    """Tulis metrik ke file secara atomik (aman dibaca textfile collector kapan saja)"""
+    path = path or METRICS_FILE
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(render())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+def write_if_configured():
+    """Dipanggil di akhir script: tulis metrik jika VOICE_METRICS_FILE di-set"""
+    if ENABLED and METRICS_FILE:
+        return write_file(METRICS_FILE)
+    return None
+
+
+def reset():
+    """Kosongkan semua nilai (dipakai benchmark / cek)"""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    for metric in metrics:
+        metric.clear()
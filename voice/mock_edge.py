@@ -0,0 +1,133 @@
+"""
+Mock server websocket lokal untuk layanan Edge TTS (speech.platform.bing.com)
+Setiap request SSML dijawab dengan audio rekaman (diputar ulang) per chunk
+setelah delay, sehingga backend edge / benchmark bisa diuji tanpa internet
+Memakai aiohttp (sudah ikut terinstall bersama edge-tts)
+
+Penggunaan:
+  python mock_edge.py --port 5058 --delay-ms 120
+  set EDGE_WSS_URL=ws://127.0.0.1:5058/edge/v1
+  python voice.py "Halo" --backend edge
+"""
+import argparse
+import asyncio
+import threading
+import time
+import uuid
+
+from aiohttp import WSMsgType, web
+
+REPLAY_FILE = "output_edge.mp3"
+HOST = "127.0.0.1"
+PORT = 5058
+DELAY = 0.12        # Latency sampai chunk audio pertama (detik)
+CHUNK_SIZE = 4096   # Ukuran chunk audio per pesan binary (bytes)
+PATH = "/edge/v1"
+
+
+def text_message(path, request_id, body="{}"):
+    return f"X-RequestId:{request_id}\r\nContent-Type:application/json; charset=utf-8\r\nPath:{path}\r\n\r\n{body}"
+
+
+def audio_message(request_id, data):
+    """Pesan binary: 2 byte panjang header + header + audio (format sama dengan layanan asli)"""
+    header = f"X-RequestId:{request_id}\r\nContent-Type:audio/mpeg\r\nPath:audio\r\n".encode("ascii")
+    return len(header).to_bytes(2, "big") + header + data
+
+
+class MockEdgeServer:
+    """Server websocket aiohttp di thread sendiri + statistik koneksi dan request"""
+
+    def __init__(self, host=HOST, port=PORT, delay=DELAY, audio=None, chunk_size=CHUNK_SIZE):
+        if audio is None:
+            with open(REPLAY_FILE, "rb") as f:
+                audio = f.read()
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.audio = audio
+        self.chunk_size = chunk_size
+        self.requests = 0
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        self._loop = None
+        self._runner = None
+        self._ready = threading.Event()
+
+    @property
+    def wss_url(self):
+        # Query TrustedClientToken ikut dikirim seperti URL asli (edge-tts menambah &ConnectionId=...)
+        return f"ws://{self.host}:{self.port}{PATH}?TrustedClientToken=mock"
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        async for message in ws:
+            if message.type != WSMsgType.TEXT or "Path:ssml" not in message.data:
+                continue   # speech.config cukup diterima
+            self.requests += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            try:
+                request_id = uuid.uuid4().hex
+                await ws.send_str(text_message("turn.start", request_id))
+                await asyncio.sleep(self.delay)
+                for i in range(0, len(self.audio), self.chunk_size):
+                    await ws.send_bytes(audio_message(request_id, self.audio[i:i + self.chunk_size]))
+                await ws.send_str(text_message("turn.end", request_id))
+            except ConnectionResetError:
+                break   # Klien menutup websocket di tengah jalan (mis. sintesis dibatalkan karena timeout)
+            finally:
+                self.active -= 1
+        return ws
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get(PATH, self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._start())
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self):
+        threading.Thread(target=self._run, name="mock-edge", daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock websocket Edge TTS untuk edge-tts")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--delay-ms", type=float, default=DELAY * 1000)
+    args = parser.parse_args()
+
+    server = MockEdgeServer(args.host, args.port, delay=args.delay_ms / 1000).start()
+    print(f"Mock Edge TTS: {server.wss_url} (replay {REPLAY_FILE})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\nMock dihentikan")
+    finally:
+        server.stop()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
@@ -0,0 +1,137 @@
+"""
+Mock server lokal untuk endpoint Google TTS (batchexecute) yang dipakai gTTS
+Setiap segmen dijawab dengan audio rekaman (diputar ulang) setelah delay,
+sehingga gtts_parallel / app.py bisa diuji tanpa internet
+
+Penggunaan:
+  python mock_gtts.py --port 5057 --delay-ms 80
+  set GTTS_BASE_URL=http://127.0.0.1:5057
+  python voice.py "Halo" --backend gtts
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+REPLAY_FILE = "output_id_normal.mp3"
+HOST = "127.0.0.1"
+PORT = 5057
+DELAY = 0.08      # Latency per segmen (detik)
+JITTER = 0.0      # Tambahan latency acak 0..JITTER (detik)
+PER_CHAR = 0.0    # Tambahan latency per karakter teks segmen (detik), sintesis asli makin lama untuk teks panjang
+
+
+def segment_text(body):
+    """Teks segmen dari body request gTTS (f.req = [[["jQ1olc", "[teks, lang, speed, null]", ...]]])"""
+    rpc = json.loads(parse_qs(body)["f.req"][0])
+    return json.loads(rpc[0][0][1])[0]
+
+
+class MockGTTSServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer + statistik request dan koneksi"""
+
+    daemon_threads = True
+
+    def __init__(self, host=HOST, port=PORT, audio_for=None, delay=DELAY, jitter=JITTER, seed=None, per_char=PER_CHAR):
+        """audio_for: fungsi teks segmen -> bytes (default: isi REPLAY_FILE)"""
+        super().__init__((host, port), GTTSHandler)
+        if audio_for is None:
+            with open(REPLAY_FILE, "rb") as f:
+                audio = f.read()
+            audio_for = lambda text: audio
+        self.audio_for = audio_for
+        self.delay = delay
+        self.jitter = jitter
+        self.per_char = per_char
+        self.fail_next = 0        # Jumlah request berikutnya yang dijawab 503
+        self.requests = 0
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name="mock-gtts", daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class GTTSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # Keep-alive, agar reuse koneksi terlihat
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode("utf-8")
+        with server._lock:
+            server.requests += 1
+            failing = server.fail_next > 0
+            if failing:
+                server.fail_next -= 1
+            delay = server.delay + server._random.random() * server.jitter
+        if failing:
+            self.reply(503, b"unavailable")
+            return
+        try:
+            text = segment_text(body)
+        except (KeyError, IndexError, ValueError):
+            self.reply(400, b"bad request")
+            return
+
+        time.sleep(delay + server.per_char * len(text))
+        audio = base64.b64encode(server.audio_for(text)).decode("ascii")
+        line = '[["wrb.fr","jQ1olc","[\\"%s\\"]",null,null,null,"generic"]]' % audio
+        self.reply(200, f")]}}'\n\n{len(line)}\n{line}\n".encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock endpoint Google TTS untuk gTTS")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--delay-ms", type=float, default=DELAY * 1000)
+    parser.add_argument("--jitter-ms", type=float, default=JITTER * 1000)
+    parser.add_argument("--per-char-ms", type=float, default=PER_CHAR * 1000)
+    args = parser.parse_args()
+
+    server = MockGTTSServer(args.host, args.port, delay=args.delay_ms / 1000, jitter=args.jitter_ms / 1000,
+                            per_char=args.per_char_ms / 1000)
+    print(f"Mock Google TTS: {server.base_url} (replay {REPLAY_FILE})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nMock dihentikan")
+    finally:
+        server.server_close()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
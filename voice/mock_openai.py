@@ -0,0 +1,151 @@
+"""
+Mock server lokal untuk endpoint OpenAI POST /v1/audio/speech
+Memutar ulang file MP3 yang ada secara bertahap (chunked) dengan delay,
+sehingga backend openai bisa diuji tanpa internet / API key asli
+
+Penggunaan:
+  python mock_openai.py --port 5056
+  set OPENAI_BASE_URL=http://127.0.0.1:5056/v1
+  set OPENAI_API_KEY=mock
+  python voice.py "Halo" --backend openai
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLAY_FILE = "output_id_normal.mp3"
+HOST = "127.0.0.1"
+PORT = 5056
+FIRST_BYTE_DELAY = 0.05    # Delay sebelum chunk pertama (detik)
+CHUNK_DELAY = 0.01         # Delay antar chunk (detik)
+CHUNK_SIZE = 4096
+
+
+class MockSpeechServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer + statistik request, koneksi, dan concurrency"""
+
+    daemon_threads = True
+
+    def __init__(self, host=HOST, port=PORT, audio=None, first_byte_delay=FIRST_BYTE_DELAY,
+                 chunk_delay=CHUNK_DELAY, rate_limit_first=0):
+        super().__init__((host, port), SpeechHandler)
+        if audio is None:
+            with open(REPLAY_FILE, "rb") as f:
+                audio = f.read()
+        self.audio = audio
+        self.first_byte_delay = first_byte_delay
+        self.chunk_delay = chunk_delay
+        self.rate_limit_first = rate_limit_first   # N request pertama dijawab 429
+        self.requests = 0
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        self.inputs = []
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name="mock-openai", daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class SpeechHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # Keep-alive, agar reuse koneksi terlihat
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.rstrip("/") != "/v1/audio/speech":
+            self.send_json(404, {"error": {"message": "Not found"}})
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict) or not all(payload.get(k) for k in ("input", "model", "voice")):
+            self.send_json(400, {"error": {"message": "input, model dan voice wajib diisi"}})
+            return
+        text = payload["input"]
+
+        with server._lock:
+            server.requests += 1
+            limited = server.requests <= server.rate_limit_first
+            if not limited:
+                server.active += 1
+                server.max_active = max(server.max_active, server.active)
+                server.inputs.append(text)
+        if limited:
+            self.send_json(429, {"error": {"message": "Rate limit (mock)"}}, {"Retry-After": "0"})
+            return
+
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            time.sleep(server.first_byte_delay)
+            audio = server.audio
+            for start in range(0, len(audio), CHUNK_SIZE):
+                chunk = audio[start:start + CHUNK_SIZE]
+                self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+                self.wfile.flush()
+                time.sleep(server.chunk_delay)
+            self.wfile.write(b"0\r\n\r\n")
+        finally:
+            with server._lock:
+                server.active -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock endpoint OpenAI /v1/audio/speech")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--first-byte-delay", type=float, default=FIRST_BYTE_DELAY)
+    parser.add_argument("--chunk-delay", type=float, default=CHUNK_DELAY)
+    args = parser.parse_args()
+
+    server = MockSpeechServer(args.host, args.port, first_byte_delay=args.first_byte_delay,
+                              chunk_delay=args.chunk_delay)
+    print(f"Mock OpenAI TTS: {server.base_url}/audio/speech (replay {REPLAY_FILE})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nMock dihentikan")
+    finally:
+        server.server_close()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
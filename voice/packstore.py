@@ -0,0 +1,521 @@
+"""
+Penyimpanan klip audio dalam pack file besar + index SQLite
+Klip ditambahkan (append) ke pack file, lokasinya dicatat di SQLite
+(key -> pack, offset, length, format, duration, hits, last_access).
+Baca = slice memoryview dari mmap pack, tanpa open/stat/read per klip dan tanpa copy
+Interface sama dengan AudioCache (get, put, meta, evict, stats, ...)
+
+Penggunaan:
+  from packstore import PackStore
+  store = PackStore()                      # atau VOICE_CACHE_BACKEND=pack (lihat cache.open_cache)
+  store.put(key, mp3_bytes, meta=meta)
+  view = store.get(key)                    # memoryview, tanpa copy
+  python packstore.py                      # statistik
+  python packstore.py compact              # compaction manual
+  python packstore.py migrate cache        # pindahkan isi AudioCache (folder) ke pack
+"""
+import json
+import mmap
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# ============================================
+# KONFIGURASI PACK STORE
+# ============================================
+PACK_DIR = os.getenv("VOICE_PACK_DIR", "packs")   # Folder pack file + index.sqlite
+PACK_SIZE = 64 * 1024 * 1024                       # Pack baru dibuat setelah ukuran ini (64 MB)
+PACK_MAX_BYTES = 200 * 1024 * 1024                 # Batas total ukuran klip hidup (200 MB)
+PACK_MAX_AGE = 30 * 24 * 3600                      # Umur maksimal entry sejak akses terakhir (30 hari)
+COMPACT_RATIO = 0.5                                # Pack di-compact jika >= 50% isinya sudah dibuang
+COMPACT_INTERVAL = 600                             # Interval compaction di background (detik)
+SEAL_AFTER = 3600                                  # Pack yang tidak ditulis selama ini dianggap tertutup (detik)
+TOUCH_FLUSH = 256                                  # Update hits/last_access ditulis ke SQLite per N akses
+AGE_SWEEP_INTERVAL = 60                            # Sweep entry kadaluarsa saat put paling sering per N detik
+
+# ============================================
+# CATATAN:
+# ============================================
+# - Setiap proses menulis ke pack miliknya sendiri (id dari tabel packs), sehingga
+#   server.py dan prerender_names.py aman berjalan bersamaan; SQLite (WAL) menjaga index
+# - Entry yang dibuang (LRU / kadaluarsa / ditimpa) hanya dihapus dari index;
+#   ruangnya diambil kembali oleh compaction: klip hidup dari pack yang sudah
+#   tertutup dan banyak ruang kosongnya disalin ke pack baru, lalu pack lama dihapus
+# - memoryview dari get() tetap valid walaupun pack-nya di-compact
+#   (mmap lama baru ditutup saat tidak ada lagi yang memakainya)
+# - hits/last_access dikumpulkan di memori dan ditulis per TOUCH_FLUSH akses
+#   (dan saat evict/compact/close), agar baca tidak selalu menulis ke SQLite
+# - Total ukuran klip hidup disimpan di memori (dihitung sekali dari index, diperbarui
+#   saat put/evict), jadi put tidak perlu SUM seluruh tabel; scan LRU hanya jalan jika
+#   total melewati max_bytes. Sweep kadaluarsa (max_age) dan hitung ulang total dari
+#   index (menyerap put/evict proses lain) paling sering sekali per AGE_SWEEP_INTERVAL
+# - Lokasi klip yang pernah dibaca disimpan di memori, sehingga hit berikutnya
+#   tanpa query SQLite. Entry yang dibuang proses lain bisa masih terbaca dari
+#   proses ini sampai di-restart (isinya tetap benar, hanya tidak ikut LRU)
+# - Pack yang belum ditutup hanya di-compact jika proses pemiliknya (packs.owner = PID)
+#   sudah tidak berjalan, walau lama tidak ditulis (server yang sedang sepi)
+# ============================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS packs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    size INTEGER NOT NULL DEFAULT 0,
+    sealed INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    owner INTEGER
+);
+CREATE TABLE IF NOT EXISTS clips (
+    key TEXT PRIMARY KEY,
+    pack INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    format TEXT,
+    duration REAL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    last_access REAL NOT NULL,
+    created REAL NOT NULL,
+    meta TEXT
+);
+CREATE INDEX IF NOT EXISTS clips_lru ON clips (last_access);
+CREATE INDEX IF NOT EXISTS clips_pack ON clips (pack);
+"""
+
+
+class PackStore:
+    """Cache audio dalam pack file + index SQLite, dengan eviction LRU dan compaction"""
+
+    def __init__(self, directory=PACK_DIR, max_bytes=PACK_MAX_BYTES, max_age=PACK_MAX_AGE,
+                 ext="mp3", pack_size=PACK_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.ext = ext
+        self.pack_size = pack_size
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()         # Counter, touch dan map
+        self._write_lock = threading.Lock()   # Append ke pack milik proses ini
+        self._local = threading.local()
+        self._maps = {}                       # pack id -> mmap (read-only)
+        self._touched = {}                    # key -> [tambahan hits, last_access]
+        self._locations = {}                  # key -> (pack, offset, length, last_access di index)
+        self._pack_id = None
+        self._pack_file = None
+        self._live_bytes = 0                  # Total length klip di index (lihat CATATAN)
+        self._last_sweep = 0.0                # time.monotonic() sweep kadaluarsa terakhir
+        self._compactor = None
+        self._stop = threading.Event()
+
+        os.makedirs(self.directory, exist_ok=True)
+        conn = self._db()
+        conn.executescript(SCHEMA)
+        if "owner" not in [row[1] for row in conn.execute("PRAGMA table_info(packs)")]:
+            conn.execute("ALTER TABLE packs ADD COLUMN owner INTEGER")   # Index dari versi sebelumnya
+        self.evict()
+
+    # ---------- SQLite & file ----------
+
+    def _db(self):
+        """Koneksi SQLite per thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _pack_path(self, pack_id):
+        return os.path.join(self.directory, f"pack-{pack_id:06d}.dat")
+
+    def _view(self, pack_id, offset, length):
+        """memoryview ke isi klip di mmap pack (map ulang jika pack sudah bertambah)"""
+        with self._lock:
+            mapped = self._maps.get(pack_id)
+            if mapped is None or len(mapped) < offset + length:
+                with open(self._pack_path(pack_id), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                # mmap lama tidak ditutup paksa: memoryview yang masih dipakai tetap valid
+                self._maps[pack_id] = mapped
+        return memoryview(mapped)[offset:offset + length]
+
+    def _unmap(self, pack_id):
+        with self._lock:
+            mapped = self._maps.pop(pack_id, None)
+        if mapped is not None:
+            try:
+                mapped.close()
+            except BufferError:
+                pass   # Masih ada memoryview aktif; ditutup otomatis saat tidak dipakai
+
+    def _writable(self, length):
+        """Pack milik proses ini yang masih muat (harus dipanggil dengan _write_lock)"""
+        if self._pack_file is not None and self._pack_file.tell() + length > self.pack_size and self._pack_file.tell():
+            self._seal()
+        if self._pack_file is None:
+            conn = self._db()
+            with conn:
+                self._pack_id = conn.execute("INSERT INTO packs (created, owner) VALUES (?, ?)",
+                                             (time.time(), os.getpid())).lastrowid
+            self._pack_file = open(self._pack_path(self._pack_id), "ab")
+        return self._pack_id, self._pack_file
+
+    def _seal(self):
+        """Tutup pack yang sedang ditulis (boleh di-compact setelahnya)"""
+        if self._pack_file is None:
+            return
+        size = self._pack_file.tell()
+        self._pack_file.close()
+        conn = self._db()
+        with conn:
+            conn.execute("UPDATE packs SET sealed = 1, size = ? WHERE id = ?", (size, self._pack_id))
+        self._pack_file = None
+        self._pack_id = None
+
+    def _append(self, data):
+        """Tambahkan data ke pack, return (pack id, offset)"""
+        pack_id, f = self._writable(len(data))
+        offset = f.tell()
+        f.write(data)
+        f.flush()
+        return pack_id, offset
+
+    def _flush_touches(self):
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if not touched:
+            return
+        conn = self._db()
+        with conn:
+            conn.executemany(
+                "UPDATE clips SET hits = hits + ?, last_access = MAX(last_access, ?) WHERE key = ?",
+                [(hits, last, key) for key, (hits, last) in touched.items()])
+        # Lokasi di memori ikut diperbarui, agar klip yang sering dipakai tidak terlihat kadaluarsa
+        for key, (_, last) in touched.items():
+            row = self._locations.get(key)
+            if row is not None and row[3] < last:
+                self._locations[key] = (row[0], row[1], row[2], last)
+
+    # ---------- Interface AudioCache ----------
+
+    def _lookup(self, key, now, cached=True):
+        row = self._locations.get(key) if cached else None
+        from_memory = row is not None
+        if row is None:
+            row = self._db().execute(
+                "SELECT pack, offset, length, last_access FROM clips WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._locations[key] = row
+        with self._lock:
+            pending = self._touched.get(key)
+        last_access = max(row[3], pending[1]) if pending else row[3]
+        if self.max_age is not None and now - last_access > self.max_age:
+            if from_memory:
+                # last_access di memori bisa sudah tertinggal (akses proses lain): cek index dulu
+                return self._lookup(key, now, cached=False)
+            return None
+        return row
+
+    def __contains__(self, key):
+        return self._lookup(key, time.time()) is not None
+
+    def __len__(self):
+        return self._db().execute("SELECT COUNT(*) FROM clips").fetchone()[0]
+
+    def path_for(self, key):
+        """Klip di pack tidak punya file sendiri"""
+        return None
+
+    def get(self, key, read=True):
+        """
+        Ambil audio dari pack
+        Return: memoryview (atau True jika read=False) saat hit, None saat miss
+        """
+        now = time.time()
+        for attempt in range(2):
+            row = self._lookup(key, now, cached=attempt == 0)
+            if row is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+            pack_id, offset, length, _ = row
+            try:
+                data = self._view(pack_id, offset, length) if read else True
+            except FileNotFoundError:
+                continue   # Pack baru saja di-compact proses lain: baca ulang lokasi dari index
+            break
+        else:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            touch = self._touched.setdefault(key, [0, now])
+            touch[0] += 1
+            touch[1] = now
+            flush = len(self._touched) >= TOUCH_FLUSH
+        if flush:
+            self._flush_touches()
+        return data
+
+    def put(self, key, data, meta=None, format=None):
+        """
+        Tambahkan audio ke pack dan catat di index, lalu jalankan eviction
+        meta: dict metadata klip (opsional, lihat dsp.analyze)
+        """
+        now = time.time()
+        duration = meta.get("duration_ms") if meta else None
+        with self._write_lock:
+            pack_id, offset = self._append(data)
+            conn = self._db()
+            with conn:
+                conn.execute("UPDATE packs SET size = ? WHERE id = ?", (offset + len(data), pack_id))
+                replaced = conn.execute("SELECT length FROM clips WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO clips (key, pack, offset, length, format, duration, hits, last_access, created, meta)"
+                    " VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?)",
+                    (key, pack_id, offset, len(data), format or self.ext, duration, now, now,
+                     json.dumps(meta) if meta is not None else None))
+        with self._lock:
+            self._touched.pop(key, None)
+            self._live_bytes += len(data) - (replaced[0] if replaced else 0)
+            sweep = time.monotonic() - self._last_sweep >= AGE_SWEEP_INTERVAL
+        self._locations[key] = (pack_id, offset, len(data), now)
+        if sweep:
+            self.evict()
+        else:
+            self._forget(self._evict_lru(self._db()))
+        return None
+
+    def meta(self, key):
+        """Metadata klip (dict) atau None"""
+        row = self._db().execute("SELECT meta FROM clips WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def set_meta(self, key, meta):
+        """Simpan metadata untuk entry yang sudah ada"""
+        conn = self._db()
+        with conn:
+            updated = conn.execute("UPDATE clips SET meta = ?, duration = ? WHERE key = ?",
+                                   (json.dumps(meta), meta.get("duration_ms"), key)).rowcount
+        return updated > 0
+
+    def evict(self):
+        """Buang entry kadaluarsa, hitung ulang total ukuran, lalu entry LRU sampai di bawah batas"""
+        self._flush_touches()
+        conn = self._db()
+        victims = []
+        with conn:
+            if self.max_age is not None:
+                victims += conn.execute("SELECT key FROM clips WHERE last_access < ?",
+                                        (time.time() - self.max_age,)).fetchall()
+                conn.executemany("DELETE FROM clips WHERE key = ?", victims)
+            total = conn.execute("SELECT COALESCE(SUM(length), 0) FROM clips").fetchone()[0]
+        with self._lock:
+            self._live_bytes = total
+            self._last_sweep = time.monotonic()
+        victims += self._evict_lru(conn)
+        return self._forget(victims)
+
+    def _evict_lru(self, conn):
+        """Buang entry paling lama tidak diakses sampai _live_bytes <= max_bytes, return [(key,)]"""
+        with self._lock:
+            over = self.max_bytes is not None and self._live_bytes > self.max_bytes
+        if not over:
+            return []
+        self._flush_touches()
+        lru = []
+        with conn:
+            with self._lock:
+                total = self._live_bytes
+            freed = 0
+            for key, length in conn.execute("SELECT key, length FROM clips ORDER BY last_access"):
+                if total - freed <= self.max_bytes:
+                    break
+                lru.append((key,))
+                freed += length
+            conn.executemany("DELETE FROM clips WHERE key = ?", lru)
+        with self._lock:
+            self._live_bytes -= freed
+        return lru
+
+    def _forget(self, victims):
+        for (key,) in victims:
+            self._locations.pop(key, None)
+        with self._lock:
+            self.evictions += len(victims)
+        return len(victims)
+
+    def compact(self, min_dead_ratio=COMPACT_RATIO):
+        """
+        Salin klip hidup dari pack tertutup yang banyak ruang kosongnya ke pack baru,
+        lalu hapus pack lama. Return: (jumlah pack di-compact, bytes yang diambil kembali)
+        """
+        self._flush_touches()
+        conn = self._db()
+        stale = time.time() - SEAL_AFTER
+        candidates = []
+        for pack_id, size, sealed, owner in conn.execute(
+                "SELECT p.id, p.size, p.sealed, p.owner FROM packs p WHERE p.id != ?", (self._pack_id or -1,)).fetchall():
+            path = self._pack_path(pack_id)
+            if not sealed:
+                # Pack proses lain yang masih berjalan tidak boleh disentuh, walau lama tidak ditulis
+                if owner is not None and _process_alive(owner):
+                    continue
+                try:
+                    if os.path.getmtime(path) > stale:
+                        continue
+                except FileNotFoundError:
+                    pass
+            live = conn.execute("SELECT COALESCE(SUM(length), 0) FROM clips WHERE pack = ?", (pack_id,)).fetchone()[0]
+            if size == 0 or 1 - live / size >= min_dead_ratio:
+                candidates.append((pack_id, size, live))
+
+        packs = 0
+        reclaimed = 0
+        for pack_id, size, live in candidates:
+            rows = conn.execute("SELECT key, offset, length FROM clips WHERE pack = ?", (pack_id,)).fetchall()
+            moved = []
+            with self._write_lock:
+                for key, offset, length in rows:
+                    new_pack, new_offset = self._append(self._view(pack_id, offset, length))
+                    moved.append((new_pack, new_offset, key, pack_id, offset))
+                with conn:
+                    if moved:
+                        conn.execute("UPDATE packs SET size = ? WHERE id = ?",
+                                     (self._pack_file.tell(), self._pack_id))
+                    # Hanya pindahkan entry yang tidak ditimpa selama compaction berjalan
+                    conn.executemany(
+                        "UPDATE clips SET pack = ?, offset = ? WHERE key = ? AND pack = ? AND offset = ?", moved)
+                    conn.execute("DELETE FROM packs WHERE id = ?", (pack_id,))
+            for new_pack, new_offset, key, _, offset in moved:
+                self._locations.pop(key, None)
+            self._unmap(pack_id)
+            try:
+                os.remove(self._pack_path(pack_id))
+            except FileNotFoundError:
+                pass
+            except PermissionError:
+                continue   # Windows: file masih di-map, dicoba lagi pada compaction berikutnya
+            packs += 1
+            reclaimed += size - live
+        return packs, reclaimed
+
+    def start_compactor(self, interval=COMPACT_INTERVAL):
+        """Jalankan evict + compact secara berkala di thread background"""
+        if self._compactor is not None:
+            return self._compactor
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.evict()
+                    self.compact()
+                except Exception as e:
+                    print(f"⚠️  Compaction pack gagal: {e}")
+
+        self._compactor = threading.Thread(target=loop, name="pack-compactor", daemon=True)
+        self._compactor.start()
+        return self._compactor
+
+    def stats(self):
+        """Statistik: hit/miss, rasio hit, entry, bytes hidup, pack, bytes di disk"""
+        conn = self._db()
+        entries, live = conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM clips").fetchone()
+        packs, disk = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM packs").fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": live,
+                "packs": packs,
+                "pack_bytes": disk,
+                "dead_bytes": disk - live,
+            }
+
+    def close(self):
+        """Hentikan compactor, tulis akses tertunda, tutup pack yang sedang ditulis"""
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+        self._flush_touches()
+        with self._write_lock:
+            self._seal()
+        for pack_id in list(self._maps):
+            self._unmap(pack_id)
+
+
+def _process_alive(pid):
+    """True jika proses pid masih berjalan (di luar POSIX selalu dianggap masih berjalan)"""
+    if pid == os.getpid():
+        return True
+    if os.name != "posix":
+        return True   # os.kill(pid, 0) di Windows justru menghentikan proses
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True   # Proses ada, milik user lain
+    return True
+
+
+def migrate(source_dir, store):
+    """Pindahkan isi AudioCache (folder file per klip) ke pack store, return jumlah klip"""
+    from cache import AudioCache
+
+    source = AudioCache(source_dir, max_bytes=None, max_age=None, ext=store.ext)
+    count = 0
+    for key in source.keys():
+        data = source.get(key)
+        if data is not None:
+            store.put(key, data, meta=source.meta(key))
+            count += 1
+    return count
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    store = PackStore()
+    try:
+        print("=" * 50)
+        print("PACK STORE AUDIO")
+        print("=" * 50)
+        if command == "compact":
+            packs, reclaimed = store.compact()
+            print(f"✓ {packs} pack di-compact, {reclaimed:,} bytes diambil kembali")
+        elif command == "migrate":
+            source_dir = sys.argv[2] if len(sys.argv) > 2 else "cache"
+            count = migrate(source_dir, store)
+            print(f"✓ {count} klip dipindahkan dari {source_dir}/ ke {store.directory}/")
+        elif command != "stats":
+            print(f"✗ Perintah tidak dikenal: {command} (stats, compact, migrate [folder])")
+            return False
+        stats = store.stats()
+        print(f"Folder: {store.directory}")
+        print(f"Jumlah entry: {stats['entries']}")
+        print(f"Ukuran klip: {stats['bytes']:,} bytes ({stats['bytes'] / 1024 / 1024:.2f} MB)")
+        print(f"Pack: {stats['packs']} file, {stats['pack_bytes']:,} bytes ({stats['dead_bytes']:,} bytes kosong)")
+        return True
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
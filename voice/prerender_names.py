@@ -0,0 +1,189 @@
+"""
+Pre-render klip nama semua karyawan dari export tabel employee_data
+Sehingga scan pertama setelah deploy tidak perlu request ke Google TTS
+
+Export tabel dari PostgreSQL (CSV atau JSON):
+  psql -c "\\copy (SELECT employee_id, name FROM employee_data) TO 'employees.csv' CSV HEADER"
+
+Penggunaan:
+  python prerender_names.py employees.csv
+  python prerender_names.py employees.json --workers 4 --rate 5
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import app
+from cache import open_cache
+from templates import render_to_cache
+
+# ============================================
+# KONFIGURASI
+# ============================================
+WORKERS = 4                   # Jumlah thread render paralel
+RATE_PER_SEC = 5.0            # Maksimal request gTTS per detik (hindari rate limit Google)
+CHECKPOINT_FILE = "prerender_checkpoint.json"
+CHECKPOINT_EVERY = 25         # Simpan checkpoint setiap N klip selesai
+
+
+class RateLimiter:
+    """Token bucket sederhana yang aman dipakai banyak thread"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def load_employees(path):
+    """Baca export employee_data (CSV atau JSON), return list of (employee_id, name)"""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+        if isinstance(rows, dict):
+            rows = rows.get("rows") or rows.get("data") or []
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    employees = []
+    for row in rows:
+        row = {str(k).strip().lower(): v for k, v in row.items()}
+        name = (row.get("name") or "").strip()
+        if name:
+            employees.append((str(row.get("employee_id", "")).strip(), name))
+    return employees
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return {"done": [], "failed": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    """Simpan checkpoint secara atomik (tulis file sementara lalu rename)"""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".checkpoint-", suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def prerender(employees, cache, workers=WORKERS, rate=RATE_PER_SEC,
+              checkpoint_file=CHECKPOINT_FILE, checkpoint_every=CHECKPOINT_EVERY):
+    """
+    Render klip nama untuk semua karyawan yang belum ada di cache
+    Return: dict statistik (rendered, skipped, failed, elapsed, clips_per_sec)
+    """
+    # Checkpoint dicatat per kunci cache (bukan employee_id: bisa kosong, dan nama bisa berubah);
+    # yang menentukan dilewati atau tidak tetap isi cache, agar cache yang dikosongkan di-render ulang
+    checkpoint = load_checkpoint(checkpoint_file)
+    done = set(checkpoint["done"])
+    failed = {}
+
+    todo = {}
+    skipped = 0
+    for employee_id, name in employees:
+        key = app.cache_key_for(name, output_format="mp3")
+        if key in cache:
+            skipped += 1
+            done.add(key)
+            continue
+        done.discard(key)
+        # Nama yang sama cukup di-render sekali
+        todo.setdefault(name, (key, []))[1].append(employee_id)
+
+    limiter = RateLimiter(rate, burst=workers)
+    rendered = 0
+
+    def job(name):
+        limiter.acquire()
+        render_to_cache(cache, name)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(job, name): name for name in todo}
+        for i, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            key, ids = todo[name]
+            try:
+                future.result()
+                rendered += 1
+                done.add(key)
+            except Exception as e:
+                failed[name] = {"employee_ids": ids, "error": f"{type(e).__name__}: {e}"}
+                print(f"  ✗ {name}: {e}")
+
+            if i % checkpoint_every == 0:
+                save_checkpoint(checkpoint_file, {"done": sorted(done), "failed": failed})
+                elapsed = time.perf_counter() - start
+                print(f"  → {i}/{len(todo)} selesai ({i / elapsed:.1f} klip/detik)")
+
+    save_checkpoint(checkpoint_file, {"done": sorted(done), "failed": failed})
+    elapsed = time.perf_counter() - start
+    return {
+        "total": len(employees),
+        "rendered": rendered,
+        "skipped": skipped,
+        "failed": len(failed),
+        "elapsed": elapsed,
+        "clips_per_sec": rendered / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render klip nama karyawan ke cache audio")
+    parser.add_argument("input", help="File export employee_data (.csv atau .json)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Jumlah thread render")
+    parser.add_argument("--rate", type=float, default=RATE_PER_SEC, help="Maksimal request per detik")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="File checkpoint progress")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PRE-RENDER NAMA KARYAWAN")
+    print("=" * 60)
+    employees = load_employees(args.input)
+    print(f"Input: {args.input} ({len(employees)} karyawan)")
+    print(f"Workers: {args.workers}, rate: {args.rate}/detik")
+    print()
+
+    stats = prerender(employees, open_cache(), workers=args.workers, rate=args.rate,
+                      checkpoint_file=args.checkpoint)
+
+    print()
+    print("=" * 60)
+    print(f"Di-render: {stats['rendered']}")
+    print(f"Dilewati (sudah ada): {stats['skipped']}")
+    print(f"Gagal: {stats['failed']}")
+    print(f"Waktu: {stats['elapsed']:.1f} detik ({stats['clips_per_sec']:.2f} klip/detik)")
+    print("=" * 60)
+    if stats["failed"]:
+        print(f"⚠️  Detail error tersimpan di {args.checkpoint}, jalankan ulang untuk mencoba lagi")
+    return stats["failed"] == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
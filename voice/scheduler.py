@@ -0,0 +1,261 @@
+"""
+Antrian pengumuman per kiosk untuk voice service (asyncio)
+Saat jam makan, scan datang lebih cepat daripada sintesis; tanpa antrian
+request menumpuk tanpa batas dan kiosk memutar audio yang sudah basi.
+Scheduler ini:
+  - menyimpan antrian prioritas per kiosk (penolakan didahulukan dari sapaan)
+  - membuang pengumuman yang menunggu lebih lama dari DEADLINE
+  - menggabungkan pengumuman untuk karyawan yang sama (yang lebih penting menang,
+    prioritas sama: yang terbaru)
+  - menolak request baru (429 + Retry-After) jika kapasitas sintesis penuh
+
+Penggunaan (lihat server.py):
+  scheduler = AnnouncementScheduler(workers=4)
+  audio = await scheduler.submit(job, kiosk="kiosk-1", priority=PRIORITY["rejection"], dedupe="budi")
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+
+import metrics
+
+# ============================================
+# KONFIGURASI SCHEDULER
+# ============================================
+DEADLINE = float(os.getenv("VOICE_DEADLINE", "4"))         # Pengumuman lebih tua dari ini dibuang (detik)
+KIOSK_QUEUE = int(os.getenv("VOICE_KIOSK_QUEUE", "3"))     # Maksimal pengumuman menunggu per kiosk
+MAX_PENDING = int(os.getenv("VOICE_MAX_PENDING", "32"))    # Maksimal pengumuman menunggu di semua kiosk
+DEFAULT_KIOSK = "default"
+
+# Semakin kecil semakin didahulukan
+PRIORITY = {"rejection": 0, "info": 1, "greeting": 2}
+TEMPLATE_PRIORITY = {
+    "ovt_not_registered": "rejection",
+    "ovt_already_scanned": "rejection",
+    "scan_rejected": "rejection",
+    "ovt_permission_granted": "info",
+    "ovt_permission_exists": "info",
+    "scan_normal": "greeting",
+    "scan_overtime": "greeting",
+}
+
+# ============================================
+# CATATAN:
+# ============================================
+# - Hanya sintesis (cache miss) yang lewat antrian; cache hit langsung dikirim
+# - Kiosk lain tidak ikut menunggu: antrian dipilih berdasarkan prioritas kepala
+#   antrian, lalu kiosk yang paling lama tidak dilayani (round-robin)
+# - Antrian kiosk penuh: pengumuman baru menggeser pengumuman prioritas paling rendah
+#   jika lebih penting (mis. penolakan menggeser sapaan), selain itu ditolak 429
+# - Penggabungan per karyawan tidak menurunkan prioritas: sapaan baru tidak menggantikan
+#   penolakan yang masih menunggu (sapaan itu yang dibuang "merged"), sebaliknya penolakan
+#   baru menggantikan sapaan yang masih menunggu
+# - Retry-After diperkirakan dari jumlah antrian / workers x rata-rata waktu sintesis
+# - Pengumuman yang dibuang/digabung dijawab 204 (kiosk tidak memutar apa-apa)
+#   dengan header X-Announcement: stale / merged / evicted
+# ============================================
+
+QUEUE_EVENTS = metrics.counter("voice_announcements_total", "Pengumuman per hasil antrian (played, stale, merged, ...)")
+QUEUE_WAIT = metrics.histogram("voice_announcement_wait_seconds", "Waktu tunggu pengumuman di antrian")
+
+
+class Dropped(Exception):
+    """Pengumuman tidak diputar: basi (stale), digabung (merged) atau digeser (evicted)"""
+
+    def __init__(self, reason):
+        super().__init__(f"Pengumuman dibuang ({reason})")
+        self.reason = reason
+
+
+class Saturated(Exception):
+    """Kapasitas sintesis penuh, klien diminta mencoba lagi setelah retry_after detik"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Kapasitas sintesis penuh, coba lagi dalam {retry_after} detik")
+        self.retry_after = retry_after
+
+
+class Announcement:
+    """Satu pengumuman di antrian; urutan heap = (prioritas, urutan masuk)"""
+
+    __slots__ = ("job", "kiosk", "priority", "dedupe", "created", "seq", "future")
+
+    def __init__(self, job, kiosk, priority, dedupe, created, seq, future):
+        self.job = job
+        self.kiosk = kiosk
+        self.priority = priority
+        self.dedupe = dedupe
+        self.created = created
+        self.seq = seq
+        self.future = future
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+def priority_for(template=None, level=None):
+    """Prioritas dari nama level ("rejection", ...) atau template; default "info" """
+    if level is not None:
+        if level not in PRIORITY:
+            raise ValueError(f"Prioritas tidak dikenal: {level} (pilihan: {', '.join(PRIORITY)})")
+        return PRIORITY[level]
+    return PRIORITY[TEMPLATE_PRIORITY.get(template, "info")]
+
+
+class AnnouncementScheduler:
+    """Antrian prioritas per kiosk + worker asyncio sebanyak kapasitas sintesis"""
+
+    def __init__(self, workers=4, deadline=DEADLINE, kiosk_queue=KIOSK_QUEUE, max_pending=MAX_PENDING,
+                 clock=time.monotonic):
+        self.workers = workers
+        self.deadline = deadline
+        self.kiosk_queue = kiosk_queue
+        self.max_pending = max_pending
+        self.clock = clock
+        self._queues = {}          # kiosk -> heap Announcement
+        self._served = {}          # kiosk -> nomor urut terakhir dilayani (round-robin)
+        self._seq = itertools.count()
+        self._turn = itertools.count()
+        self._wakeup = None
+        self._tasks = []
+        self.pending = 0
+        self.running = 0
+        self.avg_seconds = 1.0     # Rata-rata waktu sintesis (EWMA), untuk Retry-After
+        self.counts = {"played": 0, "stale": 0, "merged": 0, "evicted": 0, "rejected": 0}
+
+    def _start(self):
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for queue in self._queues.values():
+            for item in queue:
+                self._drop(item, "stale", count=False)
+        self._queues.clear()
+        self.pending = 0
+
+    def retry_after(self):
+        """Perkiraan detik sampai antrian cukup longgar (dibulatkan ke atas, minimal 1)"""
+        return max(1, math.ceil((self.pending + self.running) / self.workers * self.avg_seconds))
+
+    def _count(self, event):
+        self.counts[event] += 1
+        QUEUE_EVENTS.inc(result=event)
+
+    def _drop(self, item, reason, count=True):
+        if count:
+            self._count(reason)
+        if not item.future.done():
+            item.future.set_exception(Dropped(reason))
+
+    def _remove(self, queue, items):
+        for item in items:
+            queue.remove(item)
+        heapq.heapify(queue)
+        self.pending -= len(items)
+
+    def admit(self):
+        """Raise Saturated jika antrian semua kiosk penuh (untuk pekerjaan di luar antrian, mis. streaming)"""
+        if self.pending >= self.max_pending:
+            self._count("rejected")
+            raise Saturated(self.retry_after())
+
+    async def submit(self, job, kiosk=DEFAULT_KIOSK, priority=PRIORITY["info"], dedupe=None):
+        """
+        Antrikan job (coroutine function tanpa argumen) lalu tunggu hasilnya
+        dedupe: kunci karyawan; pengumuman lama di kiosk yang sama dengan kunci ini digabung
+                (yang prioritasnya lebih tinggi dipertahankan)
+        Raise Dropped jika dibuang, Saturated jika antrian penuh
+        """
+        self._start()
+        kiosk = kiosk or DEFAULT_KIOSK
+        queue = self._queues.setdefault(kiosk, [])
+        if dedupe is not None:
+            same = [item for item in queue if item.dedupe == dedupe]
+            if any(item.priority < priority for item in same):
+                # Sudah ada pengumuman lebih penting untuk karyawan ini: yang baru tidak diputar
+                self._count("merged")
+                raise Dropped("merged")
+            merged = [item for item in same if item.priority >= priority]
+            for item in merged:
+                self._drop(item, "merged")
+            self._remove(queue, merged)
+
+        item = Announcement(job, kiosk, priority, dedupe, self.clock(), next(self._seq),
+                            asyncio.get_running_loop().create_future())
+        if len(queue) >= self.kiosk_queue:
+            worst = max(queue)
+            if not item < worst:
+                self._count("rejected")
+                raise Saturated(self.retry_after())
+            self._drop(worst, "evicted")
+            self._remove(queue, [worst])
+        else:
+            self.admit()
+
+        heapq.heappush(queue, item)
+        self.pending += 1
+        self._wakeup.set()
+        return await item.future
+
+    def _next(self):
+        """Ambil pengumuman berikutnya (buang yang basi / sudah ditinggal klien), None jika kosong"""
+        now = self.clock()
+        while True:
+            ready = [(queue[0].priority, self._served.get(kiosk, -1), kiosk)
+                     for kiosk, queue in self._queues.items() if queue]
+            if not ready:
+                return None
+            _, _, kiosk = min(ready)
+            item = heapq.heappop(self._queues[kiosk])
+            self.pending -= 1
+            if item.future.done():   # Klien sudah putus
+                continue
+            if now - item.created > self.deadline:
+                self._drop(item, "stale")
+                continue
+            self._served[kiosk] = next(self._turn)
+            return item
+
+    async def _worker(self):
+        while True:
+            item = self._next()
+            if item is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            QUEUE_WAIT.observe(self.clock() - item.created)
+            self.running += 1
+            start = self.clock()
+            try:
+                result = await item.job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            else:
+                self._count("played")
+                if not item.future.done():
+                    item.future.set_result(result)
+            finally:
+                self.running -= 1
+                self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * (self.clock() - start)
+
+    def stats(self):
+        return {
+            "pending": self.pending,
+            "running": self.running,
+            "kiosks": {kiosk: len(queue) for kiosk, queue in self._queues.items() if queue},
+            "avg_synthesis_ms": round(self.avg_seconds * 1000, 1),
+            **self.counts,
+        }
@@ -0,0 +1,418 @@
+"""
+Service HTTP (asyncio) untuk pengumuman suara kiosk
+Endpoint /speak menerima template + nama (atau teks bebas) dan mengembalikan
+audio MP3 dari cache atau hasil sintesis baru
+Request identik yang datang bersamaan digabung menjadi satu sintesis (single-flight)
+Pekerjaan blocking (gTTS, pydub) dijalankan di thread pool terbatas
+Sintesis diantrikan per kiosk dengan prioritas, batas umur dan backpressure (scheduler.py)
+
+Penggunaan:
+  python server.py
+  curl "http://127.0.0.1:5055/speak?template=scan_overtime&name=Budi" -o budi.mp3
+  curl "http://127.0.0.1:5055/speak?text=Halo" -o halo.mp3
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import app
+import metrics
+import streaming
+from scheduler import AnnouncementScheduler, Dropped, Saturated, priority_for
+from cache import open_cache
+from templates import TEMPLATES, TemplateRenderer
+
+# ============================================
+# KONFIGURASI SERVICE
+# ============================================
+HOST = os.getenv("VOICE_HOST", "127.0.0.1")
+PORT = int(os.getenv("VOICE_PORT", "5055"))
+MAX_WORKERS = int(os.getenv("VOICE_WORKERS", "4"))   # Maksimal sintesis blocking bersamaan
+MAX_BODY = 16 * 1024                                  # Ukuran body request maksimal (bytes)
+MAX_TEXT = 500                                        # Panjang teks bebas maksimal (karakter)
+REQUEST_TIMEOUT = 30                                  # Timeout baca request (detik)
+
+# ============================================
+# CATATAN:
+# ============================================
+# GET  /speak?template=scan_overtime&name=Budi   -> audio/mpeg
+# GET  /speak?text=Halo                          -> audio/mpeg
+# GET  /speak?template=...&name=Budi&kiosk=kiosk-1  -> antrian per kiosk (scheduler.py)
+#      &priority=rejection|info|greeting           -> prioritas teks bebas (template: otomatis)
+#      -> 204 + X-Announcement: stale/merged/evicted jika dibuang, 429 + Retry-After jika penuh
+# GET  /speak?text=Halo&format=kiosk             -> audio/ogg (preset/spec lihat formats.py)
+# GET  /speak?template=ovt_not_registered&name=Budi&stream=1
+#                                                -> chunked, satu potongan audio per klausa (streaming.py)
+# POST /speak  {"template": "...", "name": "..."} atau {"text": "..."} (+ "format")
+# GET  /health                                   -> statistik cache & sintesis (JSON)
+# GET  /metrics                                  -> metrik format teks Prometheus (lihat metrics.py)
+# Header X-Cache: HIT / MISS / SHARED (digabung dengan request lain yang sedang jalan)
+# ============================================
+
+REQUESTS = metrics.counter("voice_http_requests_total", "Request HTTP per endpoint dan status")
+
+STATUS_TEXT = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+    500: "Internal Server Error",
+}
+
+
+class BadRequest(Exception):
+    """Parameter request tidak valid (HTTP 400)"""
+
+
+class SingleFlight:
+    """Gabungkan pemanggilan dengan key sama yang sedang berjalan menjadi satu"""
+
+    def __init__(self):
+        self._inflight = {}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def __contains__(self, key):
+        return key in self._inflight
+
+    async def do(self, key, factory):
+        """
+        Jalankan coroutine dari factory() untuk key, atau tunggu yang sedang jalan
+        Return: (hasil, shared) - shared True jika ikut hasil pemanggilan lain
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task), False
+
+
+class VoiceService:
+    """Logika /speak: cache -> single-flight -> antrian kiosk -> sintesis di executor"""
+
+    def __init__(self, cache=None, max_workers=MAX_WORKERS):
+        self.cache = cache if cache is not None else open_cache()
+        self.renderer = TemplateRenderer(cache=self.cache)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="voice")
+        self.flight = SingleFlight()
+        self.scheduler = AnnouncementScheduler(workers=max_workers)
+        self.synth_count = 0
+        self.shared_count = 0
+        metrics.register_cache(self.cache)
+        if hasattr(self.cache, "start_compactor"):
+            self.cache.start_compactor()   # Pack store: evict + compact di background
+        metrics.register_callback("voice_singleflight_inflight", "Key yang sedang disintesis (single-flight)",
+                                  lambda: len(self.flight))
+
+    @staticmethod
+    def resolve_format(params):
+        try:
+            return app.resolve_format(params.get("format") or None)
+        except ValueError as e:
+            raise BadRequest(str(e))
+
+    def resolve(self, params):
+        """Validasi parameter, return (key, fungsi render blocking, OutputFormat)"""
+        template = params.get("template")
+        text = params.get("text")
+        fmt = self.resolve_format(params)
+        if template:
+            if template not in TEMPLATES:
+                raise BadRequest(f"Template tidak dikenal: {template}")
+            name = (params.get("name") or "karyawan").strip()[:MAX_TEXT]
+            return (self.renderer.cache_key(template, fmt, name=name),
+                    lambda: self.renderer.render_cached(template, fmt, name=name)[0], fmt)
+        if text:
+            text = text.strip()
+            if len(text) > MAX_TEXT:
+                raise BadRequest(f"Teks terlalu panjang (maksimal {MAX_TEXT} karakter)")
+            return (app.cache_key_for(text, output_format=fmt),
+                    lambda: bytes(app.get_audio(text, cache=self.cache, output_format=fmt)[0]), fmt)
+        raise BadRequest("Parameter 'template' atau 'text' wajib diisi")
+
+    @staticmethod
+    def announcement(params):
+        """Parameter antrian: (kiosk, prioritas, kunci karyawan untuk penggabungan)"""
+        template = params.get("template")
+        try:
+            priority = priority_for(template, params.get("priority") or None)
+        except ValueError as e:
+            raise BadRequest(str(e))
+        employee = params.get("employee") or (params.get("name") if template else None)
+        dedupe = employee.strip().lower() if employee else None
+        return params.get("kiosk") or None, priority, dedupe
+
+    async def speak(self, params):
+        """Return (bytes audio, status cache: HIT/MISS/SHARED, content type)"""
+        key, render, fmt = self.resolve(params)
+
+        # Cache hangat: baca langsung tanpa lewat executor
+        data = self.cache.get(key)
+        if data is not None:
+            return data, "HIT", fmt.mime
+
+        loop = asyncio.get_running_loop()
+
+        async def run():
+            self.synth_count += 1
+            with metrics.inflight("server_synthesis"):
+                return await loop.run_in_executor(self.executor, render)
+
+        if key in self.flight:
+            # Audio yang sama sedang disintesis: ikut hasilnya tanpa mengambil slot antrian
+            data, shared = await self.flight.do(key, run)
+        else:
+            kiosk, priority, dedupe = self.announcement(params)
+            data, shared = await self.scheduler.submit(lambda: self.flight.do(key, run), kiosk, priority, dedupe)
+        if shared:
+            self.shared_count += 1
+        return data, ("SHARED" if shared else "MISS"), fmt.mime
+
+    def stream(self, params):
+        """
+        Potongan audio per klausa (lihat streaming.py), return (async iterator bytes, content type)
+        Template diucapkan sebagai teks utuh; setiap klausa di-cache sendiri
+        """
+        template = params.get("template")
+        text = (params.get("text") or "").strip()
+        fmt = self.resolve_format(params)
+        if fmt.codec == "wav":
+            raise BadRequest("Format wav tidak bisa di-stream, gunakan pcm16 / mp3 / kiosk")
+        if template:
+            if template not in TEMPLATES:
+                raise BadRequest(f"Template tidak dikenal: {template}")
+            name = (params.get("name") or "karyawan").strip()[:MAX_TEXT]
+            text = TEMPLATES[template].format(name=name)
+        elif not text:
+            raise BadRequest("Parameter 'template' atau 'text' wajib diisi")
+        elif len(text) > MAX_TEXT:
+            raise BadRequest(f"Teks terlalu panjang (maksimal {MAX_TEXT} karakter)")
+        self.scheduler.admit()
+        self.synth_count += 1
+        render = streaming.gtts_renderer(self.cache, fmt)
+        return streaming.astream(text, render, executor=self.executor), fmt.mime
+
+    def health(self):
+        return {
+            "status": "ok",
+            "cache": self.cache.stats(),
+            "synthesized": self.synth_count,
+            "coalesced": self.shared_count,
+            "in_flight": len(self.flight),
+            "queue": self.scheduler.stats(),
+        }
+
+    async def stop(self):
+        await self.scheduler.stop()
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        if hasattr(self.cache, "close"):
+            self.cache.close()
+
+
+async def read_request(reader):
+    """Baca satu request HTTP/1.1, return (method, path, query, headers, body) atau None"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise BadRequest("Request line tidak valid")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise BadRequest("Content-Length tidak valid")
+    if length < 0:
+        raise BadRequest("Content-Length tidak valid")
+    if length > MAX_BODY:
+        raise BadRequest("Body terlalu besar")
+    body = await reader.readexactly(length) if length else b""
+
+    url = urlsplit(target)
+    return method.upper(), url.path, dict(parse_qsl(url.query)), headers, body
+
+
+def response_head(status, length, content_type="application/json", headers=None, keep_alive=True):
+    """Header response; length None = Transfer-Encoding: chunked"""
+    lines = [
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {length}" if length is not None else "Transfer-Encoding: chunked",
+        "Access-Control-Allow-Origin: *",
+        "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+        "Access-Control-Allow-Headers: Content-Type",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    for name, value in (headers or {}).items():
+        lines.append(f"{name}: {value}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def build_response(status, body=b"", content_type="application/json", headers=None, keep_alive=True):
+    return response_head(status, len(body), content_type, headers, keep_alive) + body
+
+
+def json_body(data):
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+class VoiceServer:
+    """Server HTTP minimal di atas asyncio.start_server"""
+
+    def __init__(self, service=None, host=HOST, port=PORT):
+        self.service = service if service is not None else VoiceService()
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await self.service.stop()
+
+    async def dispatch(self, method, path, query, body):
+        """Return (status, body, content_type, extra headers)"""
+        if method == "OPTIONS":
+            return 204, b"", "text/plain", {}
+        if path == "/health":
+            return 200, json_body(self.service.health()), "application/json", {}
+        if path == "/metrics":
+            return 200, metrics.render().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8", {}
+        if path != "/speak":
+            return 404, json_body({"error": "Endpoint tidak ditemukan"}), "application/json", {}
+        if method not in ("GET", "POST"):
+            return 405, json_body({"error": "Method tidak didukung"}), "application/json", {}
+
+        params = dict(query)
+        if method == "POST" and body:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                raise BadRequest("Body harus berupa JSON")
+            if not isinstance(payload, dict):
+                raise BadRequest("Body harus berupa object JSON")
+            params.update({k: str(v) for k, v in payload.items() if v is not None})
+
+        if params.get("stream", "").lower() in ("1", "true", "yes"):
+            chunks, content_type = self.service.stream(params)
+            return 200, chunks, content_type, {"X-Stream": "clauses", "Cache-Control": "no-store"}
+
+        start = time.perf_counter()
+        data, cache_status, content_type = await self.service.speak(params)
+        elapsed = time.perf_counter() - start
+        elapsed_ms = elapsed * 1000
+        metrics.STAGE_SECONDS.observe(elapsed, backend="server", stage=f"speak_{cache_status.lower()}")
+        headers = {"X-Cache": cache_status, "X-Synthesis-Time": f"{elapsed_ms:.1f}ms",
+                   "Cache-Control": "public, max-age=86400"}
+        return 200, data, content_type, headers
+
+    async def write_chunked(self, writer, status, chunks, content_type, headers, keep_alive):
+        """
+        Kirim potongan audio dengan chunked transfer begitu siap
+        Return False jika koneksi harus ditutup (gagal di tengah stream, status sudah terkirim)
+        """
+        writer.write(response_head(status, None, content_type, headers, keep_alive))
+        try:
+            async for data in chunks:
+                writer.write(f"{len(data):x}\r\n".encode("latin-1"))
+                writer.write(data)
+                writer.write(b"\r\n")
+                await writer.drain()
+        except Exception:
+            # Tanpa chunk penutup: klien tahu response terpotong
+            await chunks.aclose()
+            return False
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return keep_alive
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), REQUEST_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except BadRequest as e:
+                    writer.write(build_response(400, json_body({"error": str(e)}), keep_alive=False))
+                    break
+                if request is None:
+                    break
+
+                method, path, query, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    status, payload, content_type, extra = await self.dispatch(method, path, query, body)
+                except BadRequest as e:
+                    status, payload, content_type, extra = 400, json_body({"error": str(e)}), "application/json", {}
+                except Dropped as e:
+                    status, payload, content_type, extra = 204, b"", "text/plain", {"X-Announcement": e.reason}
+                except Saturated as e:
+                    status, payload, content_type, extra = (
+                        429, json_body({"error": str(e)}), "application/json", {"Retry-After": str(e.retry_after)})
+                except Exception as e:
+                    status, payload, content_type, extra = (
+                        500, json_body({"error": str(e), "type": type(e).__name__}), "application/json", {})
+
+                REQUESTS.inc(path=path if path in ("/speak", "/health", "/metrics") else "other", status=status)
+                if hasattr(payload, "__aiter__"):
+                    if not await self.write_chunked(writer, status, payload, content_type, extra, keep_alive):
+                        break
+                    continue
+                # Header dan body ditulis terpisah: body (memoryview dari pack store) tidak di-copy
+                writer.write(response_head(status, len(payload), content_type, extra, keep_alive))
+                writer.write(payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+async def serve():
+    server = await VoiceServer().start()
+    print("=" * 60)
+    print("VOICE SERVICE (asyncio)")
+    print("=" * 60)
+    print(f"Listening: http://{server.host}:{server.port}")
+    print(f"Workers sintesis: {MAX_WORKERS}")
+    print(f"Template: {', '.join(TEMPLATES)}")
+    print()
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\nService dihentikan")
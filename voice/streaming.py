@@ -0,0 +1,253 @@
+"""
+Streaming pengumuman per kalimat/klausa
+Teks dipecah menjadi kalimat lalu klausa (koma, titik koma), setiap potongan
+disintesis + post-processing (trim, pitch, format output) sendiri, dan hasilnya
+di-yield berurutan begitu siap. Selama satu potongan diputar/dikirim, potongan
+berikutnya sudah disintesis (lookahead satu tahap), sehingga kata pertama
+terdengar setelah klausa pertama siap, bukan setelah seluruh kalimat
+
+Penggunaan:
+  import streaming
+  for chunk in streaming.stream("Maaf Budi, anda belum terdaftar di penjadwalan lembur."):
+      player.write(chunk)
+  python streaming.py "Maaf Budi, anda belum terdaftar di penjadwalan lembur. Hubungi atasan anda terlebih dahulu"
+  python streaming.py "Halo, apa kabar" --backend openai
+"""
+import argparse
+import asyncio
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import app
+
+# ============================================
+# KONFIGURASI STREAMING
+# ============================================
+LOOKAHEAD = 1            # Jumlah potongan yang disintesis di depan potongan yang sedang di-yield
+MIN_CHUNK_CHARS = 6      # Klausa lebih pendek dari ini digabung dengan klausa berikutnya (mis. "Ya,")
+MAX_CHUNK_CHARS = 100    # Klausa lebih panjang dipecah di batas kata (sama dengan batas segmen gTTS)
+OUTPUT_FILE = "output_stream.mp3"
+
+# ============================================
+# CATATAN:
+# ============================================
+# - Setiap potongan adalah file audio utuh (MP3 / Ogg-Opus / PCM) sehingga bisa
+#   langsung diputar; MP3 dan Ogg yang disambung tetap bisa diputar sebagai satu stream.
+#   WAV tidak bisa disambung (header RIFF per potongan), gunakan pcm16 untuk audio mentah
+# - Potongan gTTS memakai app.get_audio(): trim senyap, pitch dan format output
+#   per potongan, dan setiap klausa masuk cache sendiri. Klausa yang sering muncul
+#   (mis. "Hubungi atasan anda terlebih dahulu") dipakai ulang lintas pengumuman
+# - Backend lain (openai, azure, ...) lewat registry backends; audio backend di-trim
+#   dan di-encode ke format output per potongan (pitch app.py khusus gTTS)
+# - Pengganti stream_to_file (app_openai.py) / speak_ssml_async (app_azure.py) yang
+#   menunggu satu kalimat penuh sebelum audio pertama bisa diputar
+# ============================================
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def _split_long(clause, max_chars):
+    """Pecah klausa yang terlalu panjang di batas kata"""
+    pieces = []
+    current = ""
+    for word in clause.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_text(text, min_chars=MIN_CHUNK_CHARS, max_chars=MAX_CHUNK_CHARS):
+    """
+    Pecah teks menjadi potongan per kalimat lalu per klausa
+    Tanda baca tetap ikut di potongannya (intonasi TTS akhir klausa/kalimat)
+    Return: list string, urut sesuai teks
+    """
+    chunks = []
+    for sentence in SENTENCE_END.split(text.strip()):
+        pending = ""
+        for clause in CLAUSE_END.split(sentence.strip()):
+            clause = clause.strip()
+            if not clause:
+                continue
+            pending = f"{pending} {clause}" if pending else clause
+            if len(pending) >= min_chars:
+                chunks.extend(_split_long(pending, max_chars))
+                pending = ""
+        if pending:
+            # Sisa pendek di akhir kalimat ikut potongan sebelumnya
+            if chunks and len(chunks[-1]) + 1 + len(pending) <= max_chars:
+                chunks[-1] = f"{chunks[-1]} {pending}"
+            else:
+                chunks.append(pending)
+    return chunks
+
+
+def gtts_renderer(cache=None, output_format=None):
+    """Fungsi render potongan lewat gTTS + post-processing app.py (cache per klausa)"""
+    fmt = app.resolve_format(output_format)
+
+    def render(chunk):
+        return bytes(app.get_audio(chunk, cache=cache, output_format=fmt)[0])
+    return render
+
+
+def backend_renderer(name, output_format=None, **params):
+    """Fungsi render potongan lewat backend dari registry (openai, azure, edge, ...)"""
+    from backends import get_backend
+
+    backend = get_backend(name)
+    fmt = app.resolve_format(output_format)
+    processing = app.NUMPY_AVAILABLE and (app.trims_silence() or fmt.spec() != backend.extension)
+
+    def render(chunk):
+        data = backend.synthesize(chunk, **params)
+        if not processing:
+            return data
+        import dsp
+        import formats
+        samples, rate = dsp.decode(data, format=backend.extension)
+        if app.trims_silence():
+            samples, _, _ = dsp.trim(samples, rate, app.SILENCE_THRESHOLD_DB, app.SILENCE_PAD_MS)
+        return formats.encode(samples, rate, fmt)
+    return render
+
+
+def stream(text, render=None, lookahead=LOOKAHEAD, executor=None):
+    """
+    Generator potongan audio siap putar, berurutan
+    render: fungsi teks potongan -> bytes (default: gtts_renderer() tanpa cache)
+    Potongan i+1..i+lookahead disintesis di thread lain selama potongan i di-yield
+    """
+    render = render or gtts_renderer()
+    chunks = iter(split_text(text))
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=lookahead + 1, thread_name_prefix="stream")
+    # Potongan pertama + (lookahead - 1) di depannya; setelah potongan i selesai,
+    # potongan i+lookahead dikirim sehingga i+1..i+lookahead berjalan selama i di-yield
+    pending = deque(executor.submit(render, chunk) for chunk in islice(chunks, max(1, lookahead)))
+    try:
+        while pending:
+            data = pending.popleft().result()
+            pending.extend(executor.submit(render, chunk) for chunk in islice(chunks, lookahead - len(pending)))
+            yield data
+            if not pending:
+                # lookahead = 0: potongan berikutnya baru dimulai setelah potongan ini dipakai
+                pending.extend(executor.submit(render, chunk) for chunk in islice(chunks, 1))
+    finally:
+        # Konsumen berhenti lebih awal: batalkan potongan yang belum mulai
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False)
+
+
+async def astream(text, render=None, lookahead=LOOKAHEAD, executor=None):
+    """
+    Versi asyncio dari stream(): render blocking dijalankan di executor (None = default loop)
+    Dipakai server.py untuk /speak?stream=1 (chunked transfer)
+    """
+    render = render or gtts_renderer()
+    loop = asyncio.get_running_loop()
+    chunks = iter(split_text(text))
+    pending = deque(loop.run_in_executor(executor, render, chunk) for chunk in islice(chunks, max(1, lookahead)))
+    try:
+        while pending:
+            data = await pending.popleft()
+            pending.extend(loop.run_in_executor(executor, render, chunk)
+                           for chunk in islice(chunks, lookahead - len(pending)))
+            yield data
+            if not pending:
+                pending.extend(loop.run_in_executor(executor, render, chunk) for chunk in islice(chunks, 1))
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def measure(text, render, lookahead=LOOKAHEAD):
+    """
+    Bandingkan waktu audio pertama: streaming per klausa vs render kalimat utuh
+    Return: dict (first_chunk_ms, stream_total_ms, whole_ms, chunks, bytes)
+    """
+    start = time.perf_counter()
+    first = None
+    data = []
+    for chunk in stream(text, render, lookahead):
+        if first is None:
+            first = time.perf_counter() - start
+        data.append(chunk)
+    stream_total = time.perf_counter() - start
+
+    start = time.perf_counter()
+    render(text)
+    whole = time.perf_counter() - start
+    return {
+        "first_chunk_ms": first * 1000,
+        "stream_total_ms": stream_total * 1000,
+        "whole_ms": whole * 1000,
+        "chunks": len(data),
+        "bytes": b"".join(data),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming pengumuman per kalimat/klausa (lookahead satu tahap)")
+    parser.add_argument("text", nargs="?", default=("Maaf Budi, anda belum terdaftar di penjadwalan lembur. "
+                                                    "Hubungi atasan anda terlebih dahulu"))
+    parser.add_argument("--backend", default="gtts", help="gtts (app.py) atau nama backend lain (openai, azure, ...)")
+    parser.add_argument("--format", default=None, help="Format output (lihat formats.py), default app.OUTPUT_FORMAT")
+    parser.add_argument("--lookahead", type=int, default=LOOKAHEAD)
+    parser.add_argument("--output", default=None, help=f"File output (default: {OUTPUT_FILE} dengan ekstensi format)")
+    args = parser.parse_args()
+
+    try:
+        fmt = app.resolve_format(args.format)
+    except ValueError as e:
+        print(f"✗ ERROR: {e}")
+        return False
+    if fmt.codec == "wav":
+        print("✗ ERROR: WAV tidak bisa di-stream per potongan, gunakan pcm16 / mp3 / kiosk")
+        return False
+    if args.backend == "gtts":
+        render = gtts_renderer(output_format=fmt)
+    else:
+        render = backend_renderer(args.backend, output_format=fmt)
+
+    print("=" * 60)
+    print("STREAMING PER KALIMAT / KLAUSA")
+    print("=" * 60)
+    print(f"Backend: {args.backend}, format: {fmt.spec()}, lookahead: {args.lookahead}")
+    for i, chunk in enumerate(split_text(args.text), 1):
+        print(f"  {i}. {chunk}")
+    print()
+
+    try:
+        result = measure(args.text, render, args.lookahead)
+    except Exception as e:
+        print(f"✗ ERROR: {e}")
+        return False
+
+    output = args.output or OUTPUT_FILE.rsplit(".", 1)[0] + "." + fmt.extension
+    with open(output, "wb") as f:
+        f.write(result["bytes"])
+    print(f"Audio pertama (streaming): {result['first_chunk_ms']:7.0f} ms")
+    print(f"Semua potongan selesai:    {result['stream_total_ms']:7.0f} ms ({result['chunks']} potongan)")
+    print(f"Kalimat utuh (tanpa stream): {result['whole_ms']:5.0f} ms")
+    print()
+    print(f"✓ Berhasil! File tersimpan di: {output} ({len(result['bytes']):,} bytes)")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
@@ -0,0 +1,273 @@
+"""
+Engine template kalimat (concatenative) untuk pengumuman hasil scan
+Setiap potongan kalimat yang tetap di-render sekali saja, hanya slot nama
+yang di-render saat dibutuhkan, lalu potongan disambung dengan crossfade
+pendek dan loudness yang disamakan
+Membutuhkan pydub (lihat app.py)
+"""
+import string
+import sys
+import time
+
+from pydub import AudioSegment
+
+import app
+import audio_codec
+import formats
+from cache import make_key, open_cache
+
+try:
+    import dsp
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# ============================================
+# KONFIGURASI TEMPLATE
+# ============================================
+# Sama dengan kalimat di public/script.js (speakScanResult)
+# dan public/ovt-input.js (speakOvtResult)
+TEMPLATES = {
+    "scan_normal": "Selamat makan {name}, selamat menikmati, silakan mengantri",
+    "scan_overtime": "Selamat makan {name}, semangat lemburnya, silakan mengantri",
+    "ovt_not_registered": "Maaf {name}, anda belum terdaftar di penjadwalan lembur. Hubungi atasan anda terlebih dahulu",
+    "ovt_already_scanned": "Anda sudah scan makan overtime wahai {name}, silakan kembali besok",
+    "scan_rejected": "Scan ditolak, hubungi atasan untuk input jadwal makan overtime",
+    "ovt_permission_granted": "Izin OVT untuk {name} telah diberikan. Silakan lakukan scan di halaman utama",
+    "ovt_permission_exists": "Izin OVT untuk {name} sudah diberikan hari ini",
+}
+
+CROSSFADE_MS = 25        # Panjang crossfade antar potongan (ms)
+TARGET_DBFS = -16.0      # Loudness target setiap potongan (dBFS)
+PAUSE_MS = {",": 120, ".": 280}   # Jeda di batas potongan yang diawali tanda baca
+OUTPUT_FILE = "output_template.mp3"
+
+# ============================================
+# CATATAN:
+# ============================================
+# - Potongan tetap (mis. "Selamat makan", "semangat lemburnya, silakan mengantri")
+#   di-render sekali lalu disimpan di memori dan di cache disk
+# - Nama karyawan di-render per scan, dan juga masuk cache,
+#   sehingga scan berikutnya untuk nama yang sama tanpa request ke Google TTS
+# - Parameter suara (LANG, TLD, SLOW, PITCH_SHIFT) mengikuti app.py
+# - Loudness (RMS) setiap potongan dihitung sekali saat di-render dan disimpan
+#   sebagai metadata di cache, sehingga penyamaan loudness saat render kalimat
+#   hanya satu perkalian gain tanpa scan ulang audio
+# ============================================
+
+
+def split_template(template):
+    """
+    Pecah template menjadi daftar potongan
+    Return: list of (jenis, isi, jeda_ms), jenis = "text" atau "slot"
+    """
+    parts = []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        text = literal.strip()
+        if text:
+            # Tanda baca di awal potongan diganti dengan jeda hening
+            pause = PAUSE_MS.get(text[0], 0)
+            text = text.lstrip(",. ").strip()
+            if text:
+                parts.append(("text", text, pause))
+            elif pause:
+                parts.append(("pause", "", pause))
+        if field:
+            parts.append(("slot", field, 0))
+    return parts
+
+
+def synthesize_segment(text):
+    """
+    Render satu potongan teks dengan gTTS + trim senyap + pitch dari app.py, langsung di memori
+    Return: (AudioSegment, offset trim untuk metadata)
+    """
+    audio = audio_codec.decode_segment(app.fetch_tts(text), format="mp3")
+    trim_info = {}
+    if app.trims_silence():
+        audio, trim_info = dsp.trim_segment(audio, app.SILENCE_THRESHOLD_DB, app.SILENCE_PAD_MS)
+    if app.PITCH_SHIFT != 0:
+        audio = app.pitch_segment(audio, app.PITCH_SHIFT)
+    return audio, trim_info
+
+
+def clip_meta(audio):
+    """Metadata loudness potongan (lihat dsp.analyze); tanpa numpy hanya peak, RMS dan durasi"""
+    if NUMPY_AVAILABLE:
+        return dsp.analyze_segment(audio)
+    silent = audio.rms == 0
+    return {
+        "duration_ms": float(len(audio)),
+        "peak_dbfs": None if silent else audio.max_dBFS,
+        "rms_dbfs": None if silent else audio.dBFS,
+        "start_ms": 0.0,
+        "end_ms": float(len(audio)),
+    }
+
+
+def render_to_cache(cache, text):
+    """
+    Render potongan lalu simpan hasil encode MP3-nya + metadata loudness ke cache
+    Return: (AudioSegment, metadata)
+    """
+    audio, trim_info = synthesize_segment(text)
+    meta = clip_meta(audio)
+    meta.update(trim_info)
+    cache.put(app.cache_key_for(text, output_format="mp3"), audio_codec.encode_segment(audio, "mp3"), meta=meta)
+    return audio, meta
+
+
+def match_loudness(audio, target_dbfs=TARGET_DBFS, meta=None):
+    """
+    Samakan loudness potongan ke target dBFS
+    meta: metadata dari cache (rms_dbfs) agar tidak perlu scan ulang audio
+    """
+    if meta is not None and "rms_dbfs" in meta:
+        rms_dbfs = meta["rms_dbfs"]
+    else:
+        rms_dbfs = None if audio.rms == 0 else audio.dBFS
+    if rms_dbfs is None:
+        return audio
+    return audio.apply_gain(target_dbfs - rms_dbfs)
+
+
+def splice(segments, crossfade_ms=CROSSFADE_MS):
+    """Sambung potongan audio dengan crossfade pendek"""
+    result = segments[0]
+    for segment in segments[1:]:
+        fade = min(crossfade_ms, len(result), len(segment))
+        result = result.append(segment, crossfade=fade)
+    return result
+
+
+class TemplateRenderer:
+    """Render kalimat dari template dengan potongan yang di-cache"""
+
+    def __init__(self, templates=TEMPLATES, cache=None, crossfade_ms=CROSSFADE_MS, target_dbfs=TARGET_DBFS):
+        self.templates = templates
+        self.cache = cache if cache is not None else open_cache()
+        self.crossfade_ms = crossfade_ms
+        self.target_dbfs = target_dbfs
+        self._parts = {name: split_template(t) for name, t in templates.items()}
+        self._fragments = {}   # teks potongan tetap -> AudioSegment (sudah disamakan loudness-nya)
+
+    def _load(self, text):
+        """
+        Ambil potongan dari cache disk, atau render lalu simpan ke cache
+        Return: (AudioSegment, metadata)
+        """
+        key = app.cache_key_for(text, output_format="mp3")
+        data = self.cache.get(key)
+        if data is None:
+            return render_to_cache(self.cache, text)
+        audio = audio_codec.decode_segment(data, format="mp3")
+        meta = self.cache.meta(key)
+        if meta is None:
+            # Entry lama tanpa metadata: hitung sekali lalu simpan
+            meta = clip_meta(audio)
+            self.cache.set_meta(key, meta)
+        return audio, meta
+
+    def fragment(self, text):
+        """Potongan tetap: di-render sekali lalu disimpan di memori"""
+        audio = self._fragments.get(text)
+        if audio is None:
+            audio, meta = self._load(text)
+            audio = match_loudness(audio, self.target_dbfs, meta)
+            self._fragments[text] = audio
+        return audio
+
+    def slot(self, text):
+        """Isi slot (nama): di-render saat dibutuhkan, hanya disimpan di cache disk"""
+        audio, meta = self._load(text)
+        return match_loudness(audio, self.target_dbfs, meta)
+
+    def prerender(self):
+        """Render semua potongan tetap dari semua template"""
+        count = 0
+        for parts in self._parts.values():
+            for kind, text, _ in parts:
+                if kind == "text" and text not in self._fragments:
+                    self.fragment(text)
+                    count += 1
+        return count
+
+    def render(self, template_name, **slots):
+        """Render kalimat lengkap sebagai AudioSegment"""
+        parts = self._parts[template_name]
+        segments = []
+        for kind, value, pause in parts:
+            if pause:
+                segments.append(AudioSegment.silent(duration=pause))
+            if kind == "text":
+                segments.append(self.fragment(value))
+            elif kind == "slot":
+                segments.append(self.slot(str(slots[value])))
+        return splice(segments, self.crossfade_ms)
+
+    def render_bytes(self, template_name, format=None, **slots):
+        """Render kalimat lengkap lalu encode ke bytes (format: preset/spec formats.py, None = app.OUTPUT_FORMAT)"""
+        return formats.encode_segment(self.render(template_name, **slots), app.resolve_format(format))
+
+    def cache_key(self, template_name, format=None, **slots):
+        """Kunci cache untuk kalimat lengkap hasil splice"""
+        sentence = self.templates[template_name].format(**slots)
+        params = {"template": template_name, "lang": app.LANG, "tld": app.TLD, "slow": app.SLOW}
+        chain = []
+        if app.trims_silence():
+            chain.append(("trim", app.SILENCE_THRESHOLD_DB, app.SILENCE_PAD_MS))
+        chain += app.pitch_chain(app.PITCH_SHIFT) + [("loudness", self.target_dbfs), ("crossfade", self.crossfade_ms)]
+        fmt = app.resolve_format(format)
+        if not fmt.is_default_mp3():
+            chain.append(("format", fmt.spec()))
+        return make_key("gtts-template", sentence, params, chain)
+
+    def render_cached(self, template_name, format=None, **slots):
+        """
+        Render kalimat lengkap dengan cache untuk hasil akhirnya
+        Return: (bytes audio, from_cache)
+        """
+        key = self.cache_key(template_name, format, **slots)
+        data = self.cache.get(key)
+        if data is not None:
+            return data, True
+        data = self.render_bytes(template_name, format, **slots)
+        self.cache.put(key, data)
+        return data, False
+
+
+def main():
+    template_name = sys.argv[1] if len(sys.argv) > 1 else "scan_overtime"
+    name = sys.argv[2] if len(sys.argv) > 2 else "Budi Santoso"
+
+    print("=" * 60)
+    print("TEMPLATE KALIMAT PENGUMUMAN (concatenative)")
+    print("=" * 60)
+    print(f"Template: {template_name}")
+    print(f"Kalimat: {TEMPLATES[template_name].format(name=name)}")
+    print()
+
+    renderer = TemplateRenderer()
+
+    start = time.perf_counter()
+    count = renderer.prerender()
+    print(f"1. Pre-render {count} potongan tetap: {time.perf_counter() - start:.2f} detik")
+
+    start = time.perf_counter()
+    data = renderer.render_bytes(template_name, name=name)
+    print(f"2. Render kalimat (nama baru/cache): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    renderer.render_bytes(template_name, name=name)
+    print(f"3. Render ulang (nama dari cache): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    with open(OUTPUT_FILE, "wb") as f:
+        f.write(data)
+    print()
+    print(f"✓ Berhasil! File tersimpan di: {OUTPUT_FILE} ({len(data):,} bytes)")
+    stats = renderer.cache.stats()
+    print(f"  Cache: {stats['hits']} hit, {stats['misses']} miss")
+
+
+if __name__ == "__main__":
+    main()
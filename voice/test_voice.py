@@ -1,17 +1,39 @@
-import os
+"""
+Tes suara edge-tts di dalam proses (tanpa os.system / proses edge-tts baru)
+Audio diterima sebagai bytes lewat backend edge (API async edge-tts),
+sehingga teks berisi tanda kutip tetap aman
 
-text = "Halo, ini adalah percobaan menggunakan perintah sistem. Semoga berhasil."
+Penggunaan:
+  python test_voice.py
+  python test_voice.py "Selamat makan Budi \"Ucok\""
+"""
+import sys
+
+from backends import BackendError, get_backend
+
+text = "Halo, ini adalah percobaan menggunakan edge-tts di dalam proses. Semoga berhasil."
 voice = "id-ID-GadisNeural"
 output = "audio_final.mp3"
 
-# Menjalankan perintah terminal lewat Python
-command = f'edge-tts --text "{text}" --voice {voice} --write-media {output}'
 
-print("Sedang menjalankan perintah...")
-exit_code = os.system(command)
+def main():
+    message = sys.argv[1] if len(sys.argv) > 1 else text
+
+    print("Sedang membuat suara...")
+    try:
+        data = get_backend("edge").synthesize(message, voice=voice)
+    except BackendError as e:
+        print(f"Gagal: {e}")
+        print("Pastikan edge-tts terinstall (pip install edge-tts) dan ada koneksi internet.")
+        return False
+
+    with open(output, "wb") as f:
+        f.write(data)
+    print(f"Sukses! Cek file {output} ({len(data):,} bytes)")
+    return True
 
-if exit_code == 0:
-    print(f"Sukses! Cek file {output}")
-else:
-    print("Gagal. Pastikan library edge-tts terinstall.")
 
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)
@@ -0,0 +1,132 @@
+"""
+CLI tunggal untuk semua backend TTS (lihat backends/)
+SDK backend baru di-import saat backend dipakai, sehingga start-up tetap cepat
+
+Penggunaan:
+  python voice.py "Halo, selamat makan" --backend gtts -o halo.mp3
+  python voice.py "Halo" --backend azure --param voice=id-ID-GadisNeural
+  python voice.py "Halo" --backend pyttsx3 --trim  # potong senyap awal/akhir (butuh numpy)
+  python voice.py --list
+  python voice.py --check-import        # cek waktu import terhadap IMPORT_BUDGET_MS
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import backends
+import metrics
+
+DEFAULT_BACKEND = os.getenv("VOICE_BACKEND", "gtts")
+IMPORT_BUDGET_MS = 150    # Batas waktu import CLI + registry (tanpa SDK backend)
+
+
+def parse_params(pairs):
+    """Ubah ["voice=nova", "speed=1.2"] menjadi dict (nilai JSON jika bisa)"""
+    params = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise ValueError(f"Format parameter harus key=value: {pair}")
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return params
+
+
+HEAVY_MODULES = ("gtts", "pydub", "numpy", "openai", "azure", "pyttsx3", "edge_tts")
+
+
+def measure_import_time():
+    """
+    Ukur waktu import modul ini di interpreter baru
+    Return: (ms, list SDK berat yang ikut ter-import)
+    """
+    code = (
+        "import json, sys, time; s = time.perf_counter(); import voice; "
+        "e = (time.perf_counter() - s) * 1000; "
+        f"print(json.dumps([e, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True,
+    )
+    elapsed_ms, heavy = json.loads(result.stdout)
+    return elapsed_ms, heavy
+
+
+def check_import():
+    elapsed_ms, heavy = measure_import_time()
+    ok = elapsed_ms <= IMPORT_BUDGET_MS
+    marker = "✓" if ok else "✗"
+    print(f"{marker} Waktu import: {elapsed_ms:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    if heavy:
+        print(f"✗ SDK ter-import saat start-up: {', '.join(heavy)}")
+        ok = False
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Text-to-Speech dengan berbagai backend")
+    parser.add_argument("text", nargs="?", help="Teks yang akan diubah menjadi suara")
+    parser.add_argument("-b", "--backend", default=DEFAULT_BACKEND, help=f"Nama backend (default: {DEFAULT_BACKEND})")
+    parser.add_argument("-o", "--output", help="File output (default: output_<backend>.<ext>)")
+    parser.add_argument("-p", "--param", action="append", help="Parameter backend key=value (boleh berulang)")
+    parser.add_argument("--trim", action="store_true", help="Potong senyap di awal/akhir audio (lihat dsp.trim)")
+    parser.add_argument("--list", action="store_true", help="Tampilkan daftar backend")
+    parser.add_argument("--check-import", action="store_true", help="Cek waktu import terhadap budget")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in backends.available():
+            print(f"  - {name}")
+        return True
+    if args.check_import:
+        return check_import()
+    if not args.text:
+        parser.error("teks wajib diisi")
+
+    try:
+        params = parse_params(args.param)
+        backend = backends.get_backend(args.backend)
+        print(f"Backend: {args.backend} (load {backends.load_time(args.backend) * 1000:.0f} ms)")
+
+        start = time.perf_counter()
+        data = backend.synthesize(args.text, **params)
+        elapsed = time.perf_counter() - start
+        if args.trim:
+            import dsp   # numpy + pydub hanya di-import jika dipakai
+            data, info = dsp.trim_bytes(data, format=backend.extension)
+            print(f"  Trim senyap: awal {info['trim_start_ms']:.0f} ms, "
+                  f"akhir {info['original_ms'] - info['trim_end_ms']:.0f} ms dipotong")
+
+        output = args.output or f"output_{args.backend}.{backend.extension}"
+        with open(output, "wb") as f:
+            f.write(data)
+        print(f"✓ Berhasil! File tersimpan di: {output}")
+        print(f"  Ukuran file: {len(data):,} bytes ({len(data) / 1024:.2f} KB), sintesis {elapsed * 1000:.0f} ms")
+        return True
+    except KeyError as e:
+        print(f"✗ ERROR: {e.args[0]}")
+        return False
+    except ImportError as e:
+        print(f"✗ ERROR: SDK untuk backend '{args.backend}' tidak terinstall ({e})")
+        print("  Install dengan: pip install -r requirements.txt")
+        return False
+    except Exception as e:
+        print(f"✗ ERROR: {e}")
+        print(f"  Tipe: {type(e).__name__}")
+        return False
+    finally:
+        backends.close_all()
+        metrics.write_if_configured()
+
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        exit(1)